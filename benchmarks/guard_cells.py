@@ -0,0 +1,90 @@
+"""Benchmark guard-cell filling against the number of blocks."""
+
+import sys
+import time
+
+import flowx
+
+
+def benchmark(blocks, size=256, repeat=100):
+    """
+    Time fill_guard_cells on cell-centered and face grids, for one variable
+    and for four variables filled one by one or in a single call
+
+    Arguments
+    ---------
+    blocks : list
+            Number of blocks in each direction
+
+    size : integer
+            Number of cells in each direction for square grids
+
+    repeat : integer
+            Number of calls averaged for each timing
+    """
+    print(
+        "{:>8} {:>14} {:>12} {:>12} {:>14} {:>14}".format(
+            "blocks", "grid", "halo [ms]", "fill [ms]", "4 fills [ms]", "4 vars [ms]"
+        )
+    )
+
+    for nblocks in blocks:
+        for gridtype in ["cell-centered", "x-face", "y-face"]:
+            varlist = ["ivar", "avar", "bvar", "cvar"]
+            bc_type = {
+                varkey: ["dirichlet", "dirichlet", "neumann", "neumann"]
+                for varkey in varlist
+            }
+            bc_val = {varkey: [1.0, 1.0, 0.0, 0.0] for varkey in varlist}
+
+            grid = flowx.domain.Grid(
+                gridtype,
+                varlist,
+                size,
+                size,
+                0.0,
+                1.0,
+                0.0,
+                1.0,
+                xblocks=nblocks,
+                yblocks=nblocks,
+                user_bc_type=bc_type,
+                user_bc_val=bc_val,
+            )
+
+            start = time.time()
+            for _ in range(repeat):
+                grid.halo_exchange("ivar")
+            halo_time = (time.time() - start) / repeat
+
+            start = time.time()
+            for _ in range(repeat):
+                grid.fill_guard_cells("ivar")
+            fill_time = (time.time() - start) / repeat
+
+            start = time.time()
+            for _ in range(repeat):
+                for varkey in varlist:
+                    grid.fill_guard_cells(varkey)
+            fills_time = (time.time() - start) / repeat
+
+            start = time.time()
+            for _ in range(repeat):
+                grid.fill_guard_cells(varlist)
+            batch_time = (time.time() - start) / repeat
+
+            print(
+                "{:>8} {:>14} {:>12.4f} {:>12.4f} {:>14.4f} {:>14.4f}".format(
+                    nblocks**2,
+                    gridtype,
+                    1e3 * halo_time,
+                    1e3 * fill_time,
+                    1e3 * fills_time,
+                    1e3 * batch_time,
+                )
+            )
+
+
+if __name__ == "__main__":
+    blocks = [int(arg) for arg in sys.argv[1:]] or [1, 4, 16]
+    benchmark(blocks)
@@ -0,0 +1,63 @@
+"""Benchmark setup time of the Poisson matrix against grid size."""
+
+import sys
+import time
+
+from scipy.sparse import linalg as sla
+
+import flowx
+
+
+def benchmark(sizes, factorize_limit=512):
+    """
+    Time assembly and LU factorization of the Poisson matrix
+
+    Arguments
+    ---------
+    sizes : list
+            Number of cells in each direction for square grids
+
+    factorize_limit : integer
+            Largest size for which SuperLU factorization is timed
+    """
+    print(
+        "{:>8} {:>12} {:>16} {:>16}".format("n", "unknowns", "assembly [s]", "splu [s]")
+    )
+
+    for size in sizes:
+        bc_type = dict(ivar=["neumann", "neumann", "dirichlet", "dirichlet"])
+        bc_val = dict(ivar=[0.0, 0.0, 0.0, 0.0])
+
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            ["ivar", "rvar"],
+            size,
+            size,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        start = time.time()
+        matrix = flowx.poisson.assemble_sparse_matrix(grid, "ivar")
+        assembly_time = time.time() - start
+
+        factorize_time = float("nan")
+        if size <= factorize_limit:
+            start = time.time()
+            sla.splu(matrix.tocsc())
+            factorize_time = time.time() - start
+
+        print(
+            "{:>8} {:>12} {:>16.4f} {:>16.4f}".format(
+                size, matrix.shape[0], assembly_time, factorize_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 128, 256, 512, 1024, 2048]
+    benchmark(sizes)
@@ -0,0 +1,113 @@
+"""Benchmark Poisson solvers against grid size."""
+
+import sys
+import time
+
+import numpy
+
+import flowx
+
+
+def setup_grid(size):
+    """
+    Create a square grid with a manufactured solution
+
+    Arguments
+    ---------
+    size : integer
+           Number of cells in each direction
+    """
+    bc_type = dict(ivar=["dirichlet", "dirichlet", "dirichlet", "dirichlet"])
+    bc_val = dict(ivar=[0.0, 0.0, 0.0, 0.0])
+
+    grid = flowx.domain.Grid(
+        "cell-centered",
+        ["ivar", "rvar", "asol"],
+        size,
+        size,
+        0.0,
+        1.0,
+        0.0,
+        1.0,
+        user_bc_type=bc_type,
+        user_bc_val=bc_val,
+    )
+
+    xmesh, ymesh = numpy.meshgrid(grid.x, grid.y)
+    grid["asol"][0, 0, :, :] = numpy.sin(numpy.pi * xmesh) * numpy.sin(numpy.pi * ymesh)
+    grid["rvar"][0, 0, :, :] = -2 * numpy.pi**2 * grid["asol"][0, 0, :, :]
+
+    return grid
+
+
+def benchmark(sizes, solvers, max_unknowns):
+    """
+    Time setup and solve of the Poisson solvers
+
+    Arguments
+    ---------
+    sizes : list
+            Number of cells in each direction for square grids
+
+    solvers : list
+            Names of solvers passed as poisson_info['poisson_solver']
+
+    max_unknowns : dictionary
+            Largest number of unknowns to run for each solver
+    """
+    print(
+        "{:>8} {:>10} {:>12} {:>12} {:>8} {:>12}".format(
+            "n", "solver", "setup [s]", "solve [s]", "ites", "error"
+        )
+    )
+
+    for size in sizes:
+        for solver in solvers:
+            if size * size > max_unknowns.get(solver, numpy.inf):
+                continue
+
+            grid = setup_grid(size)
+            poisson_info = dict(poisson_solver=solver, maxiter=100000, tol=1e-8)
+
+            start = time.time()
+            poisson = flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info)
+            setup_time = time.time() - start
+
+            start = time.time()
+            ites, _ = poisson.solve()
+            solve_time = time.time() - start
+
+            error = numpy.max(
+                numpy.abs(
+                    grid["ivar"][0, 0, 1:-1, 1:-1] - grid["asol"][0, 0, 1:-1, 1:-1]
+                )
+            )
+
+            print(
+                "{:>8} {:>10} {:>12.4f} {:>12.4f} {:>8} {:>12.4e}".format(
+                    size, solver, setup_time, solve_time, str(ites), error
+                )
+            )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [64, 128, 256, 512, 1024]
+    solvers = [
+        "jacobi",
+        "cg",
+        "krylov",
+        "pcg",
+        "sor",
+        "superlu",
+        "multigrid",
+        "spectral",
+    ]
+    max_unknowns = {
+        "jacobi": 128**2,
+        "cg": 512**2,
+        "krylov": 512**2,
+        "pcg": 512**2,
+        "sor": 512**2,
+        "superlu": 1024**2,
+    }
+    benchmark(sizes, solvers, max_unknowns)
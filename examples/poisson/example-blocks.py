@@ -15,7 +15,7 @@ def example():
     center_vars = ["asol", "ivar", "rvar", "eror"]
     poisson_vars = ["ivar", "rvar"]
 
-    simulation_info = dict(verbose=True, poisson_solver="superlu")
+    simulation_info = dict(verbose=True, poisson_solver="cg", maxiter=4000, tol=1e-10)
 
     # Define boundary condition for the poisson test
     user_bc = "dirichlet"
@@ -40,23 +40,23 @@ def example():
         user_bc_val=bc_val,
     )
 
-    # poisson = flowx.poisson.Poisson(grid, poisson_vars, simulation_info)
+    poisson = flowx.poisson.Poisson(grid, poisson_vars, simulation_info)
 
     # Compute the analytical solution
-    # simulation.get_analytical(grid, 'asol', user_bc)
+    simulation.get_analytical(grid, "asol", user_bc)
 
     # Calculate the right-hand side of the Poisson system
-    # simulation.get_rhs(grid, 'rvar', user_bc)
+    simulation.get_rhs(grid, "rvar", user_bc)
 
     # Solve the Poisson system
-    # ites, res = poisson.solve()
+    ites, res = poisson.solve()
 
     # Compute the error (absolute value of the difference)
-    # grid.compute_error('eror', 'ivar', 'asol')
+    grid.compute_error("eror", "ivar", "asol")
 
-    # Compute the L2-norm of the error..archive
-    # l2_norm = grid.get_l2_norm('eror')
-    # print(l2_norm)
+    # Compute the L2-norm of the error
+    l2_norm = grid.get_l2_norm("eror")
+    print(l2_norm)
 
 
 if __name__ == "__main__":
@@ -20,6 +20,8 @@ def Domain(
     bc_val_facex=None,
     bc_type_facey=None,
     bc_val_facey=None,
+    xblocks=1,
+    yblocks=1,
 ):
 
     gridc, gridx, gridy, scalars, particles = [object] * 5
@@ -34,6 +36,8 @@ def Domain(
             xmax,
             ymin,
             ymax,
+            xblocks=xblocks,
+            yblocks=yblocks,
             user_bc_type=bc_type_center,
             user_bc_val=bc_val_center,
         )
@@ -48,6 +52,8 @@ def Domain(
             xmax,
             ymin,
             ymax,
+            xblocks=xblocks,
+            yblocks=yblocks,
             user_bc_type=bc_type_facex,
             user_bc_val=bc_val_facex,
         )
@@ -61,6 +67,8 @@ def Domain(
             xmax,
             ymin,
             ymax,
+            xblocks=xblocks,
+            yblocks=yblocks,
             user_bc_type=bc_type_facey,
             user_bc_val=bc_val_facey,
         )
@@ -11,6 +11,16 @@ class GridBase(Dataset):
 
     type_ = "base"
 
+    # Integer codes of boundary types used by the boundary plan
+    bc_codes = {
+        None: 0,
+        "neumann": 1,
+        "dirichlet": 2,
+        "outflow": 2,
+        "projection": 3,
+        "periodic": 4,
+    }
+
     def __init__(
         self,
         varlist,
@@ -96,11 +106,14 @@ class GridBase(Dataset):
         self.set_gridline_coordinates()
 
         # Set boundary blocks
-        # self.set_domain_boundaries()
+        self.set_domain_boundaries()
 
-        # Boundary condition information
+        # Boundary condition information, bc_version counts changes in bc_type
+        # and bc_plan holds boundary codes resolved from bc_type
         self.bc_type = {}
         self.bc_val = {}
+        self.bc_version = {}
+        self.bc_plan = {}
 
         self.set_default_bc(varlist)
         if user_bc_type is not None and user_bc_val is not None:
@@ -153,6 +166,272 @@ class GridBase(Dataset):
         """Set the gridline coordinates."""
         raise NotImplementedError
 
+    def set_domain_boundaries(self):
+        """Store block indices along each face for halo exchange and boundaries.
+
+        halo_blocks[location] holds the (blocks, neighbors) index arrays of
+        blocks with a neighbor at location, and boundary_blocks[location]
+        the indices of blocks at the domain boundary. periodic_blocks[location]
+        pairs these blocks with the blocks on the opposite boundary of the same
+        row or column. face_index[face] holds indices of the guard cells and
+        the first two interior layers next to a face for all boundary blocks
+        at once.
+        """
+        locations = ["xlow", "xhigh", "ylow", "yhigh"]
+        opposites = dict(xlow="xhigh", xhigh="xlow", ylow="yhigh", yhigh="ylow")
+
+        self.halo_blocks = {}
+        self.boundary_blocks = {}
+        self.periodic_blocks = {}
+
+        for location in locations:
+            blocks = [
+                block.tag
+                for block in self.blocklist
+                if block.neighdict[location] is not None
+            ]
+            neighbors = [self.blocklist[tag].neighdict[location] for tag in blocks]
+
+            self.halo_blocks[location] = (
+                numpy.array(blocks, dtype=int),
+                numpy.array(neighbors, dtype=int),
+            )
+            self.boundary_blocks[location] = numpy.array(
+                [
+                    block.tag
+                    for block in self.blocklist
+                    if block.neighdict[location] is None
+                ],
+                dtype=int,
+            )
+
+        for location in locations:
+            partners = []
+            for tag in self.boundary_blocks[location]:
+                while self.blocklist[tag].neighdict[opposites[location]] is not None:
+                    tag = self.blocklist[tag].neighdict[opposites[location]]
+                partners.append(tag)
+
+            self.periodic_blocks[location] = (
+                self.boundary_blocks[location],
+                numpy.array(partners, dtype=int),
+            )
+
+        self.face_index = []
+        for location in locations:
+            blocks = self.boundary_blocks[location]
+
+            # Basic slicing avoids copies when all blocks touch the boundary
+            if blocks.size == self.nblocks:
+                blocks = slice(None)
+
+            self.face_index.append(
+                [
+                    self.__class__.layer_index(blocks, location, layer)
+                    for layer in range(3)
+                ]
+            )
+
+    @staticmethod
+    def layer_index(blocks, loc, layer):
+        """Index of a layer of cells parallel to a boundary.
+
+        Parameters
+        ----------
+        blocks : slice or numpy.ndarray
+            Blocks to index.
+        loc : string
+            Boundary location;
+            choices: ['xlow', 'xhigh', 'ylow', 'yhigh'].
+        layer : integer
+            Distance from the boundary, 0 for guard cells.
+
+        """
+        if loc == "xlow":
+            return (blocks, slice(None), slice(None), layer)
+        elif loc == "xhigh":
+            return (blocks, slice(None), slice(None), -1 - layer)
+        elif loc == "ylow":
+            return (blocks, slice(None), layer, slice(None))
+        elif loc == "yhigh":
+            return (blocks, slice(None), -1 - layer, slice(None))
+        else:
+            raise ValueError('Unknown boundary location "{}"'.format(loc))
+
+    def halo_exchange(self, varlist, **kwargs):
+        """Copy interior values of neighboring blocks to guard cells.
+
+        Parameters
+        ----------
+        varlist : string or list of strings
+            Name of variables to update.
+
+        """
+        if type(varlist) is str:
+            varlist = [varlist]
+
+        arrays = [self[varkey].view(numpy.ndarray) for varkey in varlist]
+
+        if self.nblocks > 1:
+            self.exchange_halo_array(arrays)
+
+        # Periodic faces wrap around to blocks on the opposite boundary
+        for varkey, array in zip(varlist, arrays):
+            for code, faces in self.bc_plan[varkey]:
+                if code == self.bc_codes["periodic"]:
+                    self.exchange_periodic_array(array, faces)
+
+    def exchange_halo_array(self, data):
+        """Exchange guard cells of arrays with the layout of grid variables.
+
+        All blocks are updated at once using the index arrays from
+        set_domain_boundaries, and a list of arrays is exchanged in a single
+        pass over the faces.
+
+        Parameters
+        ----------
+        data : numpy.ndarray or list of numpy.ndarray
+            Arrays of shape (nblocks, nz, ny, nx) including guard cells.
+
+        """
+        arrays = data if type(data) is list else [data]
+
+        for location in ["xlow", "xhigh", "ylow", "yhigh"]:
+            self.exchange_face(arrays, location, *self.halo_blocks[location])
+
+    def exchange_periodic_array(self, data, faces):
+        """Wrap guard cells of an array around periodic faces.
+
+        Guard cells of blocks at a periodic face are copied from interior
+        values of blocks at the opposite face. Faces without guard cells,
+        like x-faces at xlow and xhigh of GridFaceX, coincide across the
+        periodic boundary and take the value at the low face.
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            Array of shape (nblocks, nz, ny, nx) including guard cells.
+        faces : list of integers
+            Periodic faces, indices in [xlow, xhigh, ylow, yhigh].
+
+        """
+        locations = ["xlow", "xhigh", "ylow", "yhigh"]
+
+        for face in faces:
+            blocks, partners = self.periodic_blocks[locations[face]]
+            self.exchange_face([data], locations[face], blocks, partners)
+
+            if locations[face] == "xhigh" and self.xguard == 0:
+                data[blocks, :, :, -1] = data[partners, :, :, 0]
+            elif locations[face] == "yhigh" and self.yguard == 0:
+                data[blocks, :, -1, :] = data[partners, :, 0, :]
+
+    def exchange_face(self, arrays, location, blocks, neighbors):
+        """Copy interior values of neighbors to guard cells at one face.
+
+        Parameters
+        ----------
+        arrays : list of numpy.ndarray
+            Arrays of shape (nblocks, nz, ny, nx) including guard cells.
+        location : string
+            Face of blocks with guard cells to fill;
+            choices: ['xlow', 'xhigh', 'ylow', 'yhigh'].
+        blocks : numpy.ndarray
+            Indices of blocks to update.
+        neighbors : numpy.ndarray
+            Indices of blocks to copy from.
+
+        """
+        nxb, nyb = self.nxb, self.nyb
+        xguard, yguard = self.xguard, self.yguard
+
+        if location == "xlow":
+            for guard in range(xguard):
+                for array in arrays:
+                    array[blocks, :, :, guard] = array[neighbors, :, :, nxb + guard]
+
+        elif location == "xhigh":
+            for guard in range(xguard):
+                for array in arrays:
+                    array[blocks, :, :, nxb + xguard + guard] = array[
+                        neighbors, :, :, xguard + guard
+                    ]
+
+        elif location == "ylow":
+            for guard in range(yguard):
+                for array in arrays:
+                    array[blocks, :, guard, :] = array[neighbors, :, nyb + guard, :]
+
+        elif location == "yhigh":
+            for guard in range(yguard):
+                for array in arrays:
+                    array[blocks, :, nyb + yguard + guard, :] = array[
+                        neighbors, :, yguard + guard, :
+                    ]
+
+        else:
+            raise ValueError('Unknown boundary location "{}"'.format(location))
+
+    def extended_array(self, varkey, axis, out=None):
+        """Copy of variable data with one more layer of neighbor values at
+        both ends of each block along an axis.
+
+        Stencils that reach past guard cells, like those on faces shared by
+        two blocks of face grids, read from this copy. Layers at periodic
+        faces of the domain wrap around to blocks on the opposite boundary,
+        layers at other faces of the domain repeat the outermost values of
+        the block.
+
+        Parameters
+        ----------
+        varkey : string
+            Name of the variable.
+        axis : string
+            Direction to extend; choices: ['x', 'y'].
+        out : numpy.ndarray (optional)
+            Array to store the copy, allocated if not given.
+
+        """
+        data = self[varkey].view(numpy.ndarray)
+
+        if axis == "x":
+            faces, guard, dim = [0, 1], self.xguard, 3
+        elif axis == "y":
+            faces, guard, dim = [2, 3], self.yguard, 2
+        else:
+            raise ValueError('Unknown axis "{}"'.format(axis))
+
+        shape = list(data.shape)
+        shape[dim] += 2
+        extended = numpy.empty(shape) if out is None else out
+
+        # Copy blocks and repeat their outermost layers at both ends
+        index = [slice(None)] * 4
+        for layer, source in [(slice(1, -1), slice(None)), (0, 0), (-1, -1)]:
+            index[dim] = source
+            source_index = tuple(index)
+            index[dim] = layer
+            extended[tuple(index)] = data[source_index]
+
+        # Outermost layers of a block coincide with layer size - 1 - guard of
+        # the neighbor below and layer guard of the neighbor above
+        locations = ["xlow", "xhigh", "ylow", "yhigh"]
+        size = data.shape[dim]
+        for face, layer, neighbor_layer in zip(
+            faces, [0, size + 1], [size - 2 - guard, guard + 1]
+        ):
+            pairs = [self.halo_blocks[locations[face]]]
+            if self.bc_type[varkey][face] == "periodic":
+                pairs.append(self.periodic_blocks[locations[face]])
+
+            for blocks, neighbors in pairs:
+                target = [blocks, slice(None), slice(None), slice(None)]
+                source = [neighbors, slice(None), slice(None), slice(None)]
+                target[dim], source[dim] = layer, neighbor_layer
+                extended[tuple(target)] = data[tuple(source)]
+
+        return extended
+
     def addvar(self, varkey):
         """Add a variable"""
         super().addvar(varkey)
@@ -168,9 +447,13 @@ class GridBase(Dataset):
 
         num = len(varlist)
 
+        self.bump_bc_version(dict(zip(varlist, num * [default_bc_type])))
+
         self.bc_type = {**self.bc_type, **dict(zip(varlist, num * [default_bc_type]))}
         self.bc_val = {**self.bc_val, **dict(zip(varlist, num * [default_bc_val]))}
 
+        self.set_bc_plan(varlist)
+
     def set_user_bc(self, user_bc_type, user_bc_val):
         """Overwrite default boundary conditions with user-provided ones.
 
@@ -183,7 +466,9 @@ class GridBase(Dataset):
 
         """
         # Overwrite default boundary types
+        self.bump_bc_version(user_bc_type)
         self.bc_type = {**self.bc_type, **user_bc_type}
+        self.set_bc_plan(user_bc_type.keys())
         # Overwrite default boundary values
         self.bc_val = {**self.bc_val, **user_bc_val}
 
@@ -199,7 +484,70 @@ class GridBase(Dataset):
         self.bc_val = {**self.bc_val, **user_bc_val}
 
     def update_bc_type(self, user_bc_type):
+        """Overwrite boundary condition types with user-provided ones.
+
+        Parameters
+        ----------
+        user_bc_type : dictionary of (string, list) items
+            User-defined boundary types.
+
+        """
+        self.bump_bc_version(user_bc_type)
         self.bc_type = {**self.bc_type, **user_bc_type}
+        self.set_bc_plan(user_bc_type.keys())
+
+    def set_bc_plan(self, varlist):
+        """Resolve boundary types to integer codes for fill_guard_cells.
+
+        bc_plan[varkey] holds (code, faces) pairs that group the faces
+        [xlow, xhigh, ylow, yhigh] by boundary type, so string comparisons
+        happen only when boundary types are set.
+
+        Parameters
+        ----------
+        varlist : list of strings
+            Name of variables with new boundary types.
+
+        """
+        for varkey in varlist:
+            codes = []
+            for bc_type in self.bc_type[varkey]:
+                if bc_type not in self.bc_codes:
+                    raise ValueError(
+                        'Boundary type "{}" not implemented'.format(bc_type)
+                    )
+                codes.append(self.bc_codes[bc_type])
+
+            periodic = [code == self.bc_codes["periodic"] for code in codes]
+            if periodic[0] != periodic[1] or periodic[2] != periodic[3]:
+                raise ValueError(
+                    'Periodic boundaries of "{}" must be set in pairs'.format(varkey)
+                )
+
+            self.bc_plan[varkey] = [
+                (
+                    code,
+                    [face for face, face_code in enumerate(codes) if face_code == code],
+                )
+                for code in sorted(set(codes))
+                if code != self.bc_codes[None]
+            ]
+
+    def bump_bc_version(self, user_bc_type):
+        """Increment bc_version of variables whose boundary types change.
+
+        Units that precompute data from boundary types, like the matrix of
+        the Poisson unit, compare bc_version to decide when to rebuild it.
+
+        Parameters
+        ----------
+        user_bc_type : dictionary of (string, list) items
+            New boundary types.
+
+        """
+        for varkey, bc_type in user_bc_type.items():
+            if list(bc_type) != list(self.bc_type.get(varkey, [])):
+                self.bc_version[varkey] = self.bc_version.get(varkey, -1) + 1
 
     def compute_error(self, eror, ivar, asol):
         """Compute the error between the numerical and analytical solutions.
@@ -246,119 +594,108 @@ class GridBase(Dataset):
     def fill_guard_cells(self, varlist, **kwargs):
         """Fill value at guard cells for given variable names.
 
+        Guard cells are filled face by face for all boundary blocks at once,
+        using the boundary codes in bc_plan and indices in face_index. A list
+        of variables is filled in a single pass, with one halo exchange for
+        all of them, so callers should batch variables of the same grid.
+
         Parameters
         ----------
         varlist : string or list of strings
             Name of variables to update.
 
         """
-        self.halo_exchange(varlist, **kwargs)
-
         # Convert single string to a list
         if type(varlist) is str:
             varlist = [varlist]
 
+        self.halo_exchange(varlist, **kwargs)
+        self.fill_boundary_cells(varlist)
+
+    def fill_boundary_cells(self, varlist):
+        """Fill guard cells at the domain boundary using bc_plan.
+
+        Parameters
+        ----------
+        varlist : list of strings
+            Name of variables to update.
+
+        """
+        # Plain array views skip the overhead of memmap subclass operations
+        arrays = [self[varkey].view(numpy.ndarray) for varkey in varlist]
+
         locations = ["xlow", "xhigh", "ylow", "yhigh"]
+        deltas = [self.dx, self.dx, self.dy, self.dy]
 
-        # TODO add a call to exchange data between blocks
-        # TODO figure out how to tag blocks at boundary etc.
-        # TODO make this efficient
-        for varkey in varlist:
-            bc_type_var = self.bc_type[varkey]
+        for varkey, data in zip(varlist, arrays):
             bc_val_var = self.bc_val[varkey]
 
-            for block in self.blocklist:
-                deltas = [block.dx, block.dx, block.dy, block.dy]
-                neighbors = [block.neighdict[location] for location in locations]
-                blockdata = block[varkey]
-
-                for location, neighbor, delta, bc_type, bc_val in zip(
-                    locations, neighbors, deltas, bc_type_var, bc_val_var
-                ):
-                    if neighbor is None:
-                        if bc_type == "neumann":
-                            self.__class__.fill_guard_cells_neumann(
-                                blockdata, location, bc_val, delta
-                            )
-                        elif bc_type == "dirichlet":
-                            self.__class__.fill_guard_cells_dirichlet(
-                                blockdata, location, bc_val
-                            )
-                        elif bc_type == "outflow":
-                            self.__class__.fill_guard_cells_dirichlet(
-                                blockdata, location, bc_val
-                            )
-                        elif bc_type == "projection":
-                            self.__class__.fill_guard_cells_projection(
-                                blockdata, location
-                            )
-                        elif bc_type == None:
-                            None
-                        else:
-                            raise ValueError(
-                                'Boundary type "{}" not implemented'.format(bc_type)
-                            )
+            for code, faces in self.bc_plan[varkey]:
+                for face in faces:
+                    index = self.face_index[face]
+
+                    if code == self.bc_codes["neumann"]:
+                        self.__class__.fill_guard_cells_neumann(
+                            data, index, bc_val_var[face], deltas[face]
+                        )
+                    elif code == self.bc_codes["dirichlet"]:
+                        self.__class__.fill_guard_cells_dirichlet(
+                            data, locations[face], index, bc_val_var[face]
+                        )
+                    elif code == self.bc_codes["projection"]:
+                        self.__class__.fill_guard_cells_projection(data, index)
 
     @staticmethod
-    def fill_guard_cells_dirichlet(blockdata, loc, bc_val):
+    def fill_guard_cells_dirichlet(data, loc, index, bc_val):
         """Fill guard cells using a Dirichlet condition.
 
         Method implemented in child classes.
 
         Parameters
         ----------
+        data : numpy.ndarray
+            Variable data of all blocks.
         loc : string
             Boundary location;
-            choices: ['left', 'right', 'bottom', 'top'].
+            choices: ['xlow', 'xhigh', 'ylow', 'yhigh'].
+        index : list
+            Indices of guard cells and interior layers from layer_index.
         bc_val : float
-            Neumann boundary value.
+            Dirichlet boundary value.
 
         """
         raise NotImplementedError()
 
     @staticmethod
-    def fill_guard_cells_neumann(blockdata, loc, bc_val, delta):
+    def fill_guard_cells_neumann(data, index, bc_val, delta):
         """Fill guard cells using a Neumann condition.
 
         Parameters
         ----------
-        loc : string
-            Boundary location;
-            choices: ['left', 'right', 'bottom', 'top'].
+        data : numpy.ndarray
+            Variable data of all blocks.
+        index : list
+            Indices of guard cells and interior layers from layer_index.
         bc_val : float
             Neumann boundary value.
         delta : float
             Grid-cell width.
 
         """
-        if loc == "xlow":
-            blockdata[:, :, 0] = bc_val * delta + blockdata[:, :, 1]
-        elif loc == "xhigh":
-            blockdata[:, :, -1] = bc_val * delta + blockdata[:, :, -2]
-        elif loc == "ylow":
-            blockdata[:, 0, :] = bc_val * delta + blockdata[:, 1, :]
-        elif loc == "yhigh":
-            blockdata[:, -1, :] = bc_val * delta + blockdata[:, -2, :]
-        else:
-            raise ValueError('Unknown boundary location "{}"'.format(loc))
+        guard, inner, _ = index
+        data[guard] = bc_val * delta + data[inner]
 
     @staticmethod
-    def fill_guard_cells_projection(blockdata, loc):
+    def fill_guard_cells_projection(data, index):
         """Fill guard cells with projection BC.
 
         Parameters
         ----------
-        loc : string
-            Boundary location;
-            choices: ['left', 'right', 'bottom', 'top'].
+        data : numpy.ndarray
+            Variable data of all blocks.
+        index : list
+            Indices of guard cells and interior layers from layer_index.
+
         """
-        if loc == "xlow":
-            blockdata[:, :, 0] = 2 * blockdata[:, :, 1] - blockdata[:, :, 2]
-        elif loc == "xhigh":
-            blockdata[:, :, -1] = 2 * blockdata[:, :, -2] - blockdata[:, :, -3]
-        elif loc == "ylow":
-            blockdata[:, 0, :] = 2 * blockdata[:, 1, :] - blockdata[:, 2, :]
-        elif loc == "yhigh":
-            blockdata[:, -1, :] = 2 * blockdata[:, -2, :] - blockdata[:, -3, :]
-        else:
-            raise ValueError('Unknown boundary location "{}"'.format(loc))
+        guard, inner, second = index
+        data[guard] = 2 * data[inner] - data[second]
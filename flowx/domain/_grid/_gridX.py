@@ -50,25 +50,26 @@ class GridFaceX(GridBase):
         )
 
     @staticmethod
-    def fill_guard_cells_dirichlet(blockdata, loc, bc_val):
+    def fill_guard_cells_dirichlet(data, loc, index, bc_val):
         """Fill guard cells using a Dirichlet condition.
 
         Parameters
         ----------
+        data : numpy.ndarray
+            Variable data of all blocks.
         loc : string
             Boundary location;
-            choices: ['left', 'right', 'bottom', 'top'].
+            choices: ['xlow', 'xhigh', 'ylow', 'yhigh'].
+        index : list
+            Indices of guard cells and interior layers from layer_index.
         bc_val : float
-            Neumann boundary value.
+            Dirichlet boundary value.
 
         """
-        if loc == "xlow":
-            blockdata[:, :, 0] = bc_val
-        elif loc == "xhigh":
-            blockdata[:, :, -1] = bc_val
-        elif loc == "ylow":
-            blockdata[:, 0, :] = 2 * bc_val - blockdata[:, 1, :]
-        elif loc == "yhigh":
-            blockdata[:, -1, :] = 2 * bc_val - blockdata[:, -2, :]
+        guard, inner, _ = index
+
+        # Boundary values are stored on x-faces at the boundary
+        if loc in ["xlow", "xhigh"]:
+            data[guard] = bc_val
         else:
-            raise ValueError('Unknown boundary location "{}"'.format(loc))
+            data[guard] = 2 * bc_val - data[inner]
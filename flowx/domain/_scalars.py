@@ -13,17 +13,28 @@ class Scalars(object):
         variable - to store values for time-step, Reynolds number, tmax, etc.
 
         stats - to store statistics to monitor simulation progress.
+
+        The time-step is fixed by default. Setting 'cfl' adapts it after
+        every step to cfl times the smallest of the 'dt_conv' and 'dt_visc'
+        limits in stats, growing by at most a factor of 'dt_growth' per step.
+        The viscous limit depends on the time-stepping scheme of the INS
+        unit, ab2 is stable for explicit diffusion at half the step of euler
+        and rk3 at 1.25 times it.
+        'dt_old' keeps the size of the previous step.
         """
 
         self._set_default_values()
         self._set_user_values(scalar_info)
 
+        self.dt_old = self.dt
+
     def _set_default_values(self):
         """
         Private subroutine to set default values
         """
 
         self.to, self.tmax, self.time, self.dt, self.nstep = [0.0, 0.0, 0.0, 1.0, 0]
+        self.cfl, self.dt_growth = [None, 1.1]
         self.stats = dict()
 
     def _set_user_values(self, scalar_info):
@@ -39,3 +50,17 @@ class Scalars(object):
         """
         self.time += self.dt
         self.nstep += 1
+
+        self.dt_old = self.dt
+        if self.cfl is not None:
+            self.dt = self._adaptive_dt()
+
+    def _adaptive_dt(self):
+        """
+        Private subroutine to compute the time-step from stability limits
+        """
+        limits = [
+            self.stats[key] for key in ["dt_conv", "dt_visc"] if key in self.stats
+        ]
+
+        return min([self.cfl * limit for limit in limits] + [self.dt_growth * self.dt])
@@ -1,8 +1,10 @@
 """Module for incompressible Navier Stokes equations"""
 
+import functools
 import time
 
 from . import _interface
+from ..poisson import solve_helmholtz
 
 
 class IncompNS(object):
@@ -42,6 +44,41 @@ class IncompNS(object):
 
         ins_info['time_stepping'] = 'ab2' --> default
                                   = 'euler'
+                                  = 'rk3', low-storage Runge-Kutta with a
+                                    pressure projection after each stage
+
+        The pressure is corrected incrementally with ins_info['pressure_correct']
+        for 'euler' and 'ab2', 'rk3' takes the pressure of the last stage
+
+        ins_info['predictor_backend'] = 'numpy' --> default, array operations
+                                      = 'numba', compiled kernels that fuse the
+                                        predictor into a single pass
+
+        Operators run block by block through boxkit actions, guard cells of
+        all blocks are filled between operators with fill_guard_cells
+        ins_info['nthreads'] = number of threads --> default 1
+        ins_info['backend']  = 'serial' --> default
+        ins_info['monitor']  = bool to monitor block actions --> default False
+
+        ins_info['diffusion'] = 'explicit' --> default
+                              = 'crank_nicolson', diffusion is treated implicitly by
+                                solving Helmholtz equations for the velocity with
+                                cached LU factorizations, there is no viscous
+                                time-step limit, not available with 'rk3',
+                                adaptive time-steps refactorize on every change
+
+        Time-steps adapt to the stability limits with scalar_info['cfl'],
+        see flowx.domain.Scalars, 'ab2' weights the previous step accordingly.
+        The viscous limit 'dt_visc' of explicit diffusion is 0.5*Re/(1/dx^2 + 1/dy^2)
+        for 'euler', half of it for 'ab2' and 1.25 times it for 'rk3'
+
+        ins_info['stats_every'] = number of steps between stats --> default 1,
+                                  stats are skipped on other steps unless
+                                  time-steps adapt and keep the values of the
+                                  last step with stats, the divergence of the
+                                  corrected velocity is written every step
+
+        Outflow boundaries are only supported on grids with a single block
         """
         # ----------Create images for other unit objects and variables----------------------------
         (
@@ -57,13 +94,32 @@ class IncompNS(object):
         self._poisson = poisson
 
         # ----------Setup default parameters for the current unit---------------------------------
-        self._options = {"time_stepping": "ab2", "pressure_correct": True}
+        self._options = {
+            "time_stepping": "ab2",
+            "pressure_correct": True,
+            "predictor_backend": "numpy",
+            "diffusion": "explicit",
+            "nthreads": 1,
+            "backend": "serial",
+            "monitor": False,
+            "stats_every": 1,
+        }
 
         self._predictor_type = {
             "euler": _interface.predictor_euler,
             "ab2": _interface.predictor_ab2,
+            "rk3": _interface.predictor_rk3,
         }
 
+        # Coefficients (hconst, gamma, tau) of the third-order low-storage scheme
+        # of Williamson (1980), h = hconst*h + H(u) and u = u + gamma*dt*h, with
+        # stages spanning tau*dt
+        self._rk3_coeffs = [
+            (0.0, 1.0 / 3.0, 1.0 / 3.0),
+            (-5.0 / 9.0, 15.0 / 16.0, 5.0 / 12.0),
+            (-153.0 / 128.0, 8.0 / 15.0, 1.0 / 4.0),
+        ]
+
         # ----------------------Read user parameters----------------------------------------------
         if ins_info:
             for key in ins_info:
@@ -81,18 +137,40 @@ class IncompNS(object):
                 "Warning: Incomp NS unit is a stub because one or more parameters were not supplied."
             )
 
-        elif (
-            self._gridc.nblocks > 1
-            or self._gridx.nblocks > 1
-            or self._gridy.nblocks > 1
-        ):
-            self._ins_advance = self._advance_stub
-            print("Warning: Incomp NS unit is a stub because nblocks > 1.")
-
         else:
+            if self._gridc.nblocks > 1 and (
+                "outflow" in self._gridx.bc_type[self._velc]
+                or "outflow" in self._gridy.bc_type[self._velc]
+            ):
+                raise ValueError(
+                    "[flowx.ins.IncompNS]:outflow boundaries are not supported "
+                    + "on grids with multiple blocks"
+                )
+
+            if (
+                self._options["diffusion"] != "explicit"
+                and self._options["time_stepping"] == "rk3"
+            ):
+                raise ValueError(
+                    "[flowx.ins.IncompNS]:implicit diffusion is not supported "
+                    + "with rk3 time stepping"
+                )
+
             self._ipres = self._options["pressure_correct"]
             self._predictor = self._predictor_type[self._options["time_stepping"]]
 
+            # Stages of the time advancement as (predictor, gamma, tau)
+            if self._options["time_stepping"] == "rk3":
+                self._ipres = False
+                self._stages = [
+                    (functools.partial(self._predictor, hconst=hconst), gamma, tau)
+                    for hconst, gamma, tau in self._rk3_coeffs
+                ]
+            elif self._options["time_stepping"] == "ab2":
+                self._stages = [(self._predictor_ab2, 1.0, 1.0)]
+            else:
+                self._stages = [(self._predictor, 1.0, 1.0)]
+
             self._divergence = _interface.divergence
             self._corrector = _interface.corrector
             self._stats = _interface.stats
@@ -105,6 +183,10 @@ class IncompNS(object):
 
             self._ins_advance = self._advance
 
+            # Scratch buffers of operators are allocated on the first time step
+            # and reused afterwards
+            self._options["workspace"] = _interface.Workspace()
+
             self._ustar_bc = self._gridx.bc_type[self._velc].copy()
             self._vstar_bc = self._gridy.bc_type[self._velc].copy()
 
@@ -143,6 +225,80 @@ class IncompNS(object):
         """
         time_ins_start = time.time()
 
+        # Direct solvers report no iterations and leave ites as None
+        self._scalars.stats["ites"], self._scalars.stats["poisson_time"] = None, 0.0
+
+        for predictor, gamma, tau in self._stages:
+            self._advance_stage(
+                predictor, gamma * self._scalars.dt, tau * self._scalars.dt
+            )
+
+        # Calculate total INS time
+        time_ins_end = time.time()
+        self._scalars.stats["ins_time"] = time_ins_end - time_ins_start
+
+        # Adaptive time-stepping needs stability limits after every step
+        if (
+            self._scalars.nstep % self._options["stats_every"] != 0
+            and self._scalars.cfl is None
+        ):
+            # Keep the divergence of the corrected velocity for output
+            self._divergence(
+                self._gridc,
+                self._gridx,
+                self._gridy,
+                self._velc,
+                self._divv,
+                options=self._options,
+            )
+            self._gridc.fill_guard_cells(self._divv)
+            return
+
+        # Calculate divergence of the corrected velocity and stats in one pass
+        self._scalars.stats.update(
+            self._stats(
+                self._gridc,
+                self._gridx,
+                self._gridy,
+                self._velc,
+                self._pres,
+                self._divv,
+                options=self._options,
+                write_div=True,
+            )
+        )
+        self._gridc.fill_guard_cells(self._divv)
+
+        self._scalars.stats["cfl"] = self._scalars.stats["conv_rate"] * self._scalars.dt
+
+        # Time-step limits for adaptive time-stepping
+        self._scalars.stats.update(
+            _interface.stability_limits(
+                self._gridc, self._scalars.Re, self._scalars.stats, self._options
+            )
+        )
+
+    def _predictor_ab2(self, *args, **kwargs):
+        """
+        Adams-Bashforth predictor weighted by the ratio of the current and previous time-steps
+        """
+        self._predictor(*args, ratio=self._scalars.dt / self._scalars.dt_old, **kwargs)
+
+    def _advance_stage(self, predictor, ifac, dt):
+        """
+        Subroutine for a predictor-projection stage of the time advancement
+
+        Arguments
+        ---------
+        predictor : function
+                    Predictor of the stage
+
+        ifac : float
+               Factor of the stage for the predictor and the pressure projection
+
+        dt : float
+             Time interval of the stage for boundary conditions
+        """
         # Update BC for predictor step
         self._gridx.update_bc_type({self._velc: self._ustar_bc})
         self._gridy.update_bc_type({self._velc: self._vstar_bc})
@@ -154,11 +310,11 @@ class IncompNS(object):
         self._scalars.stats["qin"] = _Qin
 
         # Calculate outflow BC
-        self._update_outflow_bc(self._gridx, self._velc, self._scalars.dt)
-        self._update_outflow_bc(self._gridy, self._velc, self._scalars.dt)
+        self._update_outflow_bc(self._gridx, self._velc, dt)
+        self._update_outflow_bc(self._gridy, self._velc, dt)
 
         # Calculate predicted velocity: u* = dt*H(u^n)
-        self._predictor(
+        predictor(
             self._gridc,
             self._gridx,
             self._gridy,
@@ -166,10 +322,16 @@ class IncompNS(object):
             self._hvar,
             self._pres,
             self._scalars.Re,
-            self._scalars.dt,
+            ifac,
             self._ipres,
+            options=self._options,
         )
 
+        # Implicit part of diffusion: (I - dt/(2 Re) laplacian) u* = u*
+        if self._options["diffusion"] == "crank_nicolson":
+            for grid in [self._gridx, self._gridy]:
+                solve_helmholtz(grid, self._velc, 0.5 * ifac / self._scalars.Re)
+
         # Immersed boundary forcing
         self._imbound.force_flow()
 
@@ -193,15 +355,19 @@ class IncompNS(object):
             self._gridy,
             self._velc,
             self._divv,
-            ifac=self._scalars.dt,
+            ifac=ifac,
+            options=self._options,
         )
         self._gridc.fill_guard_cells(self._divv)
 
         # Solve pressure Poisson equation
         time_poisson_begin = time.time()
-        self._scalars.stats["ites"], self._scalars.stats["res"] = self._poisson.solve()
+        ites, self._scalars.stats["res"] = self._poisson.solve()
         time_poisson_end = time.time()
-        self._scalars.stats["poisson_time"] = time_poisson_end - time_poisson_begin
+        if ites is not None:
+            self._scalars.stats["ites"] = (self._scalars.stats["ites"] or 0) + ites
+        self._scalars.stats["poisson_time"] += time_poisson_end - time_poisson_begin
+        self._scalars.stats.update(self._poisson.stats)
 
         # Update BC for corrector step
         self._gridx.update_bc_type({self._velc: self._ucorr_bc})
@@ -215,28 +381,9 @@ class IncompNS(object):
             self._velc,
             self._pres,
             self._delp,
-            self._scalars.dt,
+            ifac,
             self._ipres,
+            options=self._options,
         )
         self._gridx.fill_guard_cells(self._velc)
         self._gridy.fill_guard_cells(self._velc)
-
-        # Calculate divergence of the corrected velocity to display stats
-        self._divergence(self._gridc, self._gridx, self._gridy, self._velc, self._divv)
-        self._gridc.fill_guard_cells(self._divv)
-
-        # Calculate total INS time
-        time_ins_end = time.time()
-        self._scalars.stats["ins_time"] = time_ins_end - time_ins_start
-
-        # Calculate stats
-        self._scalars.stats.update(
-            self._stats(
-                self._gridc,
-                self._gridx,
-                self._gridy,
-                self._velc,
-                self._pres,
-                self._divv,
-            )
-        )
@@ -2,3 +2,4 @@ from ._mass_balance import *
 from ._operators import *
 from ._projection import *
 from ._stats import *
+from ._workspace import *
@@ -19,23 +19,24 @@ def get_qin(grid, ivar):
         Mass getting in the domain.
 
     """
-    vel = grid[ivar][0, 0, :, :]
+    vel = grid[ivar][:, 0, :, :]
     dx, dy = grid.dx, grid.dy
 
     bc_type = grid.bc_type[ivar]
+    blocks = grid.boundary_blocks
 
     Qin = 0.0
 
     if grid.type_ == "x-face":
         if bc_type[0] != "outflow" and bc_type[0] != "neumann":
-            Qin += numpy.sum(vel[1:-1, 0]) * dy
+            Qin += numpy.sum(vel[blocks["xlow"], 1:-1, 0]) * dy
         if bc_type[1] != "outflow" and bc_type[1] != "neumann":
-            Qin -= numpy.sum(vel[1:-1, -1]) * dy
+            Qin -= numpy.sum(vel[blocks["xhigh"], 1:-1, -1]) * dy
     elif grid.type_ == "y-face":
         if bc_type[2] != "outflow" and bc_type[2] != "neumann":
-            Qin += numpy.sum(vel[0, 1:-1]) * dx
+            Qin += numpy.sum(vel[blocks["ylow"], 0, 1:-1]) * dx
         if bc_type[3] != "outflow" and bc_type[3] != "neumann":
-            Qin -= numpy.sum(vel[-1, 1:-1]) * dx
+            Qin -= numpy.sum(vel[blocks["yhigh"], -1, 1:-1]) * dx
 
     return Qin
 
@@ -59,23 +60,24 @@ def get_qout(grid, ivar):
 
 
     """
-    vel = grid[ivar][0, 0, :, :]
+    vel = grid[ivar][:, 0, :, :]
     dx, dy = grid.dx, grid.dy
 
     bc_type = grid.bc_type[ivar]
+    blocks = grid.boundary_blocks
 
     Qout = 0.0
 
     if grid.type_ == "x-face":
         if bc_type[0] == "outflow" or bc_type[0] == "neumann":
-            Qout -= numpy.sum(vel[1:-1, 0]) * dy
+            Qout -= numpy.sum(vel[blocks["xlow"], 1:-1, 0]) * dy
         if bc_type[1] == "outflow" or bc_type[1] == "neumann":
-            Qout += numpy.sum(vel[1:-1, -1]) * dy
+            Qout += numpy.sum(vel[blocks["xhigh"], 1:-1, -1]) * dy
     elif grid.type_ == "y-face":
         if bc_type[2] == "outflow" or bc_type[2] == "neumann":
-            Qout -= numpy.sum(vel[0, 1:-1]) * dx
+            Qout -= numpy.sum(vel[blocks["ylow"], 0, 1:-1]) * dx
         if bc_type[3] == "outflow" or bc_type[3] == "neumann":
-            Qout += numpy.sum(vel[-1, 1:-1]) * dx
+            Qout += numpy.sum(vel[blocks["yhigh"], -1, 1:-1]) * dx
 
     return Qout
 
@@ -113,9 +115,10 @@ def rescale_velocity(grid, ivar, Qin, Qout):
         Mass out.
 
     """
-    vel = grid[ivar][0, 0, :, :]
+    vel = grid[ivar][:, 0, :, :]
 
     bc_type = grid.bc_type[ivar]
+    blocks = grid.boundary_blocks
 
     Qinout = 1.0
     if Qout > 0.0:
@@ -123,15 +126,15 @@ def rescale_velocity(grid, ivar, Qin, Qout):
 
     if grid.type_ == "x-face":
         if bc_type[0] == "outflow" or bc_type[0] == "neumann":
-            vel[1:-1, 0] *= Qinout
+            vel[blocks["xlow"], 1:-1, 0] *= Qinout
         if bc_type[1] == "outflow" or bc_type[1] == "neumann":
-            vel[1:-1, -1] *= Qinout
+            vel[blocks["xhigh"], 1:-1, -1] *= Qinout
 
     if grid.type_ == "y-face":
         if bc_type[2] == "outflow" or bc_type[2] == "neumann":
-            vel[0, 1:-1] *= Qinout
+            vel[blocks["ylow"], 0, 1:-1] *= Qinout
         if bc_type[3] == "outflow" or bc_type[3] == "neumann":
-            vel[-1, 1:-1] *= Qinout
+            vel[blocks["yhigh"], -1, 1:-1] *= Qinout
 
     return
 
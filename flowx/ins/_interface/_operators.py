@@ -1,19 +1,25 @@
-"""Routine to compute diffusion terms."""
+"""Routine to compute diffusion and convective terms."""
 
 import numpy
 
 
-def diffusion(grid, ivar, alpha):
-    """Compute the diffusion terms of the variable tagged "ivar".
+def diffusion(f, dx, dy, alpha, out=None, work=None):
+    """Compute the diffusion terms of a variable on one block.
 
     Arguments
     ---------
-    grid : grid object
-        Grid containing data for a given stencil.
-    ivar : string
-        Name of the grid variable to be operated on.
+    f : numpy.ndarray
+        Block data of the variable to be operated on.
+    dx : float
+        Grid spacing in the x-direction.
+    dy : float
+        Grid spacing in the y-direction.
     alpha : float
         Diffusion coefficient.
+    out : numpy.ndarray (optional)
+        Array to store the result, allocated if not given.
+    work : numpy.ndarray (optional)
+        Scratch array with 3 layers of the shape of out.
 
     Returns
     -------
@@ -21,29 +27,41 @@ def diffusion(grid, ivar, alpha):
         Diffusion terms as an array of floats.
 
     """
-    f = grid[ivar][0, 0, :, :]
+    D, (twice, term, _) = _buffers(f.shape[0] - 2, f.shape[1] - 2, out, work)
 
-    dx, dy = grid.dx, grid.dy
+    numpy.multiply(2, f[1:-1, 1:-1], out=twice)
 
-    D = alpha * (
-        (f[1:-1, 2:] - 2 * f[1:-1, 1:-1] + f[1:-1, :-2]) / dx**2
-        + (f[2:, 1:-1] - 2 * f[1:-1, 1:-1] + f[:-2, 1:-1]) / dy**2
-    )
+    numpy.subtract(f[1:-1, 2:], twice, out=D)
+    D += f[1:-1, :-2]
+    D /= dx**2
+
+    numpy.subtract(f[2:, 1:-1], twice, out=term)
+    term += f[:-2, 1:-1]
+    term /= dy**2
+
+    D += term
+    D *= alpha
 
     return D
 
 
-def convective_facex(gridx, gridy, ivar):
+def convective_facex(u, v, dx, dy, out=None, work=None):
     """Convection operator for the x-face grid.
 
     Arguments
     ---------
-    gridx : grid object (x-direction)
-        Grid containing data in x-direction.
-    gridy : grid object (y-direction)
-        Grid containing data in y-direction.
-    ivar: string
-        Name of the grid variable to be operated on.
+    u : numpy.ndarray
+        Block data of the velocity in x-direction.
+    v : numpy.ndarray
+        Block data of the velocity in y-direction.
+    dx : float
+        Grid spacing in the x-direction.
+    dy : float
+        Grid spacing in the y-direction.
+    out : numpy.ndarray (optional)
+        Array to store the result, allocated if not given.
+    work : numpy.ndarray (optional)
+        Scratch array with 3 layers of the shape of out.
 
     Returns
     -------
@@ -51,10 +69,6 @@ def convective_facex(gridx, gridy, ivar):
         Convective terms in the x direction as an array of floats.
 
     """
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
-    dx, dy = gridx.dx, gridy.dy
-
     u_P = u[1:-1, 1:-1]
     u_W = u[1:-1, :-2]
     u_E = u[1:-1, 2:]
@@ -66,25 +80,49 @@ def convective_facex(gridx, gridy, ivar):
     v_nw = v[1:, 1:-2]
     v_ne = v[1:, 2:-1]
 
-    F = -(
-        ((u_P + u_E) ** 2 - (u_W + u_P) ** 2) / (4 * dx)
-        + ((u_P + u_N) * (v_nw + v_ne) - (u_S + u_P) * (v_sw + v_se)) / (4 * dy)
-    )
+    F, (flux, term, factor) = _buffers(u.shape[0] - 2, u.shape[1] - 2, out, work)
+
+    # ((u_P + u_E) ** 2 - (u_W + u_P) ** 2) / (4 * dx)
+    numpy.add(u_P, u_E, out=F)
+    numpy.square(F, out=F)
+    numpy.add(u_W, u_P, out=flux)
+    numpy.square(flux, out=flux)
+    F -= flux
+    F /= 4 * dx
+
+    # ((u_P + u_N) * (v_nw + v_ne) - (u_S + u_P) * (v_sw + v_se)) / (4 * dy)
+    numpy.add(u_P, u_N, out=flux)
+    numpy.add(v_nw, v_ne, out=factor)
+    flux *= factor
+    numpy.add(u_S, u_P, out=term)
+    numpy.add(v_sw, v_se, out=factor)
+    term *= factor
+    flux -= term
+    flux /= 4 * dy
+
+    F += flux
+    numpy.negative(F, out=F)
 
     return F
 
 
-def convective_facey(gridx, gridy, ivar):
-    """Convection operator for the the x-face grid.
+def convective_facey(u, v, dx, dy, out=None, work=None):
+    """Convection operator for the y-face grid.
 
     Arguments
     ---------
-    gridx : grid object (x-direction)
-        Grid containing data in x-direction.
-    gridy : grid object (y-direction)
-        Grid containing data in y-direction.
-    ivar : string
-        Name of the grid variable to be operated on.
+    u : numpy.ndarray
+        Block data of the velocity in x-direction.
+    v : numpy.ndarray
+        Block data of the velocity in y-direction.
+    dx : float
+        Grid spacing in the x-direction.
+    dy : float
+        Grid spacing in the y-direction.
+    out : numpy.ndarray (optional)
+        Array to store the result, allocated if not given.
+    work : numpy.ndarray (optional)
+        Scratch array with 3 layers of the shape of out.
 
     Returns
     -------
@@ -92,10 +130,6 @@ def convective_facey(gridx, gridy, ivar):
         Convective terms in the y direction as an array of floats.
 
     """
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
-    dx, dy = gridx.dx, gridy.dy
-
     v_P = v[1:-1, 1:-1]
     v_W = v[1:-1, :-2]
     v_E = v[1:-1, 2:]
@@ -107,9 +141,37 @@ def convective_facey(gridx, gridy, ivar):
     u_nw = u[2:-1, :-1]
     u_ne = u[2:-1, 1:]
 
-    F = -(
-        ((u_se + u_ne) * (v_P + v_E) - (u_sw + u_nw) * (v_W + v_P)) / (4 * dx)
-        + ((v_P + v_N) ** 2 - (v_S + v_P) ** 2) / (4 * dy)
-    )
+    F, (flux, term, factor) = _buffers(v.shape[0] - 2, v.shape[1] - 2, out, work)
+
+    # ((u_se + u_ne) * (v_P + v_E) - (u_sw + u_nw) * (v_W + v_P)) / (4 * dx)
+    numpy.add(u_se, u_ne, out=F)
+    numpy.add(v_P, v_E, out=factor)
+    F *= factor
+    numpy.add(u_sw, u_nw, out=term)
+    numpy.add(v_W, v_P, out=factor)
+    term *= factor
+    F -= term
+    F /= 4 * dx
+
+    # ((v_P + v_N) ** 2 - (v_S + v_P) ** 2) / (4 * dy)
+    numpy.add(v_P, v_N, out=flux)
+    numpy.square(flux, out=flux)
+    numpy.add(v_S, v_P, out=term)
+    numpy.square(term, out=term)
+    flux -= term
+    flux /= 4 * dy
+
+    F += flux
+    numpy.negative(F, out=F)
 
     return F
+
+
+def _buffers(ny, nx, out, work):
+    """Private method for the result and 3 scratch arrays of an operator."""
+    if out is None:
+        out = numpy.empty((ny, nx))
+    if work is None:
+        work = numpy.empty((3, ny, nx))
+
+    return out, work
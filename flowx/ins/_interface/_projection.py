@@ -1,11 +1,17 @@
 """Routine to compute the predictor, corrector, and divergence."""
 
+from boxkit.library.create import Block
+from boxkit.library.utilities import Action
 import numpy
+from numba import jit
 
 from . import _operators
+from ._workspace import Workspace
 
 
-def predictor_euler(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres):
+def predictor_euler(
+    gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, options=None
+):
     """Velocity prediction step in x and y direction.
 
     Arguments
@@ -22,40 +28,108 @@ def predictor_euler(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres):
         Reynolds number.
     ifac : float
         Time-step size.
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions,
+        'predictor_backend' to select the 'numpy' or 'numba' kernels,
+        'workspace' with scratch buffers and 'diffusion' = 'crank_nicolson'
+        to leave half of the diffusion at the new time level out, which is
+        then added by solving Helmholtz equations for the velocity.
 
     """
-    hx = gridx[hvar][0, 0, :, :]
-    hy = gridy[hvar][0, 0, :, :]
+    if _fused(options):
+        _predictor_fused(
+            gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, 1.0, 0.0, options
+        )
+        return
+
+    workspace = _workspace(options)
+    stencils = _stencil_arrays(gridx, gridy, ivar, workspace)
+
+    _set_action_options(_predictor_euler_block, options)
+    _predictor_euler_block(
+        gridc.blocklist,
+        gridc,
+        gridx,
+        gridy,
+        stencils,
+        ivar,
+        hvar,
+        pres,
+        Re,
+        ifac,
+        ipres,
+        _implicit_fraction(options),
+        workspace,
+    )
 
-    dx, dy = gridx.dx, gridy.dy
+    return
+
+
+@Action(unit=Block)
+def _predictor_euler_block(
+    self,
+    unit,
+    gridc,
+    gridx,
+    gridy,
+    stencils,
+    ivar,
+    hvar,
+    pres,
+    Re,
+    ifac,
+    ipres,
+    theta,
+    workspace,
+):
+    """
+    Euler prediction on a block
+    """
+    tag = unit.tag
+
+    (hx_new, xwork, xfaces, xdiff), (hy_new, ywork, yfaces, ydiff) = _block_rhs(
+        tag, gridx, gridy, ivar, stencils, Re, workspace, theta
+    )
 
-    p = gridc[pres][0, 0, :, :]
+    hx = _block_data(gridx, hvar, tag)[1:-1, xfaces]
+    hy = _block_data(gridy, hvar, tag)[yfaces, 1:-1]
 
-    hx[1:-1, 1:-1] = _operators.convective_facex(
-        gridx, gridy, ivar
-    ) + _operators.diffusion(gridx, ivar, 1 / Re)
-    hy[1:-1, 1:-1] = _operators.convective_facey(
-        gridx, gridy, ivar
-    ) + _operators.diffusion(gridy, ivar, 1 / Re)
+    hx[:] = hx_new
+    hy[:] = hy_new
 
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
+    u = _block_data(gridx, ivar, tag)[1:-1, xfaces]
+    v = _block_data(gridy, ivar, tag)[yfaces, 1:-1]
 
-    u[1:-1, 1:-1] = (
-        u[1:-1, 1:-1]
-        + ifac * hx[1:-1, 1:-1]
-        - ifac * ipres * (p[1:-1, 2:-1] - p[1:-1, 1:-2]) / dx
+    p = _block_data(gridc, pres, tag)
+
+    _update_velocity(
+        u,
+        hx,
+        p[1:-1, _shift(xfaces)],
+        p[1:-1, xfaces],
+        gridx.dx,
+        ifac,
+        ipres,
+        xwork,
     )
-    v[1:-1, 1:-1] = (
-        v[1:-1, 1:-1]
-        + ifac * hy[1:-1, 1:-1]
-        - ifac * ipres * (p[2:-1, 1:-1] - p[1:-2, 1:-1]) / dy
+    _update_velocity(
+        v,
+        hy,
+        p[_shift(yfaces), 1:-1],
+        p[yfaces, 1:-1],
+        gridy.dy,
+        ifac,
+        ipres,
+        ywork,
     )
 
-    return
+    _add_diffusion(u, xdiff, ifac, xwork)
+    _add_diffusion(v, ydiff, ifac, ywork)
 
 
-def predictor_ab2(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres):
+def predictor_ab2(
+    gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, options=None, ratio=1.0
+):
     """Velocity prediction step in x and y direction.
 
     Arguments
@@ -72,44 +146,124 @@ def predictor_ab2(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres):
         Reynolds number.
     ifac : float
         Time-step size.
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions,
+        'predictor_backend' to select the 'numpy' or 'numba' kernels,
+        'workspace' with scratch buffers and 'diffusion' = 'crank_nicolson'
+        to leave half of the diffusion at the new time level out, which is
+        then added by solving Helmholtz equations for the velocity.
+    ratio : float (optional)
+        Ratio of the current to the previous time-step size, the weights
+        1 + ratio/2 and -ratio/2 of H(u^n) and H(u^n-1) keep the scheme
+        second-order accurate with variable time-steps.
 
     """
-    hx_old = gridx[hvar][0, 0, :, :]
-    hy_old = gridy[hvar][0, 0, :, :]
-
-    dx, dy = gridx.dx, gridy.dy
+    hnew, hold = 1.0 + 0.5 * ratio, -0.5 * ratio
+
+    if _fused(options):
+        _predictor_fused(
+            gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, hnew, hold, options
+        )
+        return
+
+    workspace = _workspace(options)
+    stencils = _stencil_arrays(gridx, gridy, ivar, workspace)
+
+    _set_action_options(_predictor_ab2_block, options)
+    _predictor_ab2_block(
+        gridc.blocklist,
+        gridc,
+        gridx,
+        gridy,
+        stencils,
+        ivar,
+        hvar,
+        pres,
+        Re,
+        ifac,
+        ipres,
+        hnew,
+        hold,
+        _implicit_fraction(options),
+        workspace,
+    )
 
-    p = gridc[pres][0, 0, :, :]
+    return
 
-    hx_new = _operators.convective_facex(gridx, gridy, ivar) + _operators.diffusion(
-        gridx, ivar, 1 / Re
-    )
-    hy_new = _operators.convective_facey(gridx, gridy, ivar) + _operators.diffusion(
-        gridy, ivar, 1 / Re
-    )
 
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
+@Action(unit=Block)
+def _predictor_ab2_block(
+    self,
+    unit,
+    gridc,
+    gridx,
+    gridy,
+    stencils,
+    ivar,
+    hvar,
+    pres,
+    Re,
+    ifac,
+    ipres,
+    hnew,
+    hold,
+    theta,
+    workspace,
+):
+    """
+    Adams-Bashforth prediction on a block
+    """
+    tag = unit.tag
 
-    u[1:-1, 1:-1] = (
-        u[1:-1, 1:-1]
-        + ifac * (1.5 * hx_new - 0.5 * hx_old[1:-1, 1:-1])
-        - ifac * ipres * (p[1:-1, 2:-1] - p[1:-1, 1:-2]) / dx
+    (hx_new, xwork, xfaces, xdiff), (hy_new, ywork, yfaces, ydiff) = _block_rhs(
+        tag, gridx, gridy, ivar, stencils, Re, workspace, theta
     )
 
-    v[1:-1, 1:-1] = (
-        v[1:-1, 1:-1]
-        + ifac * (1.5 * hy_new - 0.5 * hy_old[1:-1, 1:-1])
-        - ifac * ipres * (p[2:-1, 1:-1] - p[1:-2, 1:-1]) / dy
+    hx_old = _block_data(gridx, hvar, tag)[1:-1, xfaces]
+    hy_old = _block_data(gridy, hvar, tag)[yfaces, 1:-1]
+
+    u = _block_data(gridx, ivar, tag)[1:-1, xfaces]
+    v = _block_data(gridy, ivar, tag)[yfaces, 1:-1]
+
+    p = _block_data(gridc, pres, tag)
+
+    # Blend hnew * H(u^n) + hold * H(u^n-1) into the first scratch layer
+    for h_new, h_old, work in [(hx_new, hx_old, xwork), (hy_new, hy_old, ywork)]:
+        numpy.multiply(hnew, h_new, out=work[0])
+        numpy.multiply(hold, h_old, out=work[1])
+        work[0] += work[1]
+
+    _update_velocity(
+        u,
+        xwork[0],
+        p[1:-1, _shift(xfaces)],
+        p[1:-1, xfaces],
+        gridx.dx,
+        ifac,
+        ipres,
+        xwork,
+    )
+    _update_velocity(
+        v,
+        ywork[0],
+        p[_shift(yfaces), 1:-1],
+        p[yfaces, 1:-1],
+        gridy.dy,
+        ifac,
+        ipres,
+        ywork,
     )
 
-    hx_old[1:-1, 1:-1] = hx_new
-    hy_old[1:-1, 1:-1] = hy_new
+    _add_diffusion(u, xdiff, ifac, xwork)
+    _add_diffusion(v, ydiff, ifac, ywork)
 
-    return
+    hx_old[:] = hx_new
+    hy_old[:] = hy_new
 
 
-def predictor_rk3(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, hconst):
+def predictor_rk3(
+    gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, hconst, options=None
+):
     """Velocity prediction step in x and y direction.
 
     Arguments
@@ -126,34 +280,49 @@ def predictor_rk3(gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, hconst
         Reynolds number.
     ifac : float
         Time-step size.
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions and
+        'workspace' with scratch buffers.
 
     """
-    hx = gridx[hvar][0, 0, :, :]
-    hy = gridy[hvar][0, 0, :, :]
+    workspace = _workspace(options)
+    stencils = _stencil_arrays(gridx, gridy, ivar, workspace)
 
-    dx, dy = gridx.dx, gridy.dy
+    _set_action_options(_predictor_rk3_block, options)
+    _predictor_rk3_block(
+        gridc.blocklist, gridx, gridy, stencils, ivar, hvar, Re, ifac, hconst, workspace
+    )
+
+    return
 
-    p = gridc[pres][0, 0, :, :]
 
-    hx[1:-1, 1:-1] = (
-        _operators.convective_facex(gridx, gridy, ivar)
-        + _operators.diffusion(gridx, ivar, 1 / Re)
-    ) + hconst * hx[1:-1, 1:-1]
-    hy[1:-1, 1:-1] = (
-        _operators.convective_facey(gridx, gridy, ivar)
-        + _operators.diffusion(gridy, ivar, 1 / Re)
-    ) + hconst * hy[1:-1, 1:-1]
+@Action(unit=Block)
+def _predictor_rk3_block(
+    self, unit, gridx, gridy, stencils, ivar, hvar, Re, ifac, hconst, workspace
+):
+    """
+    Runge-Kutta stage prediction on a block
+    """
+    tag = unit.tag
 
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
+    (hx_new, xwork, xfaces, _), (hy_new, ywork, yfaces, _) = _block_rhs(
+        tag, gridx, gridy, ivar, stencils, Re, workspace
+    )
 
-    u[1:-1, 1:-1] = u[1:-1, 1:-1] + ifac * hx[1:-1, 1:-1]
-    v[1:-1, 1:-1] = v[1:-1, 1:-1] + ifac * hy[1:-1, 1:-1]
+    hx = _block_data(gridx, hvar, tag)[1:-1, xfaces]
+    hy = _block_data(gridy, hvar, tag)[yfaces, 1:-1]
 
-    return
+    u = _block_data(gridx, ivar, tag)[1:-1, xfaces]
+    v = _block_data(gridy, ivar, tag)[yfaces, 1:-1]
 
+    for vel, h, h_new, work in [(u, hx, hx_new, xwork), (v, hy, hy_new, ywork)]:
+        h *= hconst
+        h += h_new
+        numpy.multiply(ifac, h, out=work[0])
+        vel += work[0]
 
-def divergence(gridc, gridx, gridy, ivar, dvar, ifac=1.0):
+
+def divergence(gridc, gridx, gridy, ivar, dvar, ifac=1.0, options=None):
     """Compute the divergence of the variable tagged "ivar".
 
     Arguments
@@ -170,23 +339,44 @@ def divergence(gridc, gridx, gridy, ivar, dvar, ifac=1.0):
         Name of the cell-centered grid variable to store divergence.
     ifac : float (optional)
         Multiplying factor for time-step; default: 1.0.
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions and
+        'workspace' with scratch buffers.
 
     """
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
+    _set_action_options(_divergence_block, options)
+    _divergence_block(
+        gridc.blocklist, gridc, gridx, gridy, ivar, dvar, ifac, _workspace(options)
+    )
 
-    div = gridc[dvar][0, 0, :, :]
+    return
 
-    dx, dy = gridc.dx, gridc.dy
 
-    div[1:-1, 1:-1] = (
-        (u[1:-1, 1:] - u[1:-1, :-1]) / dx + (v[1:, 1:-1] - v[:-1, 1:-1]) / dy
-    ) / ifac
+@Action(unit=Block)
+def _divergence_block(self, unit, gridc, gridx, gridy, ivar, dvar, ifac, workspace):
+    """
+    Divergence on a block
+    """
+    tag = unit.tag
 
-    return
+    u = _block_data(gridx, ivar, tag)
+    v = _block_data(gridy, ivar, tag)
 
+    div = _block_data(gridc, dvar, tag)[1:-1, 1:-1]
+    work = workspace.get(("divergence", tag), div.shape)
+
+    dx, dy = gridc.dx, gridc.dy
 
-def corrector(gridc, gridx, gridy, ivar, pvar, delp, ifac, ipres):
+    # ((u_E - u_W) / dx + (v_N - v_S) / dy) / ifac
+    numpy.subtract(u[1:-1, 1:], u[1:-1, :-1], out=div)
+    div /= dx
+    numpy.subtract(v[1:, 1:-1], v[:-1, 1:-1], out=work)
+    work /= dy
+    div += work
+    div /= ifac
+
+
+def corrector(gridc, gridx, gridy, ivar, pvar, delp, ifac, ipres, options=None):
     """Velocity correction in x and y direction.
 
     Arguments
@@ -203,18 +393,488 @@ def corrector(gridc, gridx, gridy, ivar, pvar, delp, ifac, ipres):
         Name of the grid variable of the pressure solution.
     ifac : float
         Time-step size.
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions and
+        'workspace' with scratch buffers.
 
     """
-    u = gridx[ivar][0, 0, :, :]
-    v = gridy[ivar][0, 0, :, :]
-    p = gridc[pvar][0, 0, :, :]
-    dp = gridc[delp][0, 0, :, :]
+    _set_action_options(_corrector_block, options)
+    _corrector_block(
+        gridc.blocklist,
+        gridc,
+        gridx,
+        gridy,
+        ivar,
+        pvar,
+        delp,
+        ifac,
+        ipres,
+        _workspace(options),
+    )
+
+    return
+
+
+@Action(unit=Block)
+def _corrector_block(
+    self, unit, gridc, gridx, gridy, ivar, pvar, delp, ifac, ipres, workspace
+):
+    """
+    Velocity correction on a block
+    """
+    tag = unit.tag
+
+    u = _block_data(gridx, ivar, tag)
+    v = _block_data(gridy, ivar, tag)
+    p = _block_data(gridc, pvar, tag)
+    dp = _block_data(gridc, delp, tag)
 
     dx, dy = gridx.dx, gridy.dy
 
-    u[:, :] = u[:, :] - ifac * (dp[:, 1:] - dp[:, :-1]) / dx
-    v[::] = v[:, :] - ifac * (dp[1:, :] - dp[:-1, :]) / dy
+    # u - ifac * (dp_E - dp_W) / dx
+    work = workspace.get(("corrector_x", tag), u.shape)
+    numpy.subtract(dp[:, 1:], dp[:, :-1], out=work)
+    work *= ifac
+    work /= dx
+    u -= work
 
-    p[:, :] = ipres * p[:, :] + dp[:, :]
+    work = workspace.get(("corrector_y", tag), v.shape)
+    numpy.subtract(dp[1:, :], dp[:-1, :], out=work)
+    work *= ifac
+    work /= dy
+    v -= work
 
-    return
+    p *= ipres
+    p += dp
+
+
+def _predictor_fused(
+    gridc, gridx, gridy, ivar, hvar, pres, Re, ifac, ipres, hnew, hold, options
+):
+    """
+    Private method for the predictor with compiled kernels, the velocity
+    is updated with ifac * (hnew * H(u^n) + hold * H(u^n-1)), the explicit
+    part of implicit diffusion and the pressure gradient
+    """
+    stencils = _stencil_arrays(gridx, gridy, ivar, _workspace(options), copy=True)
+
+    _set_action_options(_predictor_fused_block, options)
+    _predictor_fused_block(
+        gridc.blocklist,
+        gridc,
+        gridx,
+        gridy,
+        stencils,
+        ivar,
+        hvar,
+        pres,
+        Re,
+        ifac,
+        ipres,
+        hnew,
+        hold,
+        _implicit_fraction(options),
+    )
+
+
+@Action(unit=Block)
+def _predictor_fused_block(
+    self,
+    unit,
+    gridc,
+    gridx,
+    gridy,
+    stencils,
+    ivar,
+    hvar,
+    pres,
+    Re,
+    ifac,
+    ipres,
+    hnew,
+    hold,
+    theta,
+):
+    """
+    Compiled prediction on a block
+    """
+    tag = unit.tag
+
+    # Diffusion in H(u) and its explicit part outside of H(u) when implicit
+    nu, nu_explicit = (1 / Re, 0.0) if theta == 0.0 else (0.0, (1 - theta) / Re)
+
+    xfaces = _face_range(gridx, ivar, tag, "x")
+    yfaces = _face_range(gridy, ivar, tag, "y")
+
+    p = _block_data(gridc, pres, tag)
+
+    us, vs, offset = stencils["x"]
+    jit_predictor_facex(
+        us[tag],
+        vs[tag],
+        offset,
+        p,
+        _block_data(gridx, ivar, tag),
+        _block_data(gridx, hvar, tag),
+        xfaces.start,
+        xfaces.stop,
+        gridx.dx,
+        gridx.dy,
+        nu,
+        nu_explicit,
+        ifac,
+        ipres,
+        hnew,
+        hold,
+    )
+
+    us, vs, offset = stencils["y"]
+    jit_predictor_facey(
+        us[tag],
+        vs[tag],
+        offset,
+        p,
+        _block_data(gridy, ivar, tag),
+        _block_data(gridy, hvar, tag),
+        yfaces.start,
+        yfaces.stop,
+        gridy.dx,
+        gridy.dy,
+        nu,
+        nu_explicit,
+        ifac,
+        ipres,
+        hnew,
+        hold,
+    )
+
+
+def _fused(options):
+    """
+    Private method to check if compiled predictor kernels are selected
+    """
+    backend = (options or dict()).get("predictor_backend", "numpy")
+
+    if backend not in ["numpy", "numba"]:
+        raise ValueError('Predictor backend "{}" not implemented'.format(backend))
+
+    return backend == "numba"
+
+
+def _implicit_fraction(options):
+    """
+    Private method for the fraction of diffusion treated implicitly
+    """
+    diffusion = (options or dict()).get("diffusion", "explicit")
+    fractions = {"explicit": 0.0, "crank_nicolson": 0.5}
+
+    if diffusion not in fractions:
+        raise ValueError('Diffusion scheme "{}" not implemented'.format(diffusion))
+
+    return fractions[diffusion]
+
+
+def _set_action_options(action, options):
+    """
+    Private method to set threading options of a block action
+    """
+    options = options or dict()
+
+    action.nthreads = options.get("nthreads", 1)
+    action.backend = options.get("backend", "serial")
+    action.monitor = options.get("monitor", False)
+
+
+def _workspace(options):
+    """
+    Private method for the workspace in options, a new one when missing
+    """
+    workspace = (options or dict()).get("workspace")
+
+    return Workspace() if workspace is None else workspace
+
+
+def _block_data(grid, varkey, tag):
+    """
+    Private method for data of a block as a plain array view
+    """
+    return grid[varkey][tag, 0, :, :].view(numpy.ndarray)
+
+
+def _stencil_arrays(gridx, gridy, ivar, workspace, copy=False):
+    """
+    Private method for velocity arrays read by the predictor stencils
+
+    Faces shared by two blocks are updated on both blocks and their stencils
+    reach one layer past the block along the face normal, so grids with
+    multiple blocks use copies extended with neighbor values, as do grids
+    with periodic faces, whose stencils wrap around the domain. The offset is
+    the index of the first face in the stencil result. Kernels that update
+    velocity in place while reading stencils ask for a copy.
+    """
+    grids = dict(u=gridx, v=gridy)
+
+    periodic = "periodic" in gridx.bc_type[ivar] + gridy.bc_type[ivar]
+
+    if gridx.nblocks == 1 and not periodic:
+        u, v = [
+            _copy(workspace, "stencil_" + name, grid[ivar]) if copy else grid[ivar]
+            for name, grid in grids.items()
+        ]
+        u, v = u[:, 0, :, :].view(numpy.ndarray), v[:, 0, :, :].view(numpy.ndarray)
+        return dict(x=(u, v, 1), y=(u, v, 1))
+
+    stencils = dict()
+    for axis in ["x", "y"]:
+        extended = []
+        for name, grid in grids.items():
+            shape = list(grid[ivar].shape)
+            shape[3 if axis == "x" else 2] += 2
+            out = workspace.get(("stencil_" + name, axis), tuple(shape))
+            extended.append(grid.extended_array(ivar, axis, out=out)[:, 0, :, :])
+
+        stencils[axis] = (*extended, 0)
+
+    return stencils
+
+
+def _copy(workspace, name, data):
+    """
+    Private method to copy data into a buffer of the workspace
+    """
+    buffer = workspace.get(name, data.shape)
+    numpy.copyto(buffer, data)
+
+    return buffer
+
+
+def _update_velocity(vel, rhs, p_high, p_low, delta, ifac, ipres, work):
+    """
+    Private method for vel = vel + ifac * rhs - ifac * ipres * (p_high - p_low) / delta
+    in place, rhs may be the first layer of work
+    """
+    numpy.multiply(ifac, rhs, out=work[0])
+    numpy.subtract(p_high, p_low, out=work[1])
+    work[1] *= ifac * ipres
+    work[1] /= delta
+
+    vel += work[0]
+    vel -= work[1]
+
+
+def _add_diffusion(vel, diffusion, ifac, work):
+    """
+    Private method for vel = vel + ifac * diffusion in place, nothing is
+    added when diffusion is None
+    """
+    if diffusion is None:
+        return
+
+    numpy.multiply(ifac, diffusion, out=work[0])
+    vel += work[0]
+
+
+def _face_range(grid, ivar, tag, axis):
+    """
+    Private method for the faces of a block updated along the face normal,
+    faces at the domain boundary keep their boundary values, except at low
+    periodic faces, which are updated and copied to the high faces when
+    guard cells are filled
+    """
+    if axis == "x":
+        low, high, size, face = "xlow", "xhigh", grid.nxb, 0
+    else:
+        low, high, size, face = "ylow", "yhigh", grid.nyb, 2
+
+    neighdict = grid.blocklist[tag].neighdict
+    periodic = grid.bc_type[ivar][face] == "periodic"
+
+    start = 0 if neighdict[low] is not None or periodic else 1
+    stop = size if neighdict[high] is not None else size - 1
+
+    return slice(start, stop)
+
+
+def _shift(faces):
+    """
+    Private method for cells after each face of a range
+    """
+    return slice(faces.start + 1, faces.stop + 1)
+
+
+def _block_rhs(tag, gridx, gridy, ivar, stencils, Re, workspace, theta=0.0):
+    """
+    Private method for convective + diffusion terms on faces of a block
+
+    Returns the terms, scratch layers of the same shape, the faces and the
+    explicit diffusion for each direction, all in buffers of the workspace.
+    With a fraction theta of diffusion treated implicitly, the terms are
+    only convective and the remaining diffusion is returned separately,
+    otherwise it is None.
+    """
+    dx, dy = gridx.dx, gridy.dy
+
+    rhs = []
+    for axis, grid, convective in [
+        ("x", gridx, _operators.convective_facex),
+        ("y", gridy, _operators.convective_facey),
+    ]:
+        faces = _face_range(grid, ivar, tag, axis)
+        u, v, offset = stencils[axis]
+        u, v = u[tag], v[tag]
+
+        # Velocity along the face normal is diffused
+        f = u if axis == "x" else v
+        shape = (f.shape[0] - 2, f.shape[1] - 2)
+
+        h = workspace.get(("rhs", axis, tag), shape)
+        diffusion = workspace.get(("diffusion", axis, tag), shape)
+        work = workspace.get(("work", axis, tag), (3,) + shape)
+
+        convective(u, v, dx, dy, out=h, work=work)
+        _operators.diffusion(f, dx, dy, (1 - theta) / Re, out=diffusion, work=work)
+
+        if theta == 0.0:
+            h += diffusion
+
+        window = slice(faces.start - offset, faces.stop - offset)
+        if axis == "x":
+            window = (slice(None), window)
+        else:
+            window = (window, slice(None))
+
+        rhs.append(
+            (
+                h[window],
+                work[(slice(None),) + window],
+                faces,
+                None if theta == 0.0 else diffusion[window],
+            )
+        )
+
+    return rhs
+
+
+@jit(nopython=True)
+def jit_predictor_facex(
+    us,
+    vs,
+    offset,
+    p,
+    u,
+    h,
+    start,
+    stop,
+    dx,
+    dy,
+    nu,
+    nu_explicit,
+    ifac,
+    ipres,
+    hnew,
+    hold,
+):
+    """Convection, diffusion, pressure gradient and update of x-faces in one pass.
+
+    Diffusion with coefficient nu enters H(u), nu_explicit weights diffusion
+    added outside of the time-stepping blend.
+
+    Stencils read us and vs, the face i of u is at column i + 1 - offset of us.
+    """
+    ny = u.shape[0] - 2
+
+    for j in range(1, ny + 1):
+        for i in range(start, stop):
+            s = i + 1 - offset
+
+            u_P = us[j, s]
+            u_W = us[j, s - 1]
+            u_E = us[j, s + 1]
+            u_S = us[j - 1, s]
+            u_N = us[j + 1, s]
+
+            v_sw = vs[j - 1, s]
+            v_se = vs[j - 1, s + 1]
+            v_nw = vs[j, s]
+            v_ne = vs[j, s + 1]
+
+            lap = (u_E - 2 * u_P + u_W) / dx**2 + (u_N - 2 * u_P + u_S) / dy**2
+
+            rhs = (
+                -(
+                    ((u_P + u_E) ** 2 - (u_W + u_P) ** 2) / (4 * dx)
+                    + ((u_P + u_N) * (v_nw + v_ne) - (u_S + u_P) * (v_sw + v_se))
+                    / (4 * dy)
+                )
+                + nu * lap
+            )
+
+            u[j, i] = (
+                u[j, i]
+                + ifac * (hnew * rhs + hold * h[j, i])
+                + ifac * nu_explicit * lap
+                - ifac * ipres * (p[j, i + 1] - p[j, i]) / dx
+            )
+            h[j, i] = rhs
+
+
+@jit(nopython=True)
+def jit_predictor_facey(
+    us,
+    vs,
+    offset,
+    p,
+    v,
+    h,
+    start,
+    stop,
+    dx,
+    dy,
+    nu,
+    nu_explicit,
+    ifac,
+    ipres,
+    hnew,
+    hold,
+):
+    """Convection, diffusion, pressure gradient and update of y-faces in one pass.
+
+    Diffusion with coefficient nu enters H(u), nu_explicit weights diffusion
+    added outside of the time-stepping blend.
+
+    Stencils read us and vs, the face j of v is at row j + 1 - offset of vs.
+    """
+    nx = v.shape[1] - 2
+
+    for j in range(start, stop):
+        s = j + 1 - offset
+        for i in range(1, nx + 1):
+            v_P = vs[s, i]
+            v_W = vs[s, i - 1]
+            v_E = vs[s, i + 1]
+            v_S = vs[s - 1, i]
+            v_N = vs[s + 1, i]
+
+            u_sw = us[s, i - 1]
+            u_se = us[s, i]
+            u_nw = us[s + 1, i - 1]
+            u_ne = us[s + 1, i]
+
+            lap = (v_E - 2 * v_P + v_W) / dx**2 + (v_N - 2 * v_P + v_S) / dy**2
+
+            rhs = (
+                -(
+                    ((u_se + u_ne) * (v_P + v_E) - (u_sw + u_nw) * (v_W + v_P))
+                    / (4 * dx)
+                    + ((v_P + v_N) ** 2 - (v_S + v_P) ** 2) / (4 * dy)
+                )
+                + nu * lap
+            )
+
+            v[j, i] = (
+                v[j, i]
+                + ifac * (hnew * rhs + hold * h[j, i])
+                + ifac * nu_explicit * lap
+                - ifac * ipres * (p[j + 1, i] - p[j, i]) / dy
+            )
+            h[j, i] = rhs
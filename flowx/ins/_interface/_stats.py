@@ -1,10 +1,20 @@
 """Routine to gather statistics."""
 
+from boxkit.library.create import Block
+from boxkit.library.utilities import Action
 import numpy
+from numba import jit
 
+from ._projection import _block_data, _implicit_fraction, _set_action_options
 
-def stats(gridc, gridx, gridy, ivar, pvar, divc):
-    """Velocity correction in x and y direction.
+
+def stats(gridc, gridx, gridy, ivar, pvar, divc, options=None, write_div=False):
+    """Extrema of velocity, pressure and divergence with divergence and CFL norms.
+
+    The divergence is reduced in a single compiled pass over each block,
+    which optionally writes the divergence of the velocity as well, so the
+    final divergence of a time-step does not need a separate operator call.
+    Guard cells of the divergence are not filled.
 
     Arguments
     ---------
@@ -20,22 +30,29 @@ def stats(gridc, gridx, gridy, ivar, pvar, divc):
         Name of the grid variable of the pressure solution
     divc : string
         Name of the grid variable for divergence
+    options : dictionary (optional)
+        'nthreads', 'backend' and 'monitor' options of block actions
+    write_div : bool (optional)
+        Compute the divergence into divc instead of reading it
 
     Returns
     -------
     ins_stats : dictionary for stats
+        Extrema of all fields, with the divergence over interior cells,
+        'l2_div' the L2 norm of the divergence and 'conv_rate' the largest
+        |u|/dx + |v|/dy of velocities interpolated to cell centers
 
     """
-    u = gridx[ivar]
-    v = gridy[ivar]
+    _set_action_options(_stats_block, options)
+    block_stats = _stats_block(
+        gridc.blocklist, gridc, gridx, gridy, ivar, pvar, divc, write_div
+    )
 
-    p = gridc[pvar]
-    div = gridc[divc]
+    block_extrema = numpy.array([extrema for extrema, _ in block_stats])
+    block_norms = numpy.array([norms for _, norms in block_stats])
 
-    max_u, min_u = numpy.amax(u), numpy.amin(u)
-    max_v, min_v = numpy.amax(v), numpy.amin(v)
-    max_p, min_p = numpy.amax(p), numpy.amin(p)
-    max_div, min_div = numpy.amax(div), numpy.amin(div)
+    max_u, max_v, max_p, max_div = numpy.amax(block_extrema[:, :, 0], axis=0)
+    min_u, min_v, min_p, min_div = numpy.amin(block_extrema[:, :, 1], axis=0)
 
     ins_stats = dict()
     ins_stats["max_u"] = max_u
@@ -46,5 +63,113 @@ def stats(gridc, gridx, gridy, ivar, pvar, divc):
     ins_stats["min_p"] = min_p
     ins_stats["max_div"] = max_div
     ins_stats["min_div"] = min_div
+    ins_stats["l2_div"] = numpy.sqrt(numpy.sum(block_norms[:, 0]) * gridc.dx * gridc.dy)
+    ins_stats["conv_rate"] = numpy.amax(block_norms[:, 1])
 
     return ins_stats
+
+
+def stability_limits(gridc, Re, ins_stats, options=None):
+    """Time-step limits of the explicit convective and viscous terms.
+
+    Arguments
+    ---------
+    gridc : grid object (cell center)
+        Grid contaning data in cell center
+    Re : float
+        Reynolds number
+    ins_stats : dictionary
+        Stats with the extrema of the velocity
+    options : dictionary (optional)
+        'time_stepping' scheme, default 'ab2', and 'diffusion' scheme,
+        implicit diffusion has no viscous limit
+
+    Returns
+    -------
+    limits : dictionary
+        'dt_conv' time-step at a CFL number of one and 'dt_visc' time-step
+        at the stability limit of explicit diffusion, 0.5*Re/(1/dx^2 + 1/dy^2)
+        for 'euler', half of it for 'ab2' and 1.25 times it for 'rk3'
+
+    """
+    umax = max(abs(ins_stats["max_u"]), abs(ins_stats["min_u"]))
+    vmax = max(abs(ins_stats["max_v"]), abs(ins_stats["min_v"]))
+
+    idx, idy = 1.0 / gridc.dx, 1.0 / gridc.dy
+    rate = umax * idx + vmax * idy
+
+    limits = dict()
+    limits["dt_conv"] = 1.0 / rate if rate > 0.0 else numpy.inf
+    limits["dt_visc"] = _diffusion_factor(options) * 0.5 * Re / (idx**2 + idy**2)
+
+    if _implicit_fraction(options) >= 0.5:
+        limits["dt_visc"] = numpy.inf
+
+    return limits
+
+
+def _diffusion_factor(options):
+    """
+    Private method for the viscous time-step limit of a time-stepping scheme
+    relative to forward Euler, from the extent of its stability region
+    along the negative real axis
+    """
+    time_stepping = (options or dict()).get("time_stepping", "ab2")
+    factors = {"euler": 1.0, "ab2": 0.5, "rk3": 1.25}
+
+    if time_stepping not in factors:
+        raise ValueError('Time stepping "{}" not implemented'.format(time_stepping))
+
+    return factors[time_stepping]
+
+
+@Action(unit=Block)
+def _stats_block(self, unit, gridc, gridx, gridy, ivar, pvar, divc, write_div):
+    """
+    Extrema and norms of fields on a block
+    """
+    tag = unit.tag
+
+    u = _block_data(gridx, ivar, tag)
+    v = _block_data(gridy, ivar, tag)
+    p = _block_data(gridc, pvar, tag)
+
+    max_div, min_div, sumsq, rate = jit_divergence_stats(
+        u, v, _block_data(gridc, divc, tag), gridc.dx, gridc.dy, write_div
+    )
+
+    extrema = [(numpy.amax(data), numpy.amin(data)) for data in [u, v, p]]
+    extrema.append((max_div, min_div))
+
+    return extrema, (sumsq, rate)
+
+
+@jit(nopython=True)
+def jit_divergence_stats(u, v, div, dx, dy, write_div):
+    """Extrema and sum of squares of the divergence with the convective rate.
+
+    The divergence is computed, or read, and reduced on interior cells in
+    a single pass, which also finds the largest |u|/dx + |v|/dy of
+    velocities interpolated to cell centers.
+    """
+    ny, nx = div.shape[0] - 2, div.shape[1] - 2
+
+    dmax, dmin = -numpy.inf, numpy.inf
+    sumsq, rate = 0.0, 0.0
+
+    for j in range(1, ny + 1):
+        for i in range(1, nx + 1):
+            u_W, u_E = u[j, i - 1], u[j, i]
+            v_S, v_N = v[j - 1, i], v[j, i]
+
+            if write_div:
+                div[j, i] = (u_E - u_W) / dx + (v_N - v_S) / dy
+
+            d = div[j, i]
+            dmax = max(dmax, d)
+            dmin = min(dmin, d)
+            sumsq += d * d
+
+            rate = max(rate, abs(u_W + u_E) / (2 * dx) + abs(v_S + v_N) / (2 * dy))
+
+    return dmax, dmin, sumsq, rate
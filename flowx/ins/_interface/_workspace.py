@@ -0,0 +1,46 @@
+"""Arena of scratch buffers for the INS unit."""
+
+import numpy
+
+
+class Workspace(object):
+    """
+    Named scratch buffers allocated once and reused across time steps
+
+    Operators ask for buffers by name, usually tagged with the block, so
+    blocks processed on different threads never share a buffer.
+    """
+
+    def __init__(self):
+        """Constructor for an empty workspace"""
+        self._buffers = dict()
+
+    def get(self, name, shape):
+        """
+        Buffer of given name, allocated on first use or when the shape changes
+
+        Arguments
+        ---------
+        name : hashable
+               Name of the buffer
+
+        shape : tuple
+                Shape of the buffer
+
+        Returns
+        -------
+        buffer : numpy.ndarray
+                 Buffer with undefined values
+        """
+        buffer = self._buffers.get(name)
+
+        if buffer is None or buffer.shape != shape:
+            buffer = numpy.empty(shape)
+            self._buffers[name] = buffer
+
+        return buffer
+
+    @property
+    def nbytes(self):
+        """Total size of all buffers in bytes"""
+        return sum(buffer.nbytes for buffer in self._buffers.values())
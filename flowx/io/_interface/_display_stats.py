@@ -30,5 +30,8 @@ def display_stats(scalars):
             scalars.stats["max_div"], scalars.stats["min_div"]
         )
     )
+    print(
+        "L2 DIV, CFL   : {}, {}".format(scalars.stats["l2_div"], scalars.stats["cfl"])
+    )
     print("Qin, Qout     : {}, {}".format(scalars.stats["qin"], scalars.stats["qout"]))
     print("\n")
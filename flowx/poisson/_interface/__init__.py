@@ -1,2 +1,9 @@
 from ._solvers import *
 from ._helpers import *
+from ._operator import *
+from ._multigrid import *
+from ._preconditioners import *
+from ._spectral import *
+from ._cache import *
+from ._sor import *
+from ._helmholtz import *
@@ -0,0 +1,242 @@
+"""Process-level cache of sparse LU factorizations of the Poisson matrix."""
+
+import collections
+import hashlib
+import os
+
+import numpy
+from numba import jit
+
+from ._helpers import build_sparse_matrix, assemble_sparse_matrix
+
+
+class FactorizationCache(object):
+    """
+    Least-recently-used cache of LU factorizations with a memory cap
+
+    Entries are keyed on (nx, ny, dx, dy, bc_type, solver, dtype) and shared by all
+    Poisson units in the process. Factorizations can also be written to and
+    read from a directory, so that repeated runs skip the factorization.
+    """
+
+    def __init__(self, max_bytes=2**30):
+        """
+        Constructor for the cache
+
+        Arguments
+        ---------
+        max_bytes : integer
+                    Upper bound on memory held by cached factorizations
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, key):
+        """Return the (lu, matrix) pair for key, or None if not cached"""
+        if key not in self._entries:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key][:2]
+
+    def put(self, key, lu, matrix, dtype=float):
+        """Add a factorization and evict least recently used entries over the cap"""
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[2]
+
+        nbytes = _factorization_nbytes(lu, matrix, dtype)
+        self._entries[key] = (lu, matrix, nbytes)
+        self.nbytes += nbytes
+
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+
+    def discard(self, key):
+        """Remove the entry for key if it is cached"""
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        """Remove all entries held in memory"""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def load(self, key, cache_dir):
+        """Read a factorization from cache_dir, None if it was never saved"""
+        filename = self._filename(key, cache_dir)
+        if filename is None or not os.path.exists(filename):
+            return None
+
+        with numpy.load(filename) as data:
+            return TriangularLU(**{name: data[name] for name in data.files})
+
+    def save(self, key, lu, cache_dir):
+        """Write the factors of a SuperLU object to cache_dir"""
+        filename = self._filename(key, cache_dir)
+        if filename is None:
+            return
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        lower, upper = lu.L.tocsr(), lu.U.tocsr()
+        numpy.savez(
+            filename,
+            lower_data=lower.data,
+            lower_indices=lower.indices,
+            lower_indptr=lower.indptr,
+            upper_data=upper.data,
+            upper_indices=upper.indices,
+            upper_indptr=upper.indptr,
+            perm_r=lu.perm_r,
+            perm_c=lu.perm_c,
+        )
+
+    def _filename(self, key, cache_dir):
+        """Private method to map a key to a file in cache_dir"""
+        if cache_dir is None:
+            return None
+
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(cache_dir, "superlu-{}.npz".format(digest))
+
+
+factorization_cache = FactorizationCache()
+
+
+def cached_sparse_matrix(grid, ivar, solver, cache_dir=None, dtype=float):
+    """Fetch the Poisson matrix and its LU decomposition from the cache.
+
+    The factorization is computed with build_sparse_matrix, or read from
+    the cache directory, only if it is not already held in memory.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    solver : string
+        Name of the Poisson solver using the factorization.
+    cache_dir : string
+        Directory to persist factorizations, None to keep them in memory only.
+    dtype : numpy data type
+        Precision of the LU decomposition.
+
+    Returns
+    -------
+    lu : SuperLU or TriangularLU object
+    matrix : CSR format matrix
+
+    """
+    key = (
+        grid.nx,
+        grid.ny,
+        grid.dx,
+        grid.dy,
+        tuple(grid.bc_type[ivar]),
+        solver,
+        numpy.dtype(dtype).name,
+    )
+
+    entry = factorization_cache.get(key)
+    if entry is not None:
+        return entry
+
+    lu = factorization_cache.load(key, cache_dir)
+    if lu is not None:
+        matrix = assemble_sparse_matrix(grid, ivar)
+    else:
+        lu, matrix = build_sparse_matrix(grid, ivar, dtype)
+        factorization_cache.save(key, lu, cache_dir)
+
+    factorization_cache.put(key, lu, matrix, dtype)
+
+    return lu, matrix
+
+
+class TriangularLU(object):
+    """
+    LU factorization read back from disk
+
+    Mirrors the solve method of SuperLU objects, Pr A Pc = L U, using
+    compiled triangular solves on the stored factors.
+    """
+
+    def __init__(
+        self,
+        lower_data,
+        lower_indices,
+        lower_indptr,
+        upper_data,
+        upper_indices,
+        upper_indptr,
+        perm_r,
+        perm_c,
+    ):
+        self.lower = (lower_data, lower_indices, lower_indptr)
+        self.upper = (upper_data, upper_indices, upper_indptr)
+        self.perm_r = perm_r
+        self.perm_c = perm_c
+        self.nnz = lower_data.size + upper_data.size
+
+    def solve(self, rhs):
+        """Solve A x = rhs, with one right-hand side per column of a 2D rhs"""
+        work = numpy.empty_like(rhs, dtype=float)
+        work[self.perm_r] = rhs
+
+        for column in work.reshape(work.shape[0], -1).T:
+            jit_lower_solve(*self.lower, column)
+            jit_upper_solve(*self.upper, column)
+
+        return work[self.perm_c]
+
+
+def _factorization_nbytes(lu, matrix, dtype=float):
+    """Private method to estimate memory held by a factorization and its matrix"""
+    index_bytes = numpy.dtype(numpy.int32).itemsize
+    factor_bytes = numpy.dtype(dtype).itemsize
+
+    return lu.nnz * (index_bytes + factor_bytes) + matrix.nnz * (
+        index_bytes + matrix.dtype.itemsize
+    )
+
+
+@jit(nopython=True)
+def jit_lower_solve(data, indices, indptr, x):
+    """In-place forward substitution with a lower triangular CSR matrix."""
+    for i in range(x.size):
+        value = x[i]
+        diag = 1.0
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if j < i:
+                value -= data[k] * x[j]
+            elif j == i:
+                diag = data[k]
+        x[i] = value / diag
+
+
+@jit(nopython=True)
+def jit_upper_solve(data, indices, indptr, x):
+    """In-place backward substitution with an upper triangular CSR matrix."""
+    for i in range(x.size - 1, -1, -1):
+        value = x[i]
+        diag = 1.0
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if j > i:
+                value -= data[k] * x[j]
+            elif j == i:
+                diag = data[k]
+        x[i] = value / diag
@@ -0,0 +1,268 @@
+"""Direct solver of the Helmholtz equation with cached LU factorizations."""
+
+import numpy
+import scipy.sparse as sps
+from scipy.sparse import linalg as sla
+
+from ._cache import factorization_cache
+
+
+def helmholtz_matrix(grid, ivar, alpha):
+    """Assemble the operator I - alpha * laplacian on a grid variable.
+
+    Unknowns are interior cells along directions with guard cells and
+    faces between the boundary faces along directions without them, like
+    x on GridFaceX. Both boundary faces coincide on periodic boundaries,
+    so the low one is an unknown as well. The matrix is built from
+    1D second differences, with the homogeneous part of boundary
+    conditions folded into the diagonal.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    alpha : float
+        Coefficient of the Laplacian.
+
+    Returns
+    -------
+    matrix : CSR format matrix
+
+    """
+    bc_type = grid.bc_type[ivar]
+
+    dx_matrix = _second_difference(grid.nx, grid.dx, bc_type[:2], grid.xguard == 0)
+    dy_matrix = _second_difference(grid.ny, grid.dy, bc_type[2:], grid.yguard == 0)
+
+    nx, ny = dx_matrix.shape[0], dy_matrix.shape[0]
+
+    laplacian = sps.kron(sps.identity(ny), dx_matrix) + sps.kron(
+        dy_matrix, sps.identity(nx)
+    )
+
+    return (sps.identity(nx * ny) - alpha * laplacian).tocsr()
+
+
+def cached_helmholtz_matrix(grid, ivar, alpha, cache_dir=None):
+    """Fetch the Helmholtz matrix and its LU decomposition from the cache.
+
+    Factorizations share the process-level cache of the Poisson unit and
+    are keyed on the grid type, boundary types and alpha as well. Only the
+    latest alpha is kept for a grid and boundary types, so that time-steps
+    changing every step do not fill the cache with single-use entries and
+    push out the Poisson factorization.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    alpha : float
+        Coefficient of the Laplacian.
+    cache_dir : string
+        Directory to persist factorizations, None to keep them in memory only.
+
+    Returns
+    -------
+    lu : SuperLU or TriangularLU object
+    matrix : CSR format matrix
+
+    """
+    key = (
+        "helmholtz",
+        grid.type_,
+        grid.nx,
+        grid.ny,
+        grid.dx,
+        grid.dy,
+        tuple(grid.bc_type[ivar]),
+        alpha,
+    )
+
+    entry = factorization_cache.get(key)
+    if entry is not None:
+        return entry
+
+    # Drop factorizations of the same operator with other values of alpha
+    for other in factorization_cache:
+        if other[:-1] == key[:-1]:
+            factorization_cache.discard(other)
+
+    matrix = helmholtz_matrix(grid, ivar, alpha)
+
+    lu = factorization_cache.load(key, cache_dir)
+    if lu is None:
+        lu = sla.splu(matrix.tocsc())
+        factorization_cache.save(key, lu, cache_dir)
+
+    factorization_cache.put(key, lu, matrix)
+
+    return lu, matrix
+
+
+def solve_helmholtz(grid, ivar, alpha, cache_dir=None, verbose=False):
+    """Solve (I - alpha * laplacian) phi = phi in place.
+
+    The current values of the variable are the right-hand side, and its
+    boundary conditions enter through guard cells, which are filled
+    before the solve. Blocks are gathered into a single array for the
+    direct solve.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the right-hand side and solution.
+    alpha : float
+        Coefficient of the Laplacian.
+    cache_dir : string
+        Directory to persist factorizations, None to keep them in memory only.
+    verbose : bool
+        Display the final residual.
+
+    Returns
+    -------
+    ites: None
+        Number of iterations computed.
+    residual: float
+        Final residual.
+    """
+    lu, matrix = cached_helmholtz_matrix(grid, ivar, alpha, cache_dir)
+
+    grid.fill_guard_cells(ivar)
+    phi = _gather(grid, ivar)
+
+    bc_type = grid.bc_type[ivar]
+    unknowns = tuple(
+        _unknowns(bc_type[face], guard == 0)
+        for face, guard in [(2, grid.yguard), (0, grid.xguard)]
+    )
+
+    rhs = numpy.copy(phi[unknowns])
+    for axis, faces, delta, staggered in [
+        (1, bc_type[:2], grid.dx, grid.xguard == 0),
+        (0, bc_type[2:], grid.dy, grid.yguard == 0),
+    ]:
+        _add_boundary_terms(rhs, phi, unknowns, axis, faces, delta, staggered, alpha)
+
+    sol = lu.solve(rhs.ravel())
+    residual = numpy.linalg.norm(matrix @ sol - rhs.ravel())
+
+    phi[unknowns] = numpy.reshape(sol, rhs.shape)
+    _scatter(grid, ivar, phi)
+    grid.fill_guard_cells(ivar)
+
+    if verbose:
+        print("Helmholtz Solver:")
+        print("- Final residual: {}".format(residual))
+
+    return None, residual
+
+
+def _second_difference(num, delta, bc_type, staggered):
+    """Private method for the 1D second difference on unknowns along a direction."""
+    size = num if staggered and bc_type[0] == "periodic" else num - staggered
+
+    diag = numpy.full(size, -2.0)
+    diag[0] += _mirror(bc_type[0], staggered)
+    diag[-1] += _mirror(bc_type[1], staggered)
+
+    matrix = sps.diags(
+        [numpy.ones(size - 1), diag, numpy.ones(size - 1)], [-1, 0, 1], format="lil"
+    )
+
+    if bc_type[0] == "periodic":
+        matrix[0, size - 1] += 1.0
+        matrix[size - 1, 0] += 1.0
+
+    return matrix.tocsr() / delta**2
+
+
+def _mirror(face_bc, staggered):
+    """Private method for the guard cell value next to an unknown of value one
+    with homogeneous boundary conditions"""
+    if face_bc == "neumann":
+        return 1.0
+    elif face_bc in ["dirichlet", "outflow"]:
+        return 0.0 if staggered else -1.0
+    elif face_bc == "periodic":
+        return 0.0
+    else:
+        raise ValueError('Boundary type "{}" not implemented'.format(face_bc))
+
+
+def _unknowns(face_bc, staggered):
+    """Private method for the index of unknowns along a direction of the array"""
+    return slice(0, -1) if staggered and face_bc == "periodic" else slice(1, -1)
+
+
+def _add_boundary_terms(rhs, phi, unknowns, axis, faces, delta, staggered, alpha):
+    """Private method to add the inhomogeneous part of guard cells to rhs"""
+    if faces[0] == "periodic":
+        return
+
+    index = list(unknowns)
+    for face_bc, guard, inner, edge in [
+        (faces[0], 0, 1, 0),
+        (faces[1], -1, -2, -1),
+    ]:
+        index[axis] = guard
+        guard_values = phi[tuple(index)]
+        index[axis] = inner
+        inner_values = phi[tuple(index)]
+
+        edge_index = [slice(None), slice(None)]
+        edge_index[axis] = edge
+        rhs[tuple(edge_index)] += (
+            alpha
+            * (guard_values - _mirror(face_bc, staggered) * inner_values)
+            / delta**2
+        )
+
+
+def _block_offsets(grid, block):
+    """Private method for the position of a block in the array of all blocks"""
+    return (
+        int(round((block.ymin - grid.ymin) / grid.dy)),
+        int(round((block.xmin - grid.xmin) / grid.dx)),
+    )
+
+
+def _gather(grid, varkey):
+    """Private method to copy data of all blocks into a single array,
+    a view of the data for grids with a single block"""
+    data = grid[varkey][:, 0, :, :].view(numpy.ndarray)
+
+    if grid.nblocks == 1:
+        return data[0]
+
+    nyb, nxb = data.shape[1:]
+    ny, nx = grid.ny + nyb - grid.nyb, grid.nx + nxb - grid.nxb
+
+    # Face grids store one more face than cells on each block
+    ny += grid.type_ == "y-face"
+    nx += grid.type_ == "x-face"
+
+    values = numpy.empty((ny, nx))
+    for block in grid.blocklist:
+        j, i = _block_offsets(grid, block)
+        values[j : j + nyb, i : i + nxb] = data[block.tag]
+
+    return values
+
+
+def _scatter(grid, varkey, values):
+    """Private method to copy an array from _gather back to all blocks"""
+    if grid.nblocks == 1:
+        return
+
+    data = grid[varkey][:, 0, :, :].view(numpy.ndarray)
+    nyb, nxb = data.shape[1:]
+
+    for block in grid.blocklist:
+        j, i = _block_offsets(grid, block)
+        data[block.tag] = values[j : j + nyb, i : i + nxb]
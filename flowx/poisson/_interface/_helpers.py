@@ -5,69 +5,171 @@ from scipy.sparse import spdiags, csr_matrix
 from scipy.sparse import linalg as sla
 
 
-def build_sparse_matrix(grid, ivar):
+def assemble_sparse_matrix(grid, ivar):
+    """Assemble the 5-point Laplacian for a cell-centered variable.
 
-    """Solve the Poisson system using a direct solver from the scipy library.
-
-     Arguments
-     ---------
-     grid : Grid object
-         Grid containing data.
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
 
     Returns
-     -------
-     matrix : CSR format matrix
+    -------
+    matrix : CSR format matrix
 
     """
-    nx, ny = grid.nx, grid.ny
-    dx, dy = grid.dx, grid.dy
+    return laplacian_matrix(grid.nx, grid.ny, grid.dx, grid.dy, grid.bc_type[ivar])
 
-    matrix_length = nx * ny
 
-    matrix = sps.lil_matrix((matrix_length, matrix_length), dtype=np.float64)
+def laplacian_matrix(nx, ny, dx, dy, bc_type):
+    """Assemble the 5-point Laplacian on a cell-centered mesh.
+
+    The matrix is built in one shot from NumPy index arrays in COO format,
+    and boundary conditions are folded into the diagonal of the boundary
+    rows, or couple cells on opposite faces for periodic boundaries.
+    Coefficients in x and y are scaled by dx and dy separately to support
+    any cell aspect ratio.
 
-    counter = 0
+    Arguments
+    ---------
+    nx, ny : integer
+        Number of cells in x and y direction.
+    dx, dy : float
+        Cell widths.
+    bc_type : list
+        Boundary types [xlow, xhigh, ylow, yhigh].
+
+    Returns
+    -------
+    matrix : CSR format matrix
+
+    """
+    matrix_length = nx * ny
 
-    bc_type = grid.bc_type[ivar]
     coeff_add = [None] * 4
 
-    for i in range(len(bc_type)):
-        if bc_type[i] == "neumann":
+    for i, face_bc in enumerate(bc_type):
+        if face_bc == "neumann":
             coeff_add[i] = 1.0
-        if bc_type[i] == "dirichlet":
+        elif face_bc == "dirichlet":
             coeff_add[i] = -1.0
+        elif face_bc == "periodic":
+            coeff_add[i] = 0.0
+        else:
+            raise ValueError('Boundary type "{}" not implemented'.format(face_bc))
+
+    # Row index of each interior cell, i is the fastest running index
+    index = np.arange(matrix_length).reshape(ny, nx)
+
+    diag = np.full((ny, nx), -2.0 / dx**2 - 2.0 / dy**2)
+    diag[:, 0] += coeff_add[0] / dx**2
+    diag[:, -1] += coeff_add[1] / dx**2
+    diag[0, :] += coeff_add[2] / dy**2
+    diag[-1, :] += coeff_add[3] / dy**2
+
+    # (row, column) pairs for west, east, south and north neighbors
+    neighbors = [
+        (index[:, 1:], index[:, :-1], 1.0 / dx**2),
+        (index[:, :-1], index[:, 1:], 1.0 / dx**2),
+        (index[1:, :], index[:-1, :], 1.0 / dy**2),
+        (index[:-1, :], index[1:, :], 1.0 / dy**2),
+    ]
+
+    # Cells at periodic faces are neighbors of cells at the opposite face
+    if bc_type[0] == "periodic":
+        neighbors.append((index[:, 0], index[:, -1], 1.0 / dx**2))
+        neighbors.append((index[:, -1], index[:, 0], 1.0 / dx**2))
+    if bc_type[2] == "periodic":
+        neighbors.append((index[0, :], index[-1, :], 1.0 / dy**2))
+        neighbors.append((index[-1, :], index[0, :], 1.0 / dy**2))
+
+    rows = [index.ravel()] + [row.ravel() for row, _, _ in neighbors]
+    cols = [index.ravel()] + [col.ravel() for _, col, _ in neighbors]
+    vals = [diag.ravel()] + [np.full(row.size, val) for row, _, val in neighbors]
+
+    matrix = sps.coo_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(matrix_length, matrix_length),
+    )
+
+    return matrix.tocsr()
+
+
+def build_sparse_matrix(grid, ivar, dtype=float):
+    """Assemble the Poisson matrix and compute its LU decomposition.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    dtype : numpy data type
+        Precision of the LU decomposition, the matrix is kept in float64.
 
-    coeff_start = -4.0
+    Returns
+    -------
+    lu : SuperLU object
+    matrix : CSR format matrix
 
-    for j in range(1, ny + 1):
-        for i in range(1, nx + 1):
+    """
+    matrix = assemble_sparse_matrix(grid, ivar)
+    lu = sla.splu(matrix.astype(dtype).tocsc())
 
-            coeff = coeff_start / dx**2
+    return lu, matrix
 
-            if j > 1:
-                matrix[counter, counter - nx] = 1.0 / (dx**2)
-            else:
-                coeff = coeff + coeff_add[2] / (dx**2)
 
-            if j < ny:
-                matrix[counter, counter + nx] = 1.0 / (dx**2)
-            else:
-                coeff = coeff + coeff_add[3] / (dx**2)
+def residual_norm(grid, ivar, rvar):
+    """Compute the L2 norm of the residual of the Poisson equation.
 
-            if i > 1:
-                matrix[counter, counter - 1] = 1.0 / (dx**2)
-            else:
-                coeff = coeff + coeff_add[0] / (dx**2)
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    rvar : string
+        Name of the grid variable of the right-hand side.
 
-            if i < nx:
-                matrix[counter, counter + 1] = 1.0 / (dx**2)
-            else:
-                coeff = coeff + coeff_add[1] / (dx**2)
+    Returns
+    -------
+    residual : float
+        L2 norm of rhs - laplacian(phi) over interior cells of all blocks.
 
-            matrix[counter, counter] = coeff
-            counter = counter + 1
+    """
+    grid.fill_guard_cells(ivar)
 
-    matrix = matrix.tocsr()
-    lu = sla.splu(matrix.tocsc())
+    phi = grid[ivar][:, 0, :, :]
+    rhs = grid[rvar][:, 0, :, :]
+    dx, dy = grid.dx, grid.dy
 
-    return lu, matrix
+    res = (
+        rhs[:, 1:-1, 1:-1]
+        - (phi[:, 1:-1, :-2] - 2 * phi[:, 1:-1, 1:-1] + phi[:, 1:-1, 2:]) / dx**2
+        - (phi[:, :-2, 1:-1] - 2 * phi[:, 1:-1, 1:-1] + phi[:, 2:, 1:-1]) / dy**2
+    )
+
+    # Only the compatible part of the residual is measured for singular problems
+    if is_singular(grid.bc_type[ivar]):
+        res -= np.mean(res)
+
+    return np.linalg.norm(res)
+
+
+def is_singular(bc_type):
+    """Check if the Poisson problem has constant solutions.
+
+    Arguments
+    ---------
+    bc_type : list
+        Boundary types [xlow, xhigh, ylow, yhigh].
+
+    Returns
+    -------
+    singular : bool
+        True if all faces are Neumann or periodic.
+
+    """
+    return all(face_bc in ["neumann", "periodic"] for face_bc in bc_type)
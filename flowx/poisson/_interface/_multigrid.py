@@ -0,0 +1,368 @@
+"""Geometric multigrid solver for the cell-centered Poisson equation."""
+
+import numpy
+from scipy.sparse import linalg as sla
+
+from ._helpers import laplacian_matrix, is_singular
+
+
+def build_multigrid(grid, ivar, min_cells=2):
+    """Build the hierarchy of levels for the multigrid solver.
+
+    The finest level maps onto the cell-centered grid and each coarser
+    level halves the number of cells in both directions, as long as both
+    are even and at least 2 * min_cells. Coarse levels hold plain arrays
+    with the same guard-cell layout as GridCellCentered. The coarsest
+    level is solved exactly using a sparse LU decomposition, so grids need
+    nx and ny divisible by a large power of two to coarsen well. Grids
+    without any coarse level raise a ValueError.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    min_cells : integer
+        Minimum number of cells in each direction on the coarsest level.
+
+    Returns
+    -------
+    levels : list of dictionaries
+        Data for each level, finest first.
+
+    """
+    bc_type = list(grid.bc_type[ivar])
+    singular = is_singular(bc_type)
+
+    nx, ny = grid.nx, grid.ny
+    dx, dy = grid.dx, grid.dy
+
+    levels = []
+    while True:
+        levels.append(
+            {
+                "nx": nx,
+                "ny": ny,
+                "dx": dx,
+                "dy": dy,
+                "phi": numpy.zeros((ny + 2, nx + 2)),
+                "rhs": numpy.zeros((ny, nx)),
+                "res": numpy.zeros((ny, nx)),
+                "bc_type": bc_type,
+                "singular": singular,
+            }
+        )
+
+        if nx % 2 or ny % 2 or nx < 2 * min_cells or ny < 2 * min_cells:
+            break
+
+        nx, ny = nx // 2, ny // 2
+        dx, dy = 2 * dx, 2 * dy
+
+    if len(levels) == 1:
+        raise ValueError(
+            "Multigrid needs even numbers of at least {} cells ".format(2 * min_cells)
+            + "to coarsen a grid of {} x {} cells".format(grid.nx, grid.ny)
+        )
+
+    coarsest = levels[-1]
+    matrix = laplacian_matrix(
+        coarsest["nx"], coarsest["ny"], coarsest["dx"], coarsest["dy"], bc_type
+    ).tolil()
+
+    # Singular problems, with only Neumann and periodic faces, have a redundant
+    # equation for compatible right-hand sides that is replaced to pin the solution
+    if singular:
+        matrix[0, :] = 0.0
+        matrix[0, 0] = 1.0
+
+    coarsest["lu"] = sla.splu(matrix.tocsc())
+
+    return levels
+
+
+def solve_multigrid(grid, ivar, rvar, options):
+    """Solve the Poisson system using geometric multigrid cycles.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    rvar : string
+        Name of the grid variable of the right-hand side.
+    options : dictionary
+
+    Returns
+    -------
+    ites: integer
+        Number of cycles computed.
+    residual: float
+        Final residual.
+    """
+    verbose = options["verbose"]
+    maxiter = options["maxiter"]
+    tol = options["tol"]
+    levels = options["levels"]
+
+    cycle_index = {"V": 1, "W": 2}[options["mg_cycle"]]
+    sweeps = (options["mg_presmooth"], options["mg_postsmooth"])
+
+    finest = levels[0]
+    phi = grid[ivar][0, 0, :, :]
+    finest["rhs"][:, :] = grid[rvar][0, 0, 1:-1, 1:-1]
+    bc_val = grid.bc_val[ivar]
+
+    # Solve the compatible problem for singular boundary conditions
+    if finest["singular"]:
+        finest["rhs"] -= numpy.mean(finest["rhs"])
+
+    _fill_guard_cells(phi, finest, bc_val)
+    residual = _residual(phi, finest)
+    options["residuals"]["initial"] = residual
+
+    ites = 0
+    while ites < maxiter and residual > tol:
+        _cycle(levels, 0, phi, bc_val, cycle_index, sweeps)
+        residual = _residual(phi, finest)
+        ites += 1
+
+    grid.fill_guard_cells(ivar)
+    options["residuals"]["final"] = residual
+
+    if verbose:
+        print("Multigrid method:")
+        if ites == maxiter:
+            print("Warning: maximum number of iterations reached!")
+        print("- Number of iterations: {}".format(ites))
+        print("- Final residual: {}".format(residual))
+
+    return ites, residual
+
+
+def multigrid_cycle(levels, rhs, cycle_index=1, sweeps=(1, 1)):
+    """Apply one multigrid cycle to rhs starting from a zero guess.
+
+    With equal pre and post smoothing sweeps the cycle is a symmetric
+    operator, which makes it suitable as a preconditioner for
+    conjugate-gradient methods. Post smoothing visits colours in reverse
+    order, restriction is the transpose of prolongation scaled by 1/4 and
+    the coarsest level of singular problems applies the pseudo-inverse.
+
+    Arguments
+    ---------
+    levels : list of dictionaries
+        Hierarchy from build_multigrid.
+    rhs : numpy.ndarray
+        Right-hand side on the interior cells of the finest level.
+    cycle_index : integer
+        1 for a V-cycle and 2 for a W-cycle.
+    sweeps : tuple
+        Number of pre and post smoothing sweeps.
+
+    Returns
+    -------
+    phi : numpy.ndarray
+        Approximate solution with guard cells on the finest level.
+    """
+    finest = levels[0]
+    finest["rhs"][:, :] = rhs
+    finest["phi"][:, :] = 0.0
+
+    _cycle(levels, 0, finest["phi"], None, cycle_index, sweeps, symmetric=True)
+
+    return finest["phi"]
+
+
+def _cycle(levels, ilevel, phi, bc_val, cycle_index, sweeps, symmetric=False):
+    """Private method for a recursive V/W-cycle starting at level ilevel."""
+    level = levels[ilevel]
+
+    if ilevel == len(levels) - 1:
+        rhs = level["rhs"].flatten()
+
+        # Projecting out the mean before and after the pinned solve applies
+        # the pseudo-inverse, which keeps the cycle symmetric
+        if level["singular"]:
+            rhs -= numpy.mean(rhs)
+            rhs[0] = 0.0
+
+        sol = level["lu"].solve(rhs)
+        if level["singular"]:
+            sol -= numpy.mean(sol)
+
+        phi[1:-1, 1:-1] = numpy.reshape(sol, phi[1:-1, 1:-1].shape)
+        _fill_guard_cells(phi, level, bc_val)
+        return
+
+    _smooth(phi, level, bc_val, sweeps[0])
+    _residual(phi, level)
+
+    coarse = levels[ilevel + 1]
+    if symmetric:
+        _restrict_transpose(level["res"], coarse)
+    else:
+        _restrict(level["res"], coarse["rhs"])
+    coarse["phi"][:, :] = 0.0
+
+    for _ in range(cycle_index):
+        _cycle(levels, ilevel + 1, coarse["phi"], None, cycle_index, sweeps, symmetric)
+
+    # Constants are in the null space of singular problems, removing them from
+    # the correction on both sides of the coarse cycle keeps it symmetric
+    if coarse["singular"]:
+        coarse["phi"] -= numpy.mean(coarse["phi"][1:-1, 1:-1])
+
+    _prolong(coarse["phi"], phi)
+    _fill_guard_cells(phi, level, bc_val)
+    _smooth(phi, level, bc_val, sweeps[1], reverse=symmetric)
+
+
+def _smooth(phi, level, bc_val, nsweeps, reverse=False):
+    """Private method for red-black Gauss-Seidel sweeps.
+
+    Black cells are updated first if reverse is True, so that a cycle with
+    equal pre and post smoothing is symmetric.
+    """
+    rhs = level["rhs"]
+    ny, nx = rhs.shape
+    idx2, idy2 = 1.0 / level["dx"] ** 2, 1.0 / level["dy"] ** 2
+    diag = 2.0 * (idx2 + idy2)
+
+    colours = [[(1, 1), (2, 2)], [(1, 2), (2, 1)]]
+    if reverse:
+        colours.reverse()
+
+    for _ in range(nsweeps):
+        for colour in colours:
+            for jo, io in colour:
+                phi[jo : ny + 1 : 2, io : nx + 1 : 2] = (
+                    (
+                        phi[jo : ny + 1 : 2, io - 1 : nx : 2]
+                        + phi[jo : ny + 1 : 2, io + 1 : nx + 2 : 2]
+                    )
+                    * idx2
+                    + (
+                        phi[jo - 1 : ny : 2, io : nx + 1 : 2]
+                        + phi[jo + 1 : ny + 2 : 2, io : nx + 1 : 2]
+                    )
+                    * idy2
+                    - rhs[jo - 1 :: 2, io - 1 :: 2]
+                ) / diag
+            _fill_guard_cells(phi, level, bc_val)
+
+
+def _residual(phi, level):
+    """Private method to compute the residual and return its L2 norm."""
+    res = level["res"]
+    idx2, idy2 = 1.0 / level["dx"] ** 2, 1.0 / level["dy"] ** 2
+
+    res[:, :] = level["rhs"] - (
+        (phi[1:-1, :-2] - 2 * phi[1:-1, 1:-1] + phi[1:-1, 2:]) * idx2
+        + (phi[:-2, 1:-1] - 2 * phi[1:-1, 1:-1] + phi[2:, 1:-1]) * idy2
+    )
+
+    # Remove the incompatible part of the residual for singular problems
+    if level["singular"]:
+        res -= numpy.mean(res)
+
+    return numpy.linalg.norm(res)
+
+
+def _restrict(fine, coarse):
+    """Private method for full-weighting restriction of cell averages."""
+    coarse[:, :] = 0.25 * (
+        fine[0::2, 0::2] + fine[1::2, 0::2] + fine[0::2, 1::2] + fine[1::2, 1::2]
+    )
+
+
+def _restrict_transpose(fine, coarse):
+    """Private method for restriction as the transpose of _prolong scaled by 1/4.
+
+    Weights (1, 3, 3, 1) / 4 along each direction spread fine values over
+    the coarse level with guard cells, which are then folded into the
+    interior as the transpose of homogeneous guard cell filling.
+    """
+    rows = numpy.zeros((fine.shape[0] // 2 + 2, fine.shape[1]))
+    rows[1:-1] += 0.75 * (fine[0::2] + fine[1::2])
+    rows[:-2] += 0.25 * fine[0::2]
+    rows[2:] += 0.25 * fine[1::2]
+
+    padded = numpy.zeros((rows.shape[0], fine.shape[1] // 2 + 2))
+    padded[:, 1:-1] += 0.75 * (rows[:, 0::2] + rows[:, 1::2])
+    padded[:, :-2] += 0.25 * rows[:, 0::2]
+    padded[:, 2:] += 0.25 * rows[:, 1::2]
+
+    _fold_guard_cells(padded, coarse)
+    coarse["rhs"][:, :] = 0.25 * padded[1:-1, 1:-1]
+
+
+def _prolong(coarse, fine):
+    """Private method to add the bilinear interpolation of coarse to fine."""
+    center = 9.0 * coarse[1:-1, 1:-1]
+
+    fine[1:-1:2, 1:-1:2] += (
+        center + 3.0 * (coarse[1:-1, :-2] + coarse[:-2, 1:-1]) + coarse[:-2, :-2]
+    ) / 16.0
+    fine[1:-1:2, 2:-1:2] += (
+        center + 3.0 * (coarse[1:-1, 2:] + coarse[:-2, 1:-1]) + coarse[:-2, 2:]
+    ) / 16.0
+    fine[2:-1:2, 1:-1:2] += (
+        center + 3.0 * (coarse[1:-1, :-2] + coarse[2:, 1:-1]) + coarse[2:, :-2]
+    ) / 16.0
+    fine[2:-1:2, 2:-1:2] += (
+        center + 3.0 * (coarse[1:-1, 2:] + coarse[2:, 1:-1]) + coarse[2:, 2:]
+    ) / 16.0
+
+
+def _fill_guard_cells(phi, level, bc_val):
+    """Private method to fill guard cells, homogeneous if bc_val is None."""
+    bc_val = bc_val if bc_val is not None else [0.0] * 4
+    deltas = [level["dx"], level["dx"], level["dy"], level["dy"]]
+    guards = [(slice(None), 0), (slice(None), -1), (0, slice(None)), (-1, slice(None))]
+    interior = [
+        (slice(None), 1),
+        (slice(None), -2),
+        (1, slice(None)),
+        (-2, slice(None)),
+    ]
+
+    # Periodic faces take values of the first interior layer on the opposite face
+    opposite = [interior[1], interior[0], interior[3], interior[2]]
+
+    for face_bc, val, delta, guard, inner, wrap in zip(
+        level["bc_type"], bc_val, deltas, guards, interior, opposite
+    ):
+        if face_bc == "periodic":
+            phi[guard] = phi[wrap]
+        elif face_bc == "neumann":
+            phi[guard] = val * delta + phi[inner]
+        else:
+            phi[guard] = 2 * val - phi[inner]
+
+
+def _fold_guard_cells(phi, level):
+    """Private method for the transpose of homogeneous _fill_guard_cells,
+    adding values in guard cells to the interior cells they are filled from."""
+    guards = [(slice(None), 0), (slice(None), -1), (0, slice(None)), (-1, slice(None))]
+    interior = [
+        (slice(None), 1),
+        (slice(None), -2),
+        (1, slice(None)),
+        (-2, slice(None)),
+    ]
+    opposite = [interior[1], interior[0], interior[3], interior[2]]
+
+    # Faces in reverse order of filling, y-faces overwrite corners last
+    for face_bc, guard, inner, wrap in reversed(
+        list(zip(level["bc_type"], guards, interior, opposite))
+    ):
+        if face_bc == "periodic":
+            phi[wrap] += phi[guard]
+        elif face_bc == "neumann":
+            phi[inner] += phi[guard]
+        else:
+            phi[inner] -= phi[guard]
+        phi[guard] = 0.0
@@ -0,0 +1,264 @@
+"""Matrix-free Laplacian operator for cell-centered grids."""
+
+import numpy
+from numba import jit
+from scipy.sparse import linalg as sla
+
+from ._helpers import is_singular
+
+
+class LaplacianOperator(sla.LinearOperator):
+    """
+    Matrix-free 5-point Laplacian with homogeneous boundary conditions
+
+    Vectors hold interior values of all blocks, flattened in the order of
+    grid[ivar][:, 0, 1:-1, 1:-1]. Guard cells live in a work array that is
+    filled in place by halo exchange and boundary conditions, so nothing is
+    assembled and memory grows only with the number of cells.
+    """
+
+    def __init__(self, grid, ivar):
+        """
+        Constructor for the operator
+
+        Arguments
+        ---------
+        grid : Grid object
+               Cell-centered grid containing data
+
+        ivar : string
+               Name of the grid variable of the numerical solution
+        """
+        self.grid = grid
+        self.ivar = ivar
+        self.bc_type = list(grid.bc_type[ivar])
+        self.singular = is_singular(self.bc_type)
+
+        self.idx2, self.idy2 = 1.0 / grid.dx**2, 1.0 / grid.dy**2
+        self.diag = -2.0 * (self.idx2 + self.idy2)
+
+        self.work = numpy.zeros(grid[ivar].shape)
+        self.interior = (grid.nblocks, grid.nyb, grid.nxb)
+
+        size = grid.nblocks * grid.nyb * grid.nxb
+        super().__init__(dtype=float, shape=(size, size))
+
+    def _matvec(self, x):
+        """Apply the operator to a flattened vector"""
+        out = numpy.empty(self.interior)
+
+        self.work[:, 0, 1:-1, 1:-1] = numpy.reshape(x, self.interior)
+        self.fill_guard_cells(self.work)
+        jit_laplacian(self.work[:, 0, :, :], self.idx2, self.idy2, out)
+
+        return out.ravel()
+
+    def _adjoint(self):
+        """The operator is symmetric"""
+        return self
+
+    def fill_guard_cells(self, data):
+        """
+        Fill guard cells of data with homogeneous boundary conditions,
+        periodic faces wrap around like the grid variables
+
+        Arguments
+        ---------
+        data : numpy.ndarray
+               Array with the layout of grid variables
+        """
+        self.grid.exchange_halo_array(data)
+
+        guards = [
+            (slice(None), 0),
+            (slice(None), -1),
+            (0, slice(None)),
+            (-1, slice(None)),
+        ]
+        interior = [
+            (slice(None), 1),
+            (slice(None), -2),
+            (1, slice(None)),
+            (-2, slice(None)),
+        ]
+        locations = ["xlow", "xhigh", "ylow", "yhigh"]
+
+        for face, (face_bc, guard, inner, location) in enumerate(
+            zip(self.bc_type, guards, interior, locations)
+        ):
+            blocks = (self.grid.boundary_blocks[location], slice(None))
+            if face_bc == "periodic":
+                self.grid.exchange_periodic_array(data, [face])
+            elif face_bc == "neumann":
+                data[blocks + guard] = data[blocks + inner]
+            else:
+                data[blocks + guard] = -data[blocks + inner]
+
+    def residual(self, ivar, rvar, out=None):
+        """
+        Residual rhs - laplacian(phi) of the grid variables with their own
+        boundary conditions
+
+        Arguments
+        ---------
+        ivar : string
+               Name of the grid variable of the numerical solution, with the
+               same boundary types as the operator
+
+        rvar : string
+               Name of the grid variable of the right-hand side
+
+        out : numpy.ndarray
+              Array of shape (nblocks, nyb, nxb) to store the residual
+
+        Returns
+        -------
+        out : numpy.ndarray
+        """
+        if out is None:
+            out = numpy.empty(self.interior)
+
+        self.grid.fill_guard_cells(ivar)
+        jit_laplacian(self.grid[ivar][:, 0, :, :], self.idx2, self.idy2, out)
+        numpy.subtract(self.grid[rvar][:, 0, 1:-1, 1:-1], out, out=out)
+
+        # Only the compatible part of the residual is kept for singular problems
+        if self.singular:
+            out -= numpy.mean(out)
+
+        return out
+
+
+@jit(nopython=True)
+def jit_laplacian(phi, idx2, idy2, out):
+    """5-point Laplacian of phi with guard cells, stored in out without guard cells."""
+    nblocks, ny, nx = out.shape
+
+    for block in range(nblocks):
+        for j in range(1, ny + 1):
+            for i in range(1, nx + 1):
+                center = phi[block, j, i]
+                out[block, j - 1, i - 1] = (
+                    phi[block, j, i - 1] + phi[block, j, i + 1] - 2.0 * center
+                ) * idx2 + (
+                    phi[block, j - 1, i] + phi[block, j + 1, i] - 2.0 * center
+                ) * idy2
+
+
+@jit(nopython=True)
+def jit_dot(x, y):
+    """Inner product of two arrays of the same shape without temporaries."""
+    nblocks, ny, nx = x.shape
+
+    total = 0.0
+    for block in range(nblocks):
+        for j in range(ny):
+            for i in range(nx):
+                total += x[block, j, i] * y[block, j, i]
+
+    return total
+
+
+@jit(nopython=True)
+def jit_axpy(alpha, x, y):
+    """In-place y = y + alpha * x."""
+    nblocks, ny, nx = x.shape
+
+    for block in range(nblocks):
+        for j in range(ny):
+            for i in range(nx):
+                y[block, j, i] += alpha * x[block, j, i]
+
+
+@jit(nopython=True)
+def jit_axpy_dot(alpha, x, y):
+    """In-place y = y + alpha * x fused with the inner product of y."""
+    nblocks, ny, nx = x.shape
+
+    total = 0.0
+    for block in range(nblocks):
+        for j in range(ny):
+            for i in range(nx):
+                y[block, j, i] += alpha * x[block, j, i]
+                total += y[block, j, i] * y[block, j, i]
+
+    return total
+
+
+@jit(nopython=True)
+def jit_xpby(x, beta, y):
+    """In-place y = x + beta * y."""
+    nblocks, ny, nx = x.shape
+
+    for block in range(nblocks):
+        for j in range(ny):
+            for i in range(nx):
+                y[block, j, i] = x[block, j, i] + beta * y[block, j, i]
+
+
+def solve_krylov(grid, ivar, rvar, options):
+    """Solve the Poisson system with Krylov methods from scipy.sparse.linalg.
+
+    The correction to the initial guess is computed with the matrix-free
+    LaplacianOperator, which takes homogeneous boundary conditions, so
+    boundary values and the initial guess enter through the residual.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    rvar : string
+        Name of the grid variable of the right-hand side.
+    options : dictionary
+
+    'krylov_method' keyword refers to the Krylov method
+    options['krylov_method'] = 'cg' --> default
+                             = 'bicgstab'
+                             = 'gmres'
+
+    Returns
+    -------
+    ites: integer
+        Number of iterations computed.
+    residual: float
+        Final residual.
+    """
+    verbose = options["verbose"]
+    maxiter = options["maxiter"]
+    tol = options["tol"]
+    operator = options["operator"]
+
+    methods = {"cg": sla.cg, "bicgstab": sla.bicgstab, "gmres": sla.gmres}
+    method = methods[options["krylov_method"]]
+
+    rhs = operator.residual(ivar, rvar).ravel()
+
+    ites = [0]
+
+    def count(_):
+        ites[0] += 1
+
+    kwargs = dict(rtol=0.0, atol=tol, maxiter=maxiter, callback=count)
+    if method is sla.gmres:
+        kwargs["callback_type"] = "pr_norm"
+        kwargs["restart"] = options["gmres_restart"]
+        kwargs["maxiter"] = -(-maxiter // options["gmres_restart"])
+
+    correction, _ = method(operator, rhs, **kwargs)
+
+    grid[ivar][:, 0, 1:-1, 1:-1] += numpy.reshape(correction, operator.interior)
+    residual = numpy.linalg.norm(operator.residual(ivar, rvar))
+
+    options["residuals"]["initial"] = numpy.linalg.norm(rhs)
+    options["residuals"]["final"] = residual
+
+    if verbose:
+        print("Krylov method ({}):".format(options["krylov_method"]))
+        if ites[0] >= maxiter:
+            print("Warning: maximum number of iterations reached!")
+        print("- Number of iterations: {}".format(ites[0]))
+        print("- Final residual: {}".format(residual))
+
+    return ites[0], residual
@@ -0,0 +1,127 @@
+"""Preconditioners for the conjugate-gradient Poisson solver."""
+
+import numpy
+from numba import jit
+
+from ._helpers import is_singular
+from ._multigrid import build_multigrid, multigrid_cycle
+
+
+def build_preconditioner(grid, ivar, matrix, options):
+    """Build a preconditioner for the negative Poisson matrix.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    matrix : CSR format matrix
+        Poisson matrix from assemble_sparse_matrix.
+    options : dictionary
+
+    'preconditioner' keyword refers to the type of preconditioner
+    options['preconditioner'] = 'diagonal' --> default
+                              = 'ic0'
+                              = 'multigrid'
+
+    Returns
+    -------
+    precondition : function
+        Function returning M^-1 r for a flattened residual r.
+    """
+    nx, ny = grid.nx, grid.ny
+    dx, dy = grid.dx, grid.dy
+    kdiag = -matrix.diagonal()
+
+    if options["preconditioner"] == "diagonal":
+        inv_diag = 1.0 / kdiag
+
+        def precondition(r):
+            return inv_diag * r
+
+    elif options["preconditioner"] == "ic0":
+        kdiag = numpy.reshape(kdiag, (ny, nx))
+
+        # Singular matrices, with only Neumann and periodic faces, get a positive
+        # rank-one update that keeps the incomplete factorization from breaking down
+        if is_singular(grid.bc_type[ivar]):
+            kdiag[0, 0] = 2.0 * kdiag[0, 0]
+
+        cx, cy = -1.0 / dx**2, -1.0 / dy**2
+        pivots = numpy.zeros((ny, nx))
+        jit_ic0_factor(kdiag, pivots, cx, cy)
+        work = numpy.zeros((ny, nx))
+
+        def precondition(r):
+            z = numpy.zeros((ny, nx))
+            jit_ic0_solve(pivots, numpy.reshape(r, (ny, nx)), work, z, cx, cy)
+            return z.ravel()
+
+    elif options["preconditioner"] == "multigrid":
+        levels = build_multigrid(grid, ivar)
+        cycle_index = {"V": 1, "W": 2}[options["mg_cycle"]]
+
+        # Equal number of pre and post sweeps keeps the cycle symmetric
+        if options["mg_presmooth"] != options["mg_postsmooth"]:
+            raise ValueError(
+                "Multigrid preconditioner needs mg_presmooth equal to mg_postsmooth"
+            )
+
+        sweeps = (options["mg_presmooth"], options["mg_postsmooth"])
+
+        def precondition(r):
+            phi = multigrid_cycle(
+                levels, -numpy.reshape(r, (ny, nx)), cycle_index, sweeps
+            )
+            return phi[1:-1, 1:-1].flatten()
+
+    else:
+        raise ValueError(
+            'Preconditioner "{}" not implemented'.format(options["preconditioner"])
+        )
+
+    return precondition
+
+
+@jit(nopython=True)
+def jit_ic0_factor(kdiag, pivots, cx, cy):
+    """Pivots of the zero fill-in incomplete Cholesky factorization.
+
+    For the 5-point stencil in natural ordering the factor keeps the
+    off-diagonal coefficients cx, cy of the matrix, only the pivots change.
+    """
+    ny, nx = kdiag.shape
+
+    for j in range(ny):
+        for i in range(nx):
+            pivot = kdiag[j, i]
+            if i > 0:
+                pivot -= cx * cx / pivots[j, i - 1]
+            if j > 0:
+                pivot -= cy * cy / pivots[j - 1, i]
+            pivots[j, i] = pivot
+
+
+@jit(nopython=True)
+def jit_ic0_solve(pivots, r, y, z, cx, cy):
+    """Forward and backward substitution with the incomplete factor."""
+    ny, nx = pivots.shape
+
+    for j in range(ny):
+        for i in range(nx):
+            value = r[j, i]
+            if i > 0:
+                value -= cx * y[j, i - 1]
+            if j > 0:
+                value -= cy * y[j - 1, i]
+            y[j, i] = value / pivots[j, i]
+
+    for j in range(ny - 1, -1, -1):
+        for i in range(nx - 1, -1, -1):
+            value = 0.0
+            if i < nx - 1:
+                value += cx * z[j, i + 1]
+            if j < ny - 1:
+                value += cy * z[j + 1, i]
+            z[j, i] = y[j, i] - value / pivots[j, i]
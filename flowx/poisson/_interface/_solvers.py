@@ -1,11 +1,16 @@
 """Routine to solve the Poisson equation."""
 
+import time
+
 import numpy
 import scipy.sparse as sps
 from scipy.sparse.linalg.dsolve import linsolve
 from scipy.sparse import spdiags, csr_matrix
 from scipy.sparse import linalg as sla
 
+from ._helpers import is_singular
+from ._operator import jit_laplacian, jit_dot, jit_axpy, jit_axpy_dot, jit_xpby
+
 
 def solve_stub(grid, ivar, rvar, options):
     """Stub for poisson solver.
@@ -56,50 +61,49 @@ def solve_cg(grid, ivar, rvar, options):
     verbose = options["verbose"]
     maxiter = options["maxiter"]
     tol = options["tol"]
+    timers = options["timers"]
 
-    def A(p):
-        return (p[1:-1, :-2] - 2 * p[1:-1, 1:-1] + p[1:-1, 2:]) / dx**2 + (
-            p[:-2, 1:-1] - 2 * p[1:-1, 1:-1] + p[2:, 1:-1]
-        ) / dy**2
-
-    def fill_guard_cells_neumann(x, bc_val, dx, dy):
-        x[:, 0] = bc_val * dx + x[:, 1]
-        x[:, -1] = bc_val * dx + x[:, -2]
-        x[0, :] = bc_val * dy + x[1, :]
-        x[-1, :] = bc_val * dy + x[-2, :]
-
-    p = grid[ivar][0, 0, :, :]  # initial guess
-    b = grid[rvar][0, 0, :, :]  # RHS of the system
-    dx, dy = grid.dx, grid.dy  # cell widths
+    operator = options["operator"]
+    idx2, idy2 = operator.idx2, operator.idy2
 
-    r = b[1:-1, 1:-1] - A(p)  # initial residuals
-    rk_norm = numpy.sum(r * r)  # inner product
-    d = numpy.zeros_like(p)  # search direction
-    d[1:-1, 1:-1] = r  # set direction to initial residual
+    p = grid[ivar][:, 0, 1:-1, 1:-1]  # interior of initial guess on all blocks
+    r = operator.residual(ivar, rvar)  # initial residuals
+    rk_norm = jit_dot(r, r)  # inner product
+    d = numpy.zeros_like(operator.work)  # search direction
+    d_interior = d[:, 0, 1:-1, 1:-1]
+    d_interior[:, :, :] = r  # set direction to initial residual
 
-    # Check for Neumann boundary conditions.
-    bc_type, bc_val = grid.bc_type[ivar][0], grid.bc_val[ivar][0]
-    if bc_type == "neumann":
-        # Apply Neumann boundary conditions to search direction.
-        fill_guard_cells_neumann(d, bc_val, dx, dy)
+    # Search directions satisfy homogeneous boundary conditions, which keeps
+    # the operator consistent with the guard cells of the initial guess
+    operator.fill_guard_cells(d)
+    Ad = numpy.empty_like(r)
 
     ites = 0  # iteration index
     res = rk_norm  # initial residual
+    options["residuals"]["initial"] = numpy.sqrt(rk_norm)
     while ites < maxiter and res > tol:
-        Ad = A(d)
-        alpha = rk_norm / numpy.sum(d[1:-1, 1:-1] * Ad)  # step size
-        p[1:-1, 1:-1] += alpha * d[1:-1, 1:-1]  # update solution
-        r -= alpha * Ad  # update residuals
-        r_norm = numpy.sum(r * r)  # inner product
+        start = time.perf_counter()
+        jit_laplacian(d[:, 0, :, :], idx2, idy2, Ad)
+        timers["stencil"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        alpha = rk_norm / jit_dot(d_interior, Ad)  # step size
+        jit_axpy(alpha, d_interior, p)  # update solution
+        r_norm = jit_axpy_dot(-alpha, Ad, r)  # update residuals and inner product
         beta = r_norm / rk_norm
         rk_norm = r_norm
-        d[1:-1, 1:-1] = r + beta * d[1:-1, 1:-1]  # update search direction
-        if bc_type == "neumann":
-            fill_guard_cells_neumann(d, bc_val, dx, dy)
+        jit_xpby(r, beta, d_interior)  # update search direction
+        timers["reduction"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        operator.fill_guard_cells(d)
+        timers["boundary"] += time.perf_counter() - start
+
         res = r_norm
         ites += 1
 
     grid.fill_guard_cells(ivar)
+    options["residuals"]["final"] = numpy.sqrt(res)
 
     if verbose:
         print("CG method:")
@@ -111,6 +115,91 @@ def solve_cg(grid, ivar, rvar, options):
     return ites, res
 
 
+def solve_pcg(grid, ivar, rvar, options):
+    """Solve the Poisson system using a preconditioned conjugate-gradient method.
+
+    The correction to the initial guess is computed with the assembled
+    Poisson matrix, negated to make it positive definite, and the
+    preconditioner selected by options['preconditioner'].
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    rvar : string
+        Name of the grid variable of the right-hand side.
+
+    options: dictionary
+
+    Returns
+    -------
+    ites: integer
+        Number of iterations computed.
+    residual: float
+        Final residual.
+    """
+
+    verbose = options["verbose"]
+    maxiter = options["maxiter"]
+    tol = options["tol"]
+    matrix = options["matrix"]
+    precondition = options["precondition"]
+
+    p = grid[ivar][0, 0, :, :]  # initial guess
+    b = grid[rvar][0, 0, :, :]  # RHS of the system
+    dx, dy = grid.dx, grid.dy  # cell widths
+
+    singular = is_singular(grid.bc_type[ivar])
+
+    grid.fill_guard_cells(ivar)
+    r = -(
+        b[1:-1, 1:-1]
+        - (p[1:-1, :-2] - 2 * p[1:-1, 1:-1] + p[1:-1, 2:]) / dx**2
+        - (p[:-2, 1:-1] - 2 * p[1:-1, 1:-1] + p[2:, 1:-1]) / dy**2
+    ).flatten()  # initial residuals of the negative system
+
+    if singular:
+        r -= numpy.mean(r)  # remove the incompatible part
+
+    x = numpy.zeros_like(r)  # correction to the initial guess
+    z = precondition(r)
+    d = numpy.copy(z)  # search direction
+    rz_norm = numpy.dot(r, z)
+
+    ites = 0  # iteration index
+    res = numpy.dot(r, r)  # initial residual
+    options["residuals"]["initial"] = numpy.sqrt(res)
+    while ites < maxiter and res > tol:
+        Kd = -(matrix @ d)
+        alpha = rz_norm / numpy.dot(d, Kd)  # step size
+        x += alpha * d  # update correction
+        r -= alpha * Kd  # update residuals
+        if singular:
+            r -= numpy.mean(r)
+        res = numpy.dot(r, r)
+        z = precondition(r)
+        r_norm = numpy.dot(r, z)
+        beta = r_norm / rz_norm
+        rz_norm = r_norm
+        d = z + beta * d  # update search direction
+        ites += 1
+
+    p[1:-1, 1:-1] += numpy.reshape(x, (grid.ny, grid.nx))
+    grid.fill_guard_cells(ivar)
+    options["residuals"]["final"] = numpy.sqrt(res)
+
+    if verbose:
+        print("PCG method ({}):".format(options["preconditioner"]))
+        if ites == maxiter:
+            print("Warning: maximum number of iterations reached!")
+        print("- Number of iterations: {}".format(ites))
+        print("- Final residual: {}".format(res))
+
+    return ites, res
+
+
 def solve_direct(grid, ivar, rvar, options):
 
     """Solve the Poisson system using a direct solver from the scipy library.
@@ -149,6 +238,60 @@ def solve_direct(grid, ivar, rvar, options):
     return None, residual
 
 
+def solve_direct_batch(grid, ivars, rvars, options):
+    """Solve the Poisson system for several right-hand sides at once.
+
+    Right-hand sides are stacked as columns of a 2D array and solved in a
+    single call, against the LU decomposition for the 'superlu' solver or
+    with spsolve for the 'direct' solver.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivars : list of strings
+        Names of the grid variables of the numerical solutions.
+    rvars : list of strings
+        Names of the grid variables of the right-hand sides.
+
+    options : dictionary
+
+    Returns
+    -------
+    ites: list of None
+        Number of iterations computed for each system.
+    residuals: list of floats
+        Final residual of each system.
+    """
+    verbose = options["verbose"]
+    matrix = options["matrix"]
+
+    nx, ny = grid.nx, grid.ny
+
+    rhs = numpy.stack([grid[rvar][0, 0, 1:-1, 1:-1].flatten() for rvar in rvars], 1)
+
+    if options["poisson_solver"] == "superlu" and options["precision"] == "mixed":
+        singular = is_singular(grid.bc_type[ivars[0]])
+        _, sol, _ = refine_solution(options["lu"], matrix, rhs, options, singular)
+    elif options["poisson_solver"] == "superlu":
+        sol = options["lu"].solve(rhs)
+    else:
+        sol = linsolve.spsolve(matrix, rhs)
+        sol = numpy.reshape(sol.toarray() if sps.issparse(sol) else sol, rhs.shape)
+
+    residuals = list(numpy.linalg.norm(matrix * sol - rhs, axis=0))
+
+    for column, ivar in enumerate(ivars):
+        grid[ivar][0, 0, 1:-1, 1:-1] = numpy.reshape(sol[:, column], (ny, nx))
+        grid.fill_guard_cells(ivar)
+
+    if verbose:
+        print("Batched Direct Solver ({} systems):".format(len(ivars)))
+        print("- Final residuals: {}".format(residuals))
+
+    return [None] * len(ivars), residuals
+
+
 def solve_jacobi(grid, ivar, rvar, options):
     """Solve the Poisson system using a Jacobi method.
 
@@ -173,28 +316,43 @@ def solve_jacobi(grid, ivar, rvar, options):
     maxiter = options["maxiter"]
     tol = options["tol"]
     verbose = options["verbose"]
+    check_every = options["check_every"]
+    timers = options["timers"]
 
-    phi = grid[ivar][0, 0, :, :]
-    b = grid[rvar][0, 0, :, :]
-    dx, dy = grid.dx, grid.dy
+    operator = options["operator"]
+    idx2, idy2 = operator.idx2, operator.idy2
+
+    phi = grid[ivar][:, 0, :, :]  # solution on all blocks
+    rhs = grid[rvar][:, 0, 1:-1, 1:-1]
+    update = numpy.empty(operator.interior)
 
     ites = 0
     residual = tol + 1.0
     while ites < maxiter and residual > tol:
-        phi_old = numpy.copy(phi)  # previous solution
-        phi[1:-1, 1:-1] = (
-            (phi_old[:-2, 1:-1] + phi_old[2:, 1:-1]) * dy**2
-            + (phi_old[1:-1, :-2] + phi_old[1:-1, 2:]) * dx**2
-            - b[1:-1, 1:-1] * dx**2 * dy**2
-        ) / (2 * (dx**2 + dy**2))
-
+        start = time.perf_counter()
         grid.fill_guard_cells(ivar)
+        timers["boundary"] += time.perf_counter() - start
+
+        # Jacobi update is the residual scaled by the inverse diagonal
+        start = time.perf_counter()
+        jit_laplacian(phi, idx2, idy2, update)
+        numpy.subtract(rhs, update, out=update)
+        if operator.singular:
+            update -= numpy.mean(update)
+        update /= operator.diag
+        phi[:, 1:-1, 1:-1] += update
+        timers["stencil"] += time.perf_counter() - start
 
-        residual = numpy.sqrt(
-            numpy.sum((phi - phi_old) ** 2) / ((grid.nx + 2) * (grid.ny + 2))
-        )
         ites += 1
 
+        # Residual is only reduced every check_every iterations
+        if ites % check_every == 0 or ites == maxiter:
+            start = time.perf_counter()
+            residual = numpy.sqrt(jit_dot(update, update) / phi.size)
+            timers["reduction"] += time.perf_counter() - start
+
+    grid.fill_guard_cells(ivar)
+
     if verbose:
         print("Jacobi method:")
         if ites == maxiter:
@@ -231,14 +389,80 @@ def solve_superlu(grid, ivar, rvar, options):
     rhs = grid[rvar][0, 0, :, :]
     phi = grid[ivar][0, 0, :, :]
 
-    sol = lu.solve(rhs[1:-1, 1:-1].flatten())
-    residual = numpy.linalg.norm(matrix * sol - rhs[1:-1, 1:-1].flatten())
+    ites = None
+    if options["precision"] == "mixed":
+        singular = is_singular(grid.bc_type[ivar])
+        ites, sol, residual = refine_solution(
+            lu, matrix, rhs[1:-1, 1:-1].flatten(), options, singular
+        )
+    else:
+        sol = lu.solve(rhs[1:-1, 1:-1].flatten())
+        residual = numpy.linalg.norm(matrix * sol - rhs[1:-1, 1:-1].flatten())
 
     phi[1:-1, 1:-1] = numpy.reshape(sol, (ny, nx))
     grid.fill_guard_cells(ivar)
 
     if verbose:
         print("LU Decomposition:")
+        if ites is not None:
+            print("- Number of refinement iterations: {}".format(ites))
         print("- Final residual: {}".format(residual))
 
-    return None, residual
+    return ites, residual
+
+
+def refine_solution(lu, matrix, rhs, options, singular=False):
+    """Solve with a float32 LU decomposition and float64 iterative refinement.
+
+    Residuals and corrections are accumulated in float64, so the solution
+    reaches the requested tolerance while the factors and triangular solves
+    use single precision. Constant modes are removed from residuals and
+    corrections of singular problems, with only Neumann and periodic faces.
+
+    Arguments
+    ---------
+    lu : SuperLU or TriangularLU object
+        LU decomposition in float32.
+    matrix : CSR format matrix
+        Poisson matrix in float64.
+    rhs : numpy.ndarray
+        Right-hand side, with one system per column of a 2D array.
+
+    options : dictionary
+
+    singular : bool
+        Whether the matrix has a constant null space.
+
+    Returns
+    -------
+    ites: integer
+        Number of refinement iterations computed.
+    sol: numpy.ndarray
+        Solution in float64.
+    residual: float
+        Final residual, the largest one over all systems.
+    """
+    maxiter = options["maxiter"]
+    tol = options["tol"]
+
+    sol = numpy.zeros_like(rhs, dtype=float)
+    res = numpy.array(rhs, dtype=float)
+    if singular:
+        res -= numpy.mean(res, axis=0)
+    residual = numpy.max(numpy.linalg.norm(res, axis=0))
+
+    ites = 0
+    while ites < maxiter and residual > tol:
+        correction = lu.solve(res.astype(numpy.float32))
+        if singular:
+            correction -= numpy.mean(correction, axis=0)
+
+        sol += correction
+        res = rhs - matrix @ sol
+        if singular:
+            res -= numpy.mean(res, axis=0)
+
+        residual = numpy.max(numpy.linalg.norm(res, axis=0))
+        ites += 1
+
+    return ites, sol, residual
@@ -0,0 +1,192 @@
+"""Fast Poisson solver based on discrete sine, cosine and Fourier transforms."""
+
+import numpy
+import scipy.fft
+
+
+def build_spectral(grid, ivar):
+    """Precompute transforms and eigenvalues for the spectral solver.
+
+    The eigenvectors of the 5-point Laplacian on a uniform cell-centered
+    mesh are known analytically for homogeneous boundary conditions, the
+    transform along each direction is picked from the pair of boundary
+    types on its low and high faces,
+
+    neumann   - neumann   : DCT-II
+    dirichlet - dirichlet : DST-II
+    neumann   - dirichlet : DCT-IV
+    dirichlet - neumann   : DST-IV
+    periodic  - periodic  : FFT
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+
+    Returns
+    -------
+    spectral : dictionary
+        Transforms along x and y and inverse of the eigenvalues.
+    """
+    bc_type = grid.bc_type[ivar]
+
+    transform_x, eigen_x = _transform(bc_type[0], bc_type[1], grid.nx, grid.dx)
+    transform_y, eigen_y = _transform(bc_type[2], bc_type[3], grid.ny, grid.dy)
+
+    eigenvalues = eigen_y[:, None] + eigen_x[None, :]
+
+    # The constant mode of singular problems is set to zero
+    inv_eigenvalues = numpy.zeros_like(eigenvalues)
+    nonzero = numpy.abs(eigenvalues) > 0.0
+    inv_eigenvalues[nonzero] = 1.0 / eigenvalues[nonzero]
+
+    return {
+        "transforms": [transform_y, transform_x],
+        "inv_eigenvalues": inv_eigenvalues,
+        "complex": "fft" in [transform_x[0], transform_y[0]],
+        "singular": not numpy.all(nonzero),
+    }
+
+
+def solve_spectral(grid, ivar, rvar, options):
+    """Solve the Poisson system using fast sine, cosine and Fourier transforms.
+
+    Non-zero Dirichlet and Neumann values from grid.bc_val are moved to the
+    right-hand side before the solve.
+
+    Arguments
+    ---------
+    grid : Grid object
+        Grid containing data.
+    ivar : string
+        Name of the grid variable of the numerical solution.
+    rvar : string
+        Name of the grid variable of the right-hand side.
+
+    options : dictionary
+
+    """
+    verbose = options["verbose"]
+    spectral = options["spectral"]
+
+    dx, dy = grid.dx, grid.dy
+
+    rhs = grid[rvar][0, 0, :, :]
+    phi = grid[ivar][0, 0, :, :]
+
+    coeff = _boundary_rhs(grid, ivar, rhs[1:-1, 1:-1])
+
+    for axis, (kind, kind_type) in enumerate(spectral["transforms"]):
+        coeff = _forward(coeff, kind, kind_type, axis)
+
+    coeff *= spectral["inv_eigenvalues"]
+
+    for axis, (kind, kind_type) in enumerate(spectral["transforms"]):
+        coeff = _inverse(coeff, kind, kind_type, axis)
+
+    phi[1:-1, 1:-1] = numpy.real(coeff) if spectral["complex"] else coeff
+    grid.fill_guard_cells(ivar)
+
+    res = (
+        rhs[1:-1, 1:-1]
+        - (phi[1:-1, :-2] - 2 * phi[1:-1, 1:-1] + phi[1:-1, 2:]) / dx**2
+        - (phi[:-2, 1:-1] - 2 * phi[1:-1, 1:-1] + phi[2:, 1:-1]) / dy**2
+    )
+
+    # Only the compatible part of the residual is reported for singular problems
+    if spectral["singular"]:
+        res -= numpy.mean(res)
+
+    residual = numpy.linalg.norm(res)
+
+    if verbose:
+        print("Spectral Solver:")
+        print("- Final residual: {}".format(residual))
+
+    return None, residual
+
+
+def _transform(bc_low, bc_high, num, delta):
+    """Private method to select transform and eigenvalues along a direction."""
+    index = numpy.arange(num)
+
+    if bc_low == "periodic" and bc_high == "periodic":
+        transform = ("fft", None)
+        theta = numpy.pi * index / num
+
+    elif bc_low == "neumann" and bc_high == "neumann":
+        transform = ("dct", 2)
+        theta = numpy.pi * index / (2 * num)
+
+    elif bc_low == "dirichlet" and bc_high == "dirichlet":
+        transform = ("dst", 2)
+        theta = numpy.pi * (index + 1) / (2 * num)
+
+    elif bc_low == "neumann" and bc_high == "dirichlet":
+        transform = ("dct", 4)
+        theta = numpy.pi * (2 * index + 1) / (4 * num)
+
+    elif bc_low == "dirichlet" and bc_high == "neumann":
+        transform = ("dst", 4)
+        theta = numpy.pi * (2 * index + 1) / (4 * num)
+
+    else:
+        raise ValueError(
+            'Boundary types "{}", "{}" not supported by spectral solver'.format(
+                bc_low, bc_high
+            )
+        )
+
+    eigenvalues = -4.0 * numpy.sin(theta) ** 2 / delta**2
+
+    return transform, eigenvalues
+
+
+def _forward(values, kind, kind_type, axis):
+    """Private method for the forward transform along an axis."""
+    if kind == "fft":
+        return scipy.fft.fft(values, axis=axis, norm="ortho")
+    elif kind == "dct":
+        return scipy.fft.dct(values, type=kind_type, axis=axis, norm="ortho")
+    else:
+        return scipy.fft.dst(values, type=kind_type, axis=axis, norm="ortho")
+
+
+def _inverse(values, kind, kind_type, axis):
+    """Private method for the inverse transform along an axis."""
+    if kind == "fft":
+        return scipy.fft.ifft(values, axis=axis, norm="ortho")
+    elif kind == "dct":
+        return scipy.fft.idct(values, type=kind_type, axis=axis, norm="ortho")
+    else:
+        return scipy.fft.idst(values, type=kind_type, axis=axis, norm="ortho")
+
+
+def _boundary_rhs(grid, ivar, rhs):
+    """Private method to move boundary values to the right-hand side."""
+    rhs = numpy.copy(rhs)
+
+    dx, dy = grid.dx, grid.dy
+    bc_type, bc_val = grid.bc_type[ivar], grid.bc_val[ivar]
+
+    # Values at guard cells come from [xlow, xhigh, ylow, yhigh] conditions
+    faces = [(slice(None), 0), (slice(None), -1), (0, slice(None)), (-1, slice(None))]
+    deltas = [dx, dx, dy, dy]
+
+    for face, delta, face_bc, val in zip(faces, deltas, bc_type, bc_val):
+        if face_bc == "periodic" or numpy.all(numpy.asarray(val) == 0.0):
+            continue
+
+        # Interior part of the boundary value along the face
+        val = numpy.asarray(val, dtype=float)
+        if val.ndim:
+            val = val[1:-1]
+
+        if face_bc == "dirichlet":
+            rhs[face] -= 2 * val / delta**2
+        elif face_bc == "neumann":
+            rhs[face] -= val / delta
+
+    return rhs
@@ -1,5 +1,7 @@
 """Interface for Poisson solver module"""
 
+import numpy
+
 from . import _interface
 
 
@@ -21,13 +23,75 @@ class Poisson(object):
         poisson_info : Dictionary of keyword arguments
 
         'poisson_solver' keyword refers to the type of solver to be used
-        poisson_info['poisson_solver'] = 'serial_cg' --> default
-                                       = 'serial_jacobi'
+        poisson_info['poisson_solver'] = 'superlu' --> default
+                                       = 'direct'
+                                       = 'cg'
+                                       = 'jacobi'
+                                       = 'multigrid'
+                                       = 'pcg'
+                                       = 'spectral'
+                                       = 'krylov'
+                                       = 'sor'
+
+        Only 'cg', 'jacobi' and 'krylov' support grids with multiple blocks
+
+        Use solve_batch to solve for several right-hand sides with the same setup
 
         poisson_info['maxiter'] = maximum number of iterations --> default 2000
         poisson_info['tol']     = minimum tolerance of the residuals --> default 1e-9
         poisson_info['verbose'] = bool to displacy poisson stats or not --> default False
 
+        poisson_info['warm_start'] = initial guess for iterative solvers
+                                   = None --> default, current value of Phi
+                                   = 'previous', solution from the previous solve
+                                   = 'extrapolate', linear extrapolation in time from
+                                     the previous two solutions
+        stats['ites_saved_est'] is an estimate of the iterations saved by the warm
+        start from the convergence rate of the solve, not a measured count, and None
+        for 'jacobi', which does not report residuals
+
+        Options for 'jacobi' and 'sor' solvers
+        poisson_info['check_every'] = iterations between residual checks --> default 1
+        'cg' ignores 'check_every', its residual norm comes from the inner product
+        that is needed for the update anyway
+
+        Time spent in 'stencil', 'reduction' and 'boundary' phases of the 'cg' and
+        'jacobi' solvers is stored in stats after each solve
+
+        Options for 'direct' and 'superlu' solvers
+        poisson_info['factorization_cache'] = bool to share LU factorizations between
+                                              Poisson units --> default True
+        poisson_info['cache_dir'] = directory to persist LU factorizations --> default None
+
+        Options for 'superlu' solver
+        poisson_info['precision'] = 'double' --> default
+                                  = 'mixed', float32 LU decomposition with float64
+                                    iterative refinement up to tol
+
+        Options for 'pcg' solver
+        poisson_info['preconditioner'] = 'diagonal' --> default
+                                       = 'ic0'
+                                       = 'multigrid' (one V-cycle)
+
+        Options for 'krylov' solver, matrix-free methods from scipy.sparse.linalg
+        poisson_info['krylov_method'] = 'cg' --> default
+                                      = 'bicgstab'
+                                      = 'gmres'
+        poisson_info['gmres_restart'] = iterations between GMRES restarts --> default 20
+
+        Options for 'sor' solver
+        poisson_info['sor_omega'] = relaxation factor --> default None, optimal value
+
+        Options for 'multigrid' solver and preconditioner, levels halve nx and ny
+        while both are even, so they need to be divisible by a large power of two,
+        grids that cannot be coarsened at all raise a ValueError
+        poisson_info['mg_cycle']      = 'V' --> default
+                                      = 'W'
+        poisson_info['mg_presmooth']  = red-black sweeps before restriction --> default 2
+        poisson_info['mg_postsmooth'] = red-black sweeps after prolongation --> default 2
+        The preconditioner must stay symmetric for 'pcg', which needs equal
+        'mg_presmooth' and 'mg_postsmooth'
+
         """
         # ---------------------Create images of other units and objects----------------
         self._grid = grid
@@ -39,18 +103,43 @@ class Poisson(object):
             "maxiter": 2000,
             "tol": 1e-9,
             "verbose": False,
+            "mg_cycle": "V",
+            "mg_presmooth": 2,
+            "mg_postsmooth": 2,
+            "preconditioner": "diagonal",
+            "krylov_method": "cg",
+            "gmres_restart": 20,
+            "sor_omega": None,
+            "warm_start": None,
+            "factorization_cache": True,
+            "cache_dir": None,
+            "check_every": 1,
+            "precision": "double",
+            "timers": dict(),
         }
 
         self._serial_iterative_solvers = {
             "cg": _interface.solve_cg,
             "jacobi": _interface.solve_jacobi,
+            "multigrid": _interface.solve_multigrid,
+            "pcg": _interface.solve_pcg,
+            "krylov": _interface.solve_krylov,
+            "sor": _interface.solve_sor,
         }
 
         self._serial_direct_solvers = {
             "direct": _interface.solve_direct,
             "superlu": _interface.solve_superlu,
+            "spectral": _interface.solve_spectral,
         }
 
+        # Solutions from previous solves and stats for warm starts
+        self._history = []
+        self.stats = dict()
+
+        # Version of boundary types of Phi the solver data was built for
+        self._bc_version = None
+
         # ----------------------Read user parameters------------------------------------
         if poisson_info:
             for key in poisson_info:
@@ -68,16 +157,222 @@ class Poisson(object):
                 **self._serial_direct_solvers,
             }[self._options["poisson_solver"]]
 
-            (
-                self._options["lu"],
-                self._options["matrix"],
-            ) = _interface.build_sparse_matrix(self._grid, self._ivar)
+            # Matrix-free solvers work on all blocks using halo exchange
+            if grid.nblocks > 1 and self._options["poisson_solver"] not in [
+                "cg",
+                "jacobi",
+                "krylov",
+            ]:
+                raise ValueError(
+                    'Poisson solver "{}" does not support multiple blocks'.format(
+                        self._options["poisson_solver"]
+                    )
+                )
+
+            if (
+                self._options["precision"] == "mixed"
+                and self._options["poisson_solver"] != "superlu"
+            ):
+                raise ValueError(
+                    'Poisson solver "{}" does not support mixed precision'.format(
+                        self._options["poisson_solver"]
+                    )
+                )
+
+            self._setup()
 
         return
 
     def solve(self):
         """Subroutine to solve poisson equation"""
 
+        # Rebuild matrices and factorizations if boundary types have changed
+        if (
+            self._solve is not _interface.solve_stub
+            and self._grid.bc_version[self._ivar] != self._bc_version
+        ):
+            self._setup()
+
+        warm_start = (
+            self._options["warm_start"] is not None
+            and self._solve in self._serial_iterative_solvers.values()
+        )
+
+        if warm_start:
+            res_cold = self._set_initial_guess()
+
+        self._options["timers"] = dict(stencil=0.0, reduction=0.0, boundary=0.0)
+        self._options["residuals"] = dict()
+
         ites, residual = self._solve(self._grid, self._ivar, self._rvar, self._options)
 
+        for phase, elapsed in self._options["timers"].items():
+            self.stats[phase + "_time"] = elapsed
+
+        if warm_start:
+            self._update_history(ites, res_cold)
+
         return ites, residual
+
+    def solve_batch(self, poisson_pairs):
+        """
+        Subroutine to solve poisson equation for several right-hand sides
+
+        Arguments
+        ---------
+        poisson_pairs : list of [ivar, rvar] pairs of grid variables, each ivar
+                        has the same boundary types as Phi of this unit
+
+        'direct' and 'superlu' solvers stack all right-hand sides and solve them
+        in one call, other solvers reuse their setup and solve pairs in turn
+
+        Stub units raise a ValueError
+
+        Returns
+        -------
+        ites : list with number of iterations of each solve
+        residuals : list with final residual of each solve
+        """
+        if self._solve not in [
+            *self._serial_iterative_solvers.values(),
+            *self._serial_direct_solvers.values(),
+        ]:
+            raise ValueError(
+                "[flowx.poisson.Poisson]:solve_batch is not supported by a stub unit"
+            )
+
+        bc_type = self._grid.bc_type[self._ivar]
+        for ivar, _ in poisson_pairs:
+            if self._grid.bc_type[ivar] != bc_type:
+                raise ValueError(
+                    'Boundary types of "{}" do not match "{}"'.format(ivar, self._ivar)
+                )
+
+        if self._grid.bc_version[self._ivar] != self._bc_version:
+            self._setup()
+
+        ivars, rvars = [list(names) for names in zip(*poisson_pairs)]
+
+        if self._options["poisson_solver"] in ["direct", "superlu"]:
+            return _interface.solve_direct_batch(
+                self._grid, ivars, rvars, self._options
+            )
+
+        self._options["timers"] = dict(stencil=0.0, reduction=0.0, boundary=0.0)
+        self._options["residuals"] = dict()
+
+        ites, residuals = [], []
+        for ivar, rvar in poisson_pairs:
+            ites_pair, residual = self._solve(self._grid, ivar, rvar, self._options)
+            ites.append(ites_pair)
+            residuals.append(residual)
+
+        return ites, residuals
+
+    def _setup(self):
+        """
+        Private method to build solver data that depends on boundary types
+
+        Called again from solve when bc_version of Phi changes on the grid
+        """
+        self._bc_version = self._grid.bc_version[self._ivar]
+
+        if self._options["poisson_solver"] in ["direct", "superlu"]:
+            dtype = numpy.float32 if self._options["precision"] == "mixed" else float
+
+            if self._options["factorization_cache"]:
+                (
+                    self._options["lu"],
+                    self._options["matrix"],
+                ) = _interface.cached_sparse_matrix(
+                    self._grid,
+                    self._ivar,
+                    self._options["poisson_solver"],
+                    self._options["cache_dir"],
+                    dtype,
+                )
+
+            else:
+                (
+                    self._options["lu"],
+                    self._options["matrix"],
+                ) = _interface.build_sparse_matrix(self._grid, self._ivar, dtype)
+
+        elif self._options["poisson_solver"] in ["cg", "jacobi", "krylov"]:
+            self._options["operator"] = _interface.LaplacianOperator(
+                self._grid, self._ivar
+            )
+
+        elif self._options["poisson_solver"] == "pcg":
+            self._options["matrix"] = _interface.assemble_sparse_matrix(
+                self._grid, self._ivar
+            )
+            self._options["precondition"] = _interface.build_preconditioner(
+                self._grid, self._ivar, self._options["matrix"], self._options
+            )
+
+        elif self._options["poisson_solver"] == "sor":
+            self._options["sor"] = _interface.build_sor(
+                self._grid, self._ivar, self._options
+            )
+
+        elif self._options["poisson_solver"] == "spectral":
+            self._options["spectral"] = _interface.build_spectral(
+                self._grid, self._ivar
+            )
+
+        elif self._options["poisson_solver"] == "multigrid":
+            self._options["levels"] = _interface.build_multigrid(self._grid, self._ivar)
+
+    def _set_initial_guess(self):
+        """
+        Private method to set initial guess from previous solutions
+
+        Returns the residual norm for the current value of Phi, None if it is kept
+        """
+        phi = self._grid[self._ivar][:, 0, 1:-1, 1:-1]
+
+        if not self._history:
+            return None
+
+        res_cold = _interface.residual_norm(self._grid, self._ivar, self._rvar)
+
+        if self._options["warm_start"] == "extrapolate" and len(self._history) == 2:
+            phi[:] = 2.0 * self._history[-1] - self._history[-2]
+        else:
+            phi[:] = self._history[-1]
+
+        return res_cold
+
+    def _update_history(self, ites, res_cold):
+        """
+        Private method to store the current solution and estimate saved iterations
+
+        The initial and final residuals reported by the solver give its convergence
+        rate, which estimates the number of iterations needed to reduce the residual
+        from res_cold to that of the initial guess. The estimate is None for solvers
+        that do not report residuals.
+        """
+        phi = self._grid[self._ivar][:, 0, 1:-1, 1:-1]
+
+        self._history.append(numpy.copy(phi))
+        self._history = self._history[-2:]
+
+        residuals = self._options["residuals"]
+        if "initial" not in residuals:
+            self.stats["ites_saved_est"] = None
+            return
+
+        res_warm, res_final = residuals["initial"], residuals["final"]
+
+        ites_saved = 0
+        if res_cold is not None and ites and res_cold > res_warm > res_final > 0.0:
+            ites_saved = int(
+                round(
+                    ites
+                    * numpy.log(res_cold / res_warm)
+                    / numpy.log(res_warm / res_final)
+                )
+            )
+
+        self.stats["ites_saved_est"] = ites_saved
@@ -5,7 +5,7 @@ import unittest
 
 
 def main():
-    tests = ["grid", "poisson"]
+    tests = ["grid", "poisson", "ins"]
 
     suite = unittest.TestSuite()
 
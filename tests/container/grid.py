@@ -76,6 +76,152 @@ class TestGrid(unittest.TestCase):
         expected_l2_norm = numpy.linalg.norm(values) / num
         self.assertTrue(abs(l2_norm - expected_l2_norm) < 1e-12)
 
+    def test_bc_version(self):
+        """Test the boundary version only changes with boundary types."""
+        ivar = self.varlist[0]
+        version = self.grid.bc_version[ivar]
+        self.grid.update_bc_type({ivar: 4 * ["neumann"]})
+        self.assertEqual(self.grid.bc_version[ivar], version)
+        self.grid.update_bc_type({ivar: 2 * ["neumann", "dirichlet"]})
+        self.assertEqual(self.grid.bc_version[ivar], version + 1)
+        self.grid.update_bc_val({ivar: 4 * [1.0]})
+        self.assertEqual(self.grid.bc_version[ivar], version + 1)
+
+    def test_fill_guard_cells(self):
+        """Test guard cells of boundary blocks on a grid with multiple blocks."""
+        bc_type = dict(ivar=["dirichlet", "projection", "neumann", None])
+        bc_val = dict(ivar=[1.0, 0.0, 0.5, 0.0])
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            self.varlist,
+            self.nx,
+            self.ny,
+            self.xmin,
+            self.xmax,
+            self.ymin,
+            self.ymax,
+            xblocks=2,
+            yblocks=2,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        data = grid["ivar"]
+        data[:] = numpy.random.rand(*data.shape)
+        guards = numpy.copy(data[:, :, -1, :])
+        grid.fill_guard_cells("ivar")
+
+        for block in grid.blocklist:
+            tag, neighbors = block.tag, block.neighdict
+            if neighbors["xlow"] is None:
+                self.assertTrue(
+                    numpy.allclose(data[tag, :, :, 0], 2.0 - data[tag, :, :, 1])
+                )
+            if neighbors["xhigh"] is None:
+                self.assertTrue(
+                    numpy.allclose(
+                        data[tag, :, :, -1],
+                        2 * data[tag, :, :, -2] - data[tag, :, :, -3],
+                    )
+                )
+            if neighbors["ylow"] is None:
+                self.assertTrue(
+                    numpy.allclose(
+                        data[tag, :, 0, 1:-1], 0.5 * grid.dy + data[tag, :, 1, 1:-1]
+                    )
+                )
+            if neighbors["yhigh"] is None:
+                self.assertTrue(
+                    numpy.allclose(data[tag, :, -1, 1:-1], guards[tag, :, 1:-1])
+                )
+
+        with self.assertRaises(ValueError):
+            grid.update_bc_type(dict(ivar=4 * ["unknown"]))
+
+    def test_periodic(self):
+        """Test periodic guard cells wrap around blocks on opposite faces."""
+        for gridtype in ["cell-centered", "x-face", "y-face"]:
+            grid = flowx.domain.Grid(
+                gridtype,
+                ["ivar"],
+                self.nx,
+                self.ny,
+                self.xmin,
+                self.xmax,
+                self.ymin,
+                self.ymax,
+                xblocks=2,
+                yblocks=2,
+                user_bc_type=dict(ivar=4 * ["periodic"]),
+                user_bc_val=dict(ivar=4 * [0.0]),
+            )
+
+            data = grid["ivar"]
+            data[:] = numpy.random.rand(*data.shape)
+            grid.fill_guard_cells("ivar")
+
+            xlow, xpartner = grid.periodic_blocks["xlow"]
+            ylow, ypartner = grid.periodic_blocks["ylow"]
+            nxb, nyb = grid.nxb, grid.nyb
+
+            if grid.xguard:
+                self.assertTrue(
+                    numpy.array_equal(data[xlow, :, :, 0], data[xpartner, :, :, nxb])
+                )
+                self.assertTrue(
+                    numpy.array_equal(data[xpartner, :, :, -1], data[xlow, :, :, 1])
+                )
+            else:
+                self.assertTrue(
+                    numpy.array_equal(data[xpartner, :, :, -1], data[xlow, :, :, 0])
+                )
+
+            if grid.yguard:
+                self.assertTrue(
+                    numpy.array_equal(data[ylow, :, 0, :], data[ypartner, :, nyb, :])
+                )
+                self.assertTrue(
+                    numpy.array_equal(data[ypartner, :, -1, :], data[ylow, :, 1, :])
+                )
+            else:
+                self.assertTrue(
+                    numpy.array_equal(data[ypartner, :, -1, :], data[ylow, :, 0, :])
+                )
+
+        with self.assertRaises(ValueError):
+            grid.update_bc_type(dict(ivar=["periodic", "neumann"] * 2))
+
+    def test_fill_guard_cells_varlist(self):
+        """Test filling a list of variables matches filling them one by one."""
+        bc_type = {varkey: ["dirichlet", "neumann"] * 2 for varkey in self.varlist}
+        bc_val = {varkey: [1.0, 0.5, 0.0, -1.0] for varkey in self.varlist}
+        grid = flowx.domain.Grid(
+            "y-face",
+            self.varlist,
+            self.nx,
+            self.ny,
+            self.xmin,
+            self.xmax,
+            self.ymin,
+            self.ymax,
+            xblocks=2,
+            yblocks=2,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        values = {}
+        for varkey in self.varlist:
+            values[varkey] = numpy.random.rand(*grid[varkey].shape)
+            grid[varkey][:] = values[varkey]
+            grid.fill_guard_cells(varkey)
+            values[varkey], grid[varkey][:] = numpy.copy(grid[varkey]), values[varkey]
+
+        grid.fill_guard_cells(self.varlist)
+
+        for varkey in self.varlist:
+            self.assertTrue(numpy.array_equal(grid[varkey], values[varkey]))
+
 
 if __name__ == "__main__":
     unittest.main()
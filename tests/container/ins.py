@@ -0,0 +1,422 @@
+"""Tests for `flowx/ins/_ins.py`."""
+
+import numpy
+import tracemalloc
+import unittest
+
+import flowx
+
+
+class TestIncompNS(unittest.TestCase):
+    """Unit-tests for the incompressible Navier-Stokes unit."""
+
+    def setUp(self):
+        """Set up parameters of a lid-driven cavity."""
+        self.nx, self.ny = 16, 16
+        self.nsteps = 5
+        self.ins_vars = ["velc", "hvar", "divv", "pres", "delp"]
+
+    def _advance(
+        self,
+        xblocks,
+        yblocks,
+        ins_info,
+        dt=0.001,
+        cfl=None,
+        Re=100.0,
+        poisson_solver="cg",
+    ):
+        """Private method to advance a lid-driven cavity on a grid of blocks."""
+        gridc, gridx, gridy, scalars, particles = flowx.domain.Domain(
+            self.nx,
+            self.ny,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            ["pres", "divv", "delp"],
+            ["velc", "hvar"],
+            dict(tmax=1.0, dt=dt, Re=Re, cfl=cfl),
+            bc_type_center=dict(delp=4 * ["neumann"]),
+            bc_val_center=dict(delp=4 * [0.0]),
+            bc_type_facex=dict(velc=4 * ["dirichlet"]),
+            bc_val_facex=dict(velc=[0.0, 0.0, 0.0, 1.0]),
+            bc_type_facey=dict(velc=4 * ["dirichlet"]),
+            bc_val_facey=dict(velc=4 * [0.0]),
+            xblocks=xblocks,
+            yblocks=yblocks,
+        )
+
+        poisson_info = dict(poisson_solver=poisson_solver, maxiter=2000, tol=1e-12)
+        poisson = flowx.poisson.Poisson(gridc, ["delp", "divv"], poisson_info)
+        imbound = flowx.imbound.ImBound()
+        ins = flowx.ins.IncompNS(
+            poisson,
+            imbound,
+            [gridc, gridx, gridy, scalars, particles],
+            self.ins_vars,
+            ins_info,
+        )
+
+        for _ in range(self.nsteps):
+            ins.advance()
+            scalars.advance()
+
+        return gridc, gridx, gridy, scalars
+
+    def _gather(self, grid, varkey):
+        """Private method to gather values of all blocks without guard cells."""
+        ny = self.ny + (grid.type_ == "y-face")
+        nx = self.nx + (grid.type_ == "x-face")
+        nyb, nxb = grid.nyb, grid.nxb
+
+        values = numpy.zeros((ny, nx))
+        for block in grid.blocklist:
+            i, j = int(round(block.xmin / grid.dx)), int(round(block.ymin / grid.dy))
+            values[j : j + nyb, i : i + nxb] = block[varkey][
+                0,
+                grid.yguard : grid.yguard + nyb,
+                grid.xguard : grid.xguard + nxb,
+            ]
+
+        return values
+
+    def test_blocks(self):
+        """Test velocity on 2x2 blocks matches the single block solution."""
+        for time_stepping in ["euler", "ab2", "rk3"]:
+            _, gridx, gridy, scalars = self._advance(
+                1, 1, dict(time_stepping=time_stepping)
+            )
+            _, gridx_blocks, gridy_blocks, scalars_blocks = self._advance(
+                2, 2, dict(time_stepping=time_stepping, nthreads=2)
+            )
+
+            for grid, grid_blocks in [(gridx, gridx_blocks), (gridy, gridy_blocks)]:
+                self.assertTrue(
+                    numpy.allclose(
+                        self._gather(grid_blocks, "velc"),
+                        self._gather(grid, "velc"),
+                        atol=1e-12,
+                    )
+                )
+
+            self.assertAlmostEqual(
+                scalars_blocks.stats["max_u"], scalars.stats["max_u"], places=12
+            )
+
+    def test_direct_solvers(self):
+        """Test direct Poisson solvers, which report no iterations."""
+        for time_stepping in ["ab2", "rk3"]:
+            _, gridx, _, scalars = self._advance(
+                1, 1, dict(time_stepping=time_stepping)
+            )
+            self.assertTrue(scalars.stats["ites"] > 0)
+
+            for poisson_solver in ["superlu", "direct"]:
+                _, gridx_direct, _, scalars_direct = self._advance(
+                    1,
+                    1,
+                    dict(time_stepping=time_stepping),
+                    poisson_solver=poisson_solver,
+                )
+
+                self.assertIsNone(scalars_direct.stats["ites"])
+                self.assertTrue(
+                    numpy.allclose(
+                        self._gather(gridx_direct, "velc"),
+                        self._gather(gridx, "velc"),
+                        atol=1e-10,
+                    )
+                )
+
+    def test_rk3(self):
+        """Test third-order convergence in time of the Runge-Kutta scheme."""
+        tmax = 0.04
+
+        velocity = []
+        for dt in [tmax / 4, tmax / 8, tmax / 32]:
+            self.nsteps = int(round(tmax / dt))
+            _, gridx, _, scalars = self._advance(1, 1, dict(time_stepping="rk3"), dt)
+            velocity.append(self._gather(gridx, "velc"))
+
+            self.assertTrue(scalars.stats["max_div"] < 1e-8)
+
+        errors = [numpy.abs(values - velocity[-1]).max() for values in velocity[:-1]]
+        self.assertTrue(errors[0] / errors[1] > 6.0)
+
+    def test_adaptive_dt(self):
+        """Test time-steps adapt to stability limits with bounded growth."""
+        self.nsteps = 20
+
+        dt_visc = dict()
+        for time_stepping in ["euler", "ab2", "rk3"]:
+            _, _, _, scalars = self._advance(
+                1, 1, dict(time_stepping=time_stepping), cfl=0.5
+            )
+            dt_visc[time_stepping] = scalars.stats["dt_visc"]
+
+            limit = 0.5 * min(scalars.stats["dt_conv"], scalars.stats["dt_visc"])
+            self.assertTrue(scalars.dt <= limit * (1.0 + 1e-12))
+            self.assertTrue(
+                scalars.dt <= scalars.dt_growth * scalars.dt_old * (1.0 + 1e-12)
+            )
+            self.assertTrue(scalars.time > 2 * self.nsteps * 0.001)
+            self.assertTrue(scalars.stats["max_div"] < 1e-8)
+
+        # Explicit diffusion limits relative to forward Euler
+        self.assertAlmostEqual(dt_visc["ab2"], 0.5 * dt_visc["euler"], places=15)
+        self.assertAlmostEqual(dt_visc["rk3"], 1.25 * dt_visc["euler"], places=15)
+
+    def test_crank_nicolson(self):
+        """Test implicit diffusion past the explicit viscous time-step limit."""
+        ins_info = dict(diffusion="crank_nicolson")
+        dt = 0.01
+
+        _, gridx, gridy, scalars = self._advance(1, 1, ins_info, dt=dt, Re=1.0)
+
+        self.assertTrue(dt > 10 * 0.5 * 1.0 / (2 * self.nx**2))
+        self.assertTrue(numpy.abs(self._gather(gridx, "velc")).max() <= 1.0)
+        self.assertTrue(scalars.stats["max_div"] < 1e-8)
+        self.assertEqual(scalars.stats["dt_visc"], numpy.inf)
+
+        for xblocks, yblocks, predictor_backend in [(2, 2, "numpy"), (1, 1, "numba")]:
+            _, gridx_other, gridy_other, _ = self._advance(
+                xblocks,
+                yblocks,
+                dict(ins_info, predictor_backend=predictor_backend),
+                dt=dt,
+                Re=1.0,
+            )
+
+            for grid, grid_other in [(gridx, gridx_other), (gridy, gridy_other)]:
+                self.assertTrue(
+                    numpy.allclose(
+                        self._gather(grid_other, "velc"),
+                        self._gather(grid, "velc"),
+                        atol=1e-10,
+                    )
+                )
+
+        with self.assertRaises(ValueError):
+            self._advance(1, 1, dict(ins_info, time_stepping="rk3"))
+
+    def test_crank_nicolson_cache(self):
+        """Test adaptive time-steps keep one Helmholtz factorization per grid."""
+        cache = flowx.poisson.factorization_cache
+        cache.clear()
+
+        self.nsteps = 10
+        _, _, _, scalars = self._advance(
+            1,
+            1,
+            dict(diffusion="crank_nicolson"),
+            cfl=0.5,
+            Re=1.0,
+            poisson_solver="superlu",
+        )
+
+        # Every step has a new time-step, the Poisson factorization and one
+        # Helmholtz factorization for each face grid remain
+        self.assertNotEqual(scalars.dt, scalars.dt_old)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(len([key for key in cache if key[0] == "helmholtz"]), 2)
+        cache.clear()
+
+    def test_stats(self):
+        """Test fused stats match array reductions and are skipped between steps."""
+        gridc, gridx, gridy, scalars = self._advance(2, 2, dict())
+
+        div = self._gather(gridc, "divv")
+        self.assertEqual(scalars.stats["max_u"], gridx["velc"].max())
+        self.assertEqual(scalars.stats["min_v"], gridy["velc"].min())
+        self.assertEqual(scalars.stats["max_div"], div.max())
+        self.assertAlmostEqual(
+            scalars.stats["l2_div"],
+            numpy.sqrt(numpy.sum(div**2) * gridc.dx * gridc.dy),
+            places=20,
+        )
+        self.assertTrue(scalars.stats["cfl"] <= scalars.dt / scalars.stats["dt_conv"])
+
+        # The last step is skipped for stats_every=3, its divergence is still
+        # that of the corrected velocity
+        for stats_every, equal in [(2, True), (3, False)]:
+            gridc_every, gridx_every, _, scalars_every = self._advance(
+                2, 2, dict(stats_every=stats_every)
+            )
+
+            self.assertTrue(numpy.array_equal(gridx_every["velc"], gridx["velc"]))
+            self.assertTrue(
+                numpy.allclose(
+                    self._gather(gridc_every, "divv"), div, rtol=0.0, atol=1e-20
+                )
+            )
+            self.assertEqual(
+                scalars_every.stats["max_v"] == scalars.stats["max_v"], equal
+            )
+
+    def test_predictor_backend(self):
+        """Test compiled predictor kernels match the numpy reference."""
+        for xblocks, yblocks in [(1, 1), (2, 2)]:
+            for time_stepping in ["euler", "ab2"]:
+                _, gridx, gridy, scalars = self._advance(
+                    xblocks, yblocks, dict(time_stepping=time_stepping)
+                )
+                _, gridx_numba, gridy_numba, scalars_numba = self._advance(
+                    xblocks,
+                    yblocks,
+                    dict(time_stepping=time_stepping, predictor_backend="numba"),
+                )
+
+                for grid, grid_numba in [(gridx, gridx_numba), (gridy, gridy_numba)]:
+                    for varkey in ["velc", "hvar"]:
+                        self.assertTrue(
+                            numpy.allclose(
+                                grid_numba[varkey], grid[varkey], rtol=0.0, atol=1e-12
+                            )
+                        )
+
+    def test_workspace(self):
+        """Test steady-state operator calls do no large allocations."""
+        self.nx, self.ny, self.nsteps = 512, 512, 0
+
+        for xblocks, yblocks in [(1, 1), (2, 2)]:
+            for predictor_backend in ["numpy", "numba"]:
+                gridc, gridx, gridy, _ = self._advance(xblocks, yblocks, dict())
+                options = dict(
+                    predictor_backend=predictor_backend,
+                    workspace=flowx.ins._interface.Workspace(),
+                )
+
+                def step():
+                    flowx.ins._interface.predictor_ab2(
+                        gridc,
+                        gridx,
+                        gridy,
+                        "velc",
+                        "hvar",
+                        "pres",
+                        100.0,
+                        0.001,
+                        1,
+                        options,
+                    )
+                    flowx.ins._interface.divergence(
+                        gridc, gridx, gridy, "velc", "divv", 0.001, options
+                    )
+                    flowx.ins._interface.corrector(
+                        gridc, gridx, gridy, "velc", "pres", "delp", 0.001, 1, options
+                    )
+                    flowx.ins._interface.stats(
+                        gridc, gridx, gridy, "velc", "pres", "divv", options
+                    )
+
+                step()
+
+                tracemalloc.start()
+                step()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                # Ufuncs and reductions keep buffers of a fixed size, so only
+                # allocations that grow with the grid are ruled out
+                self.assertTrue(options["workspace"].nbytes > 0)
+                self.assertTrue(peak < gridc["pres"].nbytes / 8)
+
+    def test_taylor_green(self):
+        """Test decay of a Taylor-Green vortex with periodic boundaries."""
+        self.nx, self.ny = 32, 32
+        periodic = 4 * ["periodic"]
+
+        def velocity_x(x, y):
+            return -numpy.cos(x) * numpy.sin(y)
+
+        def velocity_y(x, y):
+            return numpy.sin(x) * numpy.cos(y)
+
+        for xblocks, yblocks, poisson_solver in [(1, 1, "superlu"), (2, 2, "cg")]:
+            gridc, gridx, gridy, scalars, particles = flowx.domain.Domain(
+                self.nx,
+                self.ny,
+                0.0,
+                2 * numpy.pi,
+                0.0,
+                2 * numpy.pi,
+                ["pres", "divv", "delp"],
+                ["velc", "hvar"],
+                dict(tmax=1.0, dt=0.001, Re=1.0),
+                bc_type_center=dict(pres=periodic, delp=periodic),
+                bc_val_center=dict(pres=4 * [0.0], delp=4 * [0.0]),
+                bc_type_facex=dict(velc=periodic),
+                bc_val_facex=dict(velc=4 * [0.0]),
+                bc_type_facey=dict(velc=periodic),
+                bc_val_facey=dict(velc=4 * [0.0]),
+                xblocks=xblocks,
+                yblocks=yblocks,
+            )
+
+            for grid, velocity in [(gridx, velocity_x), (gridy, velocity_y)]:
+                for block in grid.blocklist:
+                    block["velc"][0] = velocity(*numpy.meshgrid(block.x, block.y))
+
+            poisson = flowx.poisson.Poisson(
+                gridc,
+                ["delp", "divv"],
+                dict(poisson_solver=poisson_solver, maxiter=2000, tol=1e-12),
+            )
+            ins = flowx.ins.IncompNS(
+                poisson,
+                flowx.imbound.ImBound(),
+                [gridc, gridx, gridy, scalars, particles],
+                self.ins_vars,
+            )
+
+            for _ in range(200):
+                ins.advance()
+                scalars.advance()
+
+            # Velocity decays as exp(-2 t / Re) on faces at the periodic
+            # boundaries as well as inside the domain
+            x = numpy.arange(self.nx + 1) * gridx.dx
+            y = (numpy.arange(self.ny) + 0.5) * gridx.dy
+
+            decay = numpy.exp(-2 * scalars.time)
+            error = numpy.abs(
+                self._gather(gridx, "velc") - decay * velocity_x(*numpy.meshgrid(x, y))
+            )
+
+            self.assertAlmostEqual(scalars.stats["max_u"], decay, delta=0.01)
+            self.assertTrue(error.max() < 0.001)
+            self.assertTrue(numpy.allclose(error[:, 0], error[:, -1], atol=1e-12))
+
+    def test_outflow_blocks(self):
+        """Test outflow boundaries are rejected on grids with multiple blocks."""
+        gridc, gridx, gridy, scalars, particles = flowx.domain.Domain(
+            self.nx,
+            self.ny,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            ["pres", "divv", "delp"],
+            ["velc", "hvar"],
+            dict(tmax=1.0, dt=0.001, Re=100.0),
+            bc_type_facex=dict(velc=["dirichlet", "outflow", "neumann", "neumann"]),
+            bc_val_facex=dict(velc=[1.0, 0.0, 0.0, 0.0]),
+            xblocks=2,
+            yblocks=2,
+        )
+
+        poisson = flowx.poisson.Poisson(
+            gridc, ["delp", "divv"], dict(poisson_solver="cg")
+        )
+        with self.assertRaises(ValueError):
+            flowx.ins.IncompNS(
+                poisson,
+                flowx.imbound.ImBound(),
+                [gridc, gridx, gridy, scalars, particles],
+                self.ins_vars,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
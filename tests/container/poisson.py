@@ -2,6 +2,7 @@
 
 import numpy
 import random
+import tempfile
 import unittest
 
 import flowx
@@ -142,6 +143,329 @@ class TestPoissonCG(unittest.TestCase):
         self.assertTrue(res <= tol)
         self.assertTrue(ites < maxiter)
 
+    def test_warm_start(self):
+        """Test extrapolated initial guesses reduce iterations over solves."""
+        rhs = numpy.copy(self.grid["rvar"][0, 0, :, :])
+        noise = numpy.random.RandomState(0).random_sample(rhs.shape)
+        poisson_vars = ["ivar", "rvar"]
+
+        ites = dict()
+        for warm_start in [None, "extrapolate"]:
+            poisson_info = dict(
+                poisson_solver="cg", maxiter=3000, tol=1e-10, warm_start=warm_start
+            )
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+
+            for step in range(4):
+                self.grid["ivar"][0, 0, :, :] = 0.0
+                self.grid["rvar"][0, 0, :, :] = (1.0 + 0.1 * step) * rhs + (
+                    0.1 * step**2 * noise
+                )
+                ites[warm_start], _ = self.poisson.solve()
+
+        self.assertTrue(ites["extrapolate"] < ites[None])
+        self.assertTrue(self.poisson.stats["ites_saved_est"] > 0)
+
+
+class TestPoissonPCG(unittest.TestCase):
+    """Unit-tests for the Poisson preconditioned CG solver."""
+
+    def setUp(self):
+        """Set up the grid and the variables of the Poisson system."""
+        center_vars = ["ivar", "rvar", "asol", "eror"]
+        nx, ny = 40, 40
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        bc_type = {"ivar": 4 * ["dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            nx,
+            ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        self._set_analytical("asol")
+        self._set_rhs("rvar")
+
+    def _set_analytical(self, var_name):
+        """Private method to set the analytical solution."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = numpy.sin(numpy.pi * X / Lx) * numpy.cos(
+            numpy.pi * Y / Ly
+        )
+
+    def _set_rhs(self, var_name):
+        """Private method to set the right-hand side of the system."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = (
+            -((numpy.pi / Lx) ** 2 + (numpy.pi / Ly) ** 2)
+            * numpy.sin(numpy.pi * X / Lx)
+            * numpy.cos(numpy.pi * Y / Ly)
+        )
+
+    def test_number_of_iterations(self):
+        """Test the solver reaches the maximum number of iterations."""
+
+        maxiter, tol = 0, 1e-12
+        poisson_info = dict(poisson_solver="pcg", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, _ = self.poisson.solve()
+        self.assertEqual(ites, maxiter)
+
+    def test_residual(self):
+        """Test the solver convergence with each preconditioner."""
+        maxiter, tol = 3000, 1e-6
+        poisson_vars = ["ivar", "rvar"]
+        for preconditioner in ["diagonal", "ic0", "multigrid"]:
+            self.grid["ivar"][:, :, :, :] = 0.0
+            poisson_info = dict(
+                poisson_solver="pcg",
+                maxiter=maxiter,
+                tol=tol,
+                preconditioner=preconditioner,
+            )
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            ites, res = self.poisson.solve()
+            self.assertTrue(res <= tol)
+            self.assertTrue(ites < maxiter)
+
+    def test_multigrid_sweeps(self):
+        """Test the multigrid preconditioner rejects unequal sweeps."""
+        poisson_info = dict(
+            poisson_solver="pcg",
+            preconditioner="multigrid",
+            mg_presmooth=2,
+            mg_postsmooth=1,
+        )
+        with self.assertRaises(ValueError):
+            flowx.poisson.Poisson(self.grid, ["ivar", "rvar"], poisson_info)
+
+    def test_multigrid_symmetry(self):
+        """Test the multigrid preconditioner is a symmetric operator."""
+        nx, ny = 16, 16
+        options = dict(
+            preconditioner="multigrid", mg_cycle="V", mg_presmooth=2, mg_postsmooth=2
+        )
+
+        for bc_type in [
+            4 * ["dirichlet"],
+            4 * ["neumann"],
+            4 * ["periodic"],
+            ["neumann", "dirichlet", "periodic", "periodic"],
+        ]:
+            grid = flowx.domain.Grid(
+                "cell-centered",
+                ["ivar"],
+                nx,
+                ny,
+                0.0,
+                1.0,
+                0.0,
+                1.0,
+                user_bc_type={"ivar": bc_type},
+                user_bc_val={"ivar": 4 * [0.0]},
+            )
+            matrix = flowx.poisson._interface.assemble_sparse_matrix(grid, "ivar")
+            precondition = flowx.poisson._interface.build_preconditioner(
+                grid, "ivar", matrix, options
+            )
+
+            operator = numpy.array(
+                [precondition(unit) for unit in numpy.identity(nx * ny)]
+            ).T
+            self.assertTrue(
+                numpy.abs(operator - operator.T).max()
+                < 1e-12 * numpy.abs(operator).max()
+            )
+
+
+class TestPoissonKrylov(unittest.TestCase):
+    """Unit-tests for the matrix-free Krylov solvers."""
+
+    def setUp(self):
+        """Set up the grid and the variables of the Poisson system."""
+        center_vars = ["ivar", "rvar", "asol", "eror"]
+        nx, ny = 40, 40
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        bc_type = {"ivar": 4 * ["dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            nx,
+            ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        self._set_analytical("asol")
+        self._set_rhs("rvar")
+
+    def _set_analytical(self, var_name):
+        """Private method to set the analytical solution."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = numpy.sin(numpy.pi * X / Lx) * numpy.cos(
+            numpy.pi * Y / Ly
+        )
+
+    def _set_rhs(self, var_name):
+        """Private method to set the right-hand side of the system."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = (
+            -((numpy.pi / Lx) ** 2 + (numpy.pi / Ly) ** 2)
+            * numpy.sin(numpy.pi * X / Lx)
+            * numpy.cos(numpy.pi * Y / Ly)
+        )
+
+    def test_residual(self):
+        """Test the solver convergence for each Krylov method."""
+        maxiter, tol = 3000, 1e-6
+        poisson_vars = ["ivar", "rvar"]
+        for krylov_method in ["cg", "bicgstab", "gmres"]:
+            self.grid["ivar"][0, 0, :, :] = 0.0
+            poisson_info = dict(
+                poisson_solver="krylov",
+                krylov_method=krylov_method,
+                maxiter=maxiter,
+                tol=tol,
+            )
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            ites, res = self.poisson.solve()
+            self.assertTrue(res <= tol)
+            self.assertTrue(ites < maxiter)
+
+    def test_operator(self):
+        """Test the matrix-free operator against the assembled matrix."""
+        self.grid.update_bc_type({"ivar": ["neumann", "dirichlet"] * 2})
+        operator = flowx.poisson.LaplacianOperator(self.grid, "ivar")
+        matrix = flowx.poisson.assemble_sparse_matrix(self.grid, "ivar")
+        x = numpy.random.RandomState(0).random_sample(matrix.shape[0])
+        self.assertTrue(numpy.allclose(operator @ x, matrix @ x))
+
+
+class TestPoissonSOR(unittest.TestCase):
+    """Unit-tests for the Poisson red-black SOR solver."""
+
+    def setUp(self):
+        """Set up the grid and the variables of the Poisson system."""
+        center_vars = ["ivar", "rvar", "asol", "eror"]
+        nx, ny = 40, 40
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        bc_type = {"ivar": 4 * ["dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            nx,
+            ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        self._set_analytical("asol")
+        self._set_rhs("rvar")
+
+    def _set_analytical(self, var_name):
+        """Private method to set the analytical solution."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = numpy.sin(numpy.pi * X / Lx) * numpy.cos(
+            numpy.pi * Y / Ly
+        )
+
+    def _set_rhs(self, var_name):
+        """Private method to set the right-hand side of the system."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = (
+            -((numpy.pi / Lx) ** 2 + (numpy.pi / Ly) ** 2)
+            * numpy.sin(numpy.pi * X / Lx)
+            * numpy.cos(numpy.pi * Y / Ly)
+        )
+
+    def test_number_of_iterations(self):
+        """Test the solver reaches the maximum number of iterations."""
+        maxiter, tol = 0, 1e-12
+        poisson_info = dict(poisson_solver="sor", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, _ = self.poisson.solve()
+        self.assertEqual(ites, maxiter)
+
+    def test_residual(self):
+        """Test the solver convergence."""
+        maxiter, tol = 3000, 1e-6
+        poisson_info = dict(poisson_solver="sor", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, res = self.poisson.solve()
+        self.assertTrue(res <= tol)
+        self.assertTrue(ites < maxiter)
+
+    def test_superlu(self):
+        """Test the solution matches the direct solver for mixed boundaries."""
+        self.grid.update_bc_type({"ivar": ["neumann", "dirichlet"] * 2})
+        poisson_vars = ["ivar", "rvar"]
+
+        solution = dict()
+        for poisson_solver in ["superlu", "sor"]:
+            poisson_info = dict(poisson_solver=poisson_solver, maxiter=3000, tol=1e-10)
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            self.poisson.solve()
+            solution[poisson_solver] = numpy.copy(self.grid["ivar"][0, 0, :, :])
+
+        self.assertTrue(numpy.allclose(solution["superlu"], solution["sor"]))
+
+    def test_check_every(self):
+        """Test residual checks at a coarser cadence."""
+        maxiter, tol = 3000, 1e-6
+        poisson_vars = ["ivar", "rvar"]
+
+        poisson_info = dict(poisson_solver="sor", maxiter=maxiter, tol=tol)
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites_every, _ = self.poisson.solve()
+        solution = numpy.copy(self.grid["ivar"][0, 0, :, :])
+
+        self.grid["ivar"][:] = 0.0
+        poisson_info["check_every"] = 10
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, res = self.poisson.solve()
+
+        self.assertTrue(res <= tol)
+        self.assertEqual(ites % 10, 0)
+        self.assertTrue(ites_every <= ites < ites_every + 10)
+        self.assertTrue(
+            numpy.allclose(self.grid["ivar"][0, 0, :, :], solution, atol=1e-6)
+        )
+
 
 class TestPoissonJacobi(unittest.TestCase):
     """Unit-tests for the Poisson Jacobi solver."""
@@ -216,6 +540,27 @@ class TestPoissonJacobi(unittest.TestCase):
         self.assertTrue(res <= tol)
         self.assertTrue(ites < maxiter)
 
+    def test_check_every(self):
+        """Test residual checks at a coarser cadence and phase timings."""
+        maxiter, tol = 3000, 1e-6
+        poisson_vars = ["ivar", "rvar"]
+
+        poisson_info = dict(poisson_solver="jacobi", maxiter=maxiter, tol=tol)
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites_every, _ = self.poisson.solve()
+
+        self.grid["ivar"][:] = 0.0
+        poisson_info["check_every"] = 10
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, res = self.poisson.solve()
+
+        self.assertTrue(res <= tol)
+        self.assertEqual(ites % 10, 0)
+        self.assertTrue(ites_every <= ites < ites_every + 10)
+
+        for phase in ["stencil", "reduction", "boundary"]:
+            self.assertTrue(self.poisson.stats[phase + "_time"] > 0.0)
+
 
 class TestPoissonSuperLU(unittest.TestCase):
     """Unit-tests for the Poisson SuperLU solver."""
@@ -284,6 +629,572 @@ class TestPoissonSuperLU(unittest.TestCase):
         self.assertTrue(res <= tol)
         self.assertEqual(ites, maxiter)
 
+    def test_factorization_cache(self):
+        """Test LU factorizations are shared and read back from disk."""
+        poisson_vars = ["ivar", "rvar"]
+        cache = flowx.poisson.factorization_cache
+        cache.clear()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            poisson_info = dict(poisson_solver="superlu", cache_dir=cache_dir)
+            first = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            second = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            self.assertIs(first._options["lu"], second._options["lu"])
+            self.assertEqual(len(cache), 1)
+
+            first.solve()
+            sol = numpy.copy(self.grid["ivar"][0, 0, :, :])
+
+            # A new process starts with an empty cache and reads from disk
+            cache.clear()
+            self.grid["ivar"][0, 0, :, :] = 0.0
+            third = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            third.solve()
+            self.assertIsInstance(third._options["lu"], flowx.poisson.TriangularLU)
+            self.assertTrue(numpy.allclose(self.grid["ivar"][0, 0, :, :], sol))
+
+        # Least recently used entries are evicted above the memory cap
+        cache.max_bytes = cache.nbytes
+        flowx.poisson.Poisson(self.grid, poisson_vars, dict(poisson_solver="direct"))
+        self.assertEqual(len(cache), 1)
+        cache.max_bytes = 2**30
+        cache.clear()
+
+    def test_bc_change(self):
+        """Test the factorization is rebuilt only when boundary types change."""
+        poisson_vars = ["ivar", "rvar"]
+        poisson = flowx.poisson.Poisson(
+            self.grid, poisson_vars, dict(poisson_solver="superlu")
+        )
+        lu = poisson._options["lu"]
+
+        self.grid.update_bc_type({"ivar": 4 * ["dirichlet"]})
+        poisson.solve()
+        self.assertIs(poisson._options["lu"], lu)
+
+        self.grid.update_bc_type({"ivar": 2 * ["neumann", "dirichlet"]})
+        poisson.solve()
+        sol = numpy.copy(self.grid["ivar"][0, 0, :, :])
+        self.assertIsNot(poisson._options["lu"], lu)
+
+        reference = flowx.poisson.Poisson(
+            self.grid, poisson_vars, dict(poisson_solver="superlu")
+        )
+        reference.solve()
+        self.assertTrue(numpy.allclose(self.grid["ivar"][0, 0, :, :], sol))
+
+    def test_solve_batch(self):
+        """Test batched solves match solves of each right-hand side."""
+        center_vars = ["phi1", "rhs1", "phi2", "rhs2", "ref1", "ref2"]
+        bc_type = {var: 4 * ["dirichlet"] for var in ["phi1", "phi2", "ref1", "ref2"]}
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            40,
+            40,
+            0.0,
+            1.0,
+            -0.5,
+            0.5,
+            user_bc_type=bc_type,
+            user_bc_val={var: 4 * [0.0] for var in bc_type},
+        )
+
+        numpy.random.seed(0)
+        grid["rhs1"][:] = numpy.random.rand(*grid["rhs1"].shape)
+        grid["rhs2"][:] = numpy.random.rand(*grid["rhs2"].shape)
+
+        for solver in ["superlu", "direct", "cg"]:
+            poisson_info = dict(poisson_solver=solver, tol=1e-12)
+            for ivar, rvar in [("ref1", "rhs1"), ("ref2", "rhs2")]:
+                grid[ivar][:] = 0.0
+                flowx.poisson.Poisson(grid, [ivar, rvar], poisson_info).solve()
+
+            grid["phi1"][:] = 0.0
+            grid["phi2"][:] = 0.0
+            poisson = flowx.poisson.Poisson(grid, ["phi1", "rhs1"], poisson_info)
+            ites, residuals = poisson.solve_batch([("phi1", "rhs1"), ("phi2", "rhs2")])
+
+            self.assertEqual(len(ites), 2)
+            self.assertEqual(len(residuals), 2)
+            for ivar, ref in [("phi1", "ref1"), ("phi2", "ref2")]:
+                self.assertTrue(numpy.allclose(grid[ivar], grid[ref]))
+
+        with self.assertRaises(ValueError):
+            poisson.solve_batch([("rhs1", "rhs2")])
+
+        with self.assertRaises(ValueError):
+            flowx.poisson.Poisson().solve_batch([("phi1", "rhs1")])
+
+    def test_mixed_precision(self):
+        """Test float32 factorization with refinement reaches the tolerance."""
+        poisson_vars = ["ivar", "rvar"]
+        tol = 1e-10
+
+        for bc_type in [4 * ["dirichlet"], 2 * ["neumann", "dirichlet"]]:
+            self.grid.update_bc_type({"ivar": bc_type})
+
+            self.grid["ivar"][:] = 0.0
+            flowx.poisson.Poisson(
+                self.grid, poisson_vars, dict(poisson_solver="superlu")
+            ).solve()
+            reference = numpy.copy(self.grid["ivar"])
+
+            self.grid["ivar"][:] = 0.0
+            poisson_info = dict(poisson_solver="superlu", precision="mixed", tol=tol)
+            poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            ites, res = poisson.solve()
+
+            self.assertEqual(poisson._options["lu"].L.dtype, numpy.float32)
+            self.assertTrue(0 < ites < 10)
+            self.assertTrue(res <= tol)
+            self.assertTrue(numpy.allclose(self.grid["ivar"], reference))
+
+        with self.assertRaises(ValueError):
+            flowx.poisson.Poisson(
+                self.grid, poisson_vars, dict(poisson_solver="cg", precision="mixed")
+            )
+
+
+class TestPoissonSpectral(unittest.TestCase):
+    """Unit-tests for the Poisson spectral solver."""
+
+    def setUp(self):
+        """Set up the grid and the variables of the Poisson system."""
+        center_vars = ["ivar", "rvar", "asol", "eror"]
+        nx, ny = 40, 40
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        bc_type = {"ivar": 4 * ["dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            nx,
+            ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        self._set_analytical("asol")
+        self._set_rhs("rvar")
+
+    def _set_analytical(self, var_name):
+        """Private method to set the analytical solution."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = numpy.sin(numpy.pi * X / Lx) * numpy.cos(
+            numpy.pi * Y / Ly
+        )
+
+    def _set_rhs(self, var_name):
+        """Private method to set the right-hand side of the system."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = (
+            -((numpy.pi / Lx) ** 2 + (numpy.pi / Ly) ** 2)
+            * numpy.sin(numpy.pi * X / Lx)
+            * numpy.cos(numpy.pi * Y / Ly)
+        )
+
+    def test_number_of_iterations(self):
+        """Test the solver reaches the maximum number of iterations."""
+
+        maxiter, tol = None, 1e-12
+        poisson_info = dict(poisson_solver="spectral", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, _ = self.poisson.solve()
+        self.assertEqual(ites, maxiter)
+
+    def test_residual(self):
+        """Test the solver convergence."""
+        maxiter, tol = None, 1e-6
+        poisson_info = dict(poisson_solver="spectral", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, res = self.poisson.solve()
+        self.assertTrue(res <= tol)
+        self.assertEqual(ites, maxiter)
+
+    def test_superlu(self):
+        """Test the solver against SuperLU for mixed boundary conditions."""
+        poisson_vars = ["ivar", "rvar"]
+        solution = dict()
+        for bc_type in [4 * ["dirichlet"], ["neumann", "dirichlet"] * 2]:
+            self.grid.update_bc_type({"ivar": bc_type})
+            for solver in ["superlu", "spectral"]:
+                self.grid["ivar"][:, :, :, :] = 0.0
+                poisson_info = dict(poisson_solver=solver)
+                self.poisson = flowx.poisson.Poisson(
+                    self.grid, poisson_vars, poisson_info
+                )
+                self.poisson.solve()
+                solution[solver] = numpy.copy(self.grid["ivar"][0, 0, :, :])
+
+            self.assertTrue(
+                numpy.allclose(solution["spectral"], solution["superlu"], atol=1e-10)
+            )
+
+
+class TestPoissonMultigrid(unittest.TestCase):
+    """Unit-tests for the Poisson multigrid solver."""
+
+    def setUp(self):
+        """Set up the grid and the variables of the Poisson system."""
+        center_vars = ["ivar", "rvar", "asol", "eror"]
+        nx, ny = 40, 40
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        bc_type = {"ivar": 4 * ["dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            nx,
+            ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+        self._set_analytical("asol")
+        self._set_rhs("rvar")
+
+    def _set_analytical(self, var_name):
+        """Private method to set the analytical solution."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = numpy.sin(numpy.pi * X / Lx) * numpy.cos(
+            numpy.pi * Y / Ly
+        )
+
+    def _set_rhs(self, var_name):
+        """Private method to set the right-hand side of the system."""
+        X, Y = numpy.meshgrid(self.grid.x, self.grid.y)
+        Lx = self.grid.xmax - self.grid.xmin
+        Ly = self.grid.ymax - self.grid.ymin
+        self.grid[var_name][0, 0, :, :] = (
+            -((numpy.pi / Lx) ** 2 + (numpy.pi / Ly) ** 2)
+            * numpy.sin(numpy.pi * X / Lx)
+            * numpy.cos(numpy.pi * Y / Ly)
+        )
+
+    def test_number_of_iterations(self):
+        """Test the solver reaches the maximum number of iterations."""
+
+        maxiter, tol = 0, 1e-12
+        poisson_info = dict(poisson_solver="multigrid", maxiter=maxiter, tol=tol)
+        poisson_vars = ["ivar", "rvar"]
+        self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+        ites, _ = self.poisson.solve()
+        self.assertEqual(ites, maxiter)
+
+    def test_residual(self):
+        """Test the solver convergence for V and W cycles."""
+        maxiter, tol = 50, 1e-6
+        for mg_cycle in ["V", "W"]:
+            self.grid["ivar"][:, :, :, :] = 0.0
+            poisson_info = dict(
+                poisson_solver="multigrid", maxiter=maxiter, tol=tol, mg_cycle=mg_cycle
+            )
+            poisson_vars = ["ivar", "rvar"]
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            ites, res = self.poisson.solve()
+            self.assertTrue(res <= tol)
+            self.assertTrue(ites < maxiter)
+
+    def test_superlu(self):
+        """Test the solver against SuperLU."""
+        poisson_vars = ["ivar", "rvar"]
+        solution = dict()
+        for solver in ["superlu", "multigrid"]:
+            self.grid["ivar"][:, :, :, :] = 0.0
+            poisson_info = dict(poisson_solver=solver, maxiter=50, tol=1e-10)
+            self.poisson = flowx.poisson.Poisson(self.grid, poisson_vars, poisson_info)
+            self.poisson.solve()
+            solution[solver] = numpy.copy(self.grid["ivar"][0, 0, :, :])
+
+        self.assertTrue(
+            numpy.allclose(solution["multigrid"], solution["superlu"], atol=1e-8)
+        )
+
+    def test_coarsening(self):
+        """Test grids without a coarse level are rejected."""
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            ["ivar", "rvar"],
+            37,
+            37,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            user_bc_type={"ivar": 4 * ["dirichlet"]},
+            user_bc_val={"ivar": 4 * [0.0]},
+        )
+
+        for poisson_info in [
+            dict(poisson_solver="multigrid"),
+            dict(poisson_solver="pcg", preconditioner="multigrid"),
+        ]:
+            with self.assertRaises(ValueError):
+                flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info)
+
+
+class TestPoissonMatrix(unittest.TestCase):
+    """Unit-tests for the assembly of the Poisson matrix."""
+
+    def setUp(self):
+        """Set up a grid with mixed boundary conditions."""
+        center_vars = ["ivar", "rvar"]
+        self.nx, self.ny = 12, 8
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = 0.0, 1.0
+        bc_type = {"ivar": ["dirichlet", "neumann", "neumann", "dirichlet"]}
+        bc_val = {"ivar": 4 * [0.0]}
+        self.grid = flowx.domain.Grid(
+            "cell-centered",
+            center_vars,
+            self.nx,
+            self.ny,
+            xmin,
+            xmax,
+            ymin,
+            ymax,
+            user_bc_type=bc_type,
+            user_bc_val=bc_val,
+        )
+
+    def _reference_matrix(self):
+        """Private method to build the matrix entry by entry."""
+        nx, ny = self.nx, self.ny
+        dx, dy = self.grid.dx, self.grid.dy
+        coeff_add = [-1.0, 1.0, 1.0, -1.0]
+        matrix = numpy.zeros((nx * ny, nx * ny))
+        for j in range(ny):
+            for i in range(nx):
+                row = j * nx + i
+                matrix[row, row] = -2.0 / dx**2 - 2.0 / dy**2
+                for inbr, jnbr, face, delta in [
+                    (i - 1, j, 0, dx),
+                    (i + 1, j, 1, dx),
+                    (i, j - 1, 2, dy),
+                    (i, j + 1, 3, dy),
+                ]:
+                    if 0 <= inbr < nx and 0 <= jnbr < ny:
+                        matrix[row, jnbr * nx + inbr] = 1.0 / delta**2
+                    else:
+                        matrix[row, row] += coeff_add[face] / delta**2
+        return matrix
+
+    def test_assembly(self):
+        """Test the vectorized assembly against an entry-wise reference."""
+        matrix = flowx.poisson.assemble_sparse_matrix(self.grid, "ivar")
+        self.assertTrue(
+            numpy.allclose(matrix.toarray(), self._reference_matrix(), atol=1e-12)
+        )
+
+    def test_anisotropic(self):
+        """Test SuperLU against CG on cells with dx != dy."""
+        center_vars = ["ivar", "rvar"]
+        nx, ny = 40, 20
+        xmin, xmax = 0.0, 1.0
+        ymin, ymax = -0.5, 0.5
+        grid = flowx.domain.Grid(
+            "cell-centered", center_vars, nx, ny, xmin, xmax, ymin, ymax
+        )
+
+        X, Y = numpy.meshgrid(grid.x, grid.y)
+        grid["rvar"][0, 0, :, :] = numpy.cos(numpy.pi * X) * numpy.cos(numpy.pi * Y)
+
+        solution = dict()
+        for solver in ["cg", "superlu"]:
+            grid["ivar"][0, 0, :, :] = 0.0
+            poisson_info = dict(poisson_solver=solver, maxiter=3000, tol=1e-20)
+            poisson = flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info)
+            poisson.solve()
+            phi = grid["ivar"][0, 0, 1:-1, 1:-1]
+            solution[solver] = phi - numpy.mean(phi)
+
+        self.assertTrue(numpy.allclose(solution["superlu"], solution["cg"], atol=1e-8))
+
+
+class TestPoissonBlocks(unittest.TestCase):
+    """Unit-tests for the Poisson solvers on grids with multiple blocks."""
+
+    boundaries = ["dirichlet", "neumann", "neumann", "dirichlet"]
+
+    def setUp(self):
+        """Set up a random right-hand side on a single block."""
+        self.nx, self.ny = 16, 16
+        self.bc_type = {"ivar": self.boundaries}
+        self.bc_val = {"ivar": 4 * [0.0]}
+        self.rhs = numpy.random.RandomState(0).random_sample((self.ny, self.nx))
+
+        grid = self._create_grid(1, 1)
+        poisson_info = dict(poisson_solver="superlu")
+        flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info).solve()
+        self.sol = self._gather(grid, "ivar")
+
+    def _create_grid(self, xblocks, yblocks):
+        """Private method to create a grid and scatter the right-hand side."""
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            ["ivar", "rvar"],
+            self.nx,
+            self.ny,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            xblocks,
+            yblocks,
+            user_bc_type=self.bc_type,
+            user_bc_val=self.bc_val,
+        )
+        for block in grid.blocklist:
+            i, j = int(round(block.xmin / grid.dx)), int(round(block.ymin / grid.dy))
+            block["rvar"][0, 1:-1, 1:-1] = self.rhs[j : j + grid.nyb, i : i + grid.nxb]
+
+        return grid
+
+    def _gather(self, grid, varkey):
+        """Private method to gather interior values of all blocks."""
+        values = numpy.zeros((self.ny, self.nx))
+        for block in grid.blocklist:
+            i, j = int(round(block.xmin / grid.dx)), int(round(block.ymin / grid.dy))
+            values[j : j + grid.nyb, i : i + grid.nxb] = block[varkey][0, 1:-1, 1:-1]
+
+        return values
+
+    def test_cg(self):
+        """Test CG on 4x4 blocks matches the single block direct solver."""
+        grid = self._create_grid(4, 4)
+        poisson_info = dict(poisson_solver="cg", maxiter=1000, tol=1e-20)
+        flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info).solve()
+        self.assertTrue(numpy.allclose(self._gather(grid, "ivar"), self.sol))
+
+    def test_jacobi(self):
+        """Test Jacobi on 2x2 blocks matches the single block direct solver."""
+        grid = self._create_grid(2, 2)
+        poisson_info = dict(poisson_solver="jacobi", maxiter=20000, tol=1e-14)
+        flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info).solve()
+        self.assertTrue(numpy.allclose(self._gather(grid, "ivar"), self.sol))
+
+    def test_unsupported(self):
+        """Test solvers without multiple block support raise an error."""
+        grid = self._create_grid(2, 2)
+        with self.assertRaises(ValueError):
+            flowx.poisson.Poisson(
+                grid, ["ivar", "rvar"], dict(poisson_solver="superlu")
+            )
+
+
+class TestPoissonPeriodic(TestPoissonBlocks):
+    """Unit-tests for the Poisson solvers with periodic boundaries."""
+
+    boundaries = ["periodic", "periodic", "neumann", "dirichlet"]
+
+    def test_solvers(self):
+        """Test single block solvers match the direct solver."""
+        for solver in ["spectral", "sor", "multigrid", "pcg", "krylov"]:
+            grid = self._create_grid(1, 1)
+            poisson_info = dict(poisson_solver=solver, maxiter=1000, tol=1e-12)
+            flowx.poisson.Poisson(grid, ["ivar", "rvar"], poisson_info).solve()
+            self.assertTrue(numpy.allclose(self._gather(grid, "ivar"), self.sol))
+
+    def test_matrix(self):
+        """Test the matrix couples cells on opposite faces."""
+        grid = self._create_grid(1, 1)
+        matrix = flowx.poisson.assemble_sparse_matrix(grid, "ivar")
+        self.assertTrue(numpy.allclose((matrix - matrix.T).data, 0.0))
+        self.assertEqual(matrix[0, self.nx - 1], 1.0 / grid.dx**2)
+
+
+class TestHelmholtz(unittest.TestCase):
+    """Unit-tests for the Helmholtz solver on face grids."""
+
+    def setUp(self):
+        """Set up parameters of the manufactured solution."""
+        self.nx, self.ny = 32, 32
+        self.alpha = 0.01
+
+    def _solve(self, gridtype, xblocks, yblocks):
+        """Private method to solve for u = sin(pi x) sin(pi y) on a grid."""
+        grid = flowx.domain.Grid(
+            gridtype,
+            ["ivar"],
+            self.nx,
+            self.ny,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            xblocks,
+            yblocks,
+            user_bc_type={"ivar": 4 * ["dirichlet"]},
+            user_bc_val={"ivar": 4 * [0.0]},
+        )
+
+        factor = 1.0 + 2.0 * self.alpha * numpy.pi**2
+        for block in grid.blocklist:
+            X, Y = numpy.meshgrid(block.x, block.y)
+            block["ivar"][0, :, :] = (
+                factor * numpy.sin(numpy.pi * X) * numpy.sin(numpy.pi * Y)
+            )
+
+        _, residual = flowx.poisson.solve_helmholtz(grid, "ivar", self.alpha)
+        self.assertTrue(residual < 1e-10)
+
+        return grid
+
+    def test_face_grids(self):
+        """Test the solution on blocks of face grids converges to the exact one."""
+        for gridtype in ["x-face", "y-face"]:
+            for xblocks, yblocks in [(1, 1), (2, 2)]:
+                grid = self._solve(gridtype, xblocks, yblocks)
+
+                for block in grid.blocklist:
+                    X, Y = numpy.meshgrid(block.x, block.y)
+                    exact = numpy.sin(numpy.pi * X) * numpy.sin(numpy.pi * Y)
+                    error = numpy.abs(block["ivar"][0] - exact)
+                    self.assertTrue(error[1:-1, 1:-1].max() < 1e-3)
+
+    def test_matrix(self):
+        """Test the matrix on a cell-centered grid matches the Poisson matrix."""
+        grid = flowx.domain.Grid(
+            "cell-centered",
+            ["ivar"],
+            self.nx,
+            self.ny,
+            0.0,
+            1.0,
+            0.0,
+            1.0,
+            user_bc_type={"ivar": ["periodic", "periodic", "neumann", "dirichlet"]},
+            user_bc_val={"ivar": 4 * [0.0]},
+        )
+        matrix = flowx.poisson.helmholtz_matrix(grid, "ivar", self.alpha)
+        laplacian = flowx.poisson.assemble_sparse_matrix(grid, "ivar")
+        identity = numpy.eye(self.nx * self.ny)
+
+        self.assertTrue(
+            numpy.allclose(
+                matrix.toarray(), identity - self.alpha * laplacian.toarray()
+            )
+        )
+
 
 if __name__ == "__main__":
     unittest.main()